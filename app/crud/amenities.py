@@ -2,10 +2,28 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 from typing import List
+from datetime import date
 
 from app.models.amenity import Amenity
-from app.schemas.amenity import AmenityCreate, AmenityUpdate, AmenityOut
+from app.models.block import Block
+from app.models.reservation import Reservation, ReservationStatusEnum
+from app.schemas.amenity import AmenityCreate, AmenityUpdate, AmenityOut, AmenityAvailability
+from app.utils.availability import build_availability
 from app.utils.logger import logger  # Import the logger
+from app.utils.cache import read_cache
+from app.utils.writes import update_by_id, delete_by_id
+
+# Amenities change a few times a year; reads are served from here between writes
+amenity_cache = read_cache("amenities")
+
+
+def _invalidate_amenity(condo_id: int = None, amenity_id: int = None):
+    if amenity_id is not None:
+        amenity_cache.delete(("amenity", amenity_id))
+    if condo_id is not None:
+        amenity_cache.delete(("condo", condo_id))
+    else:
+        amenity_cache.delete_where(lambda key: key[0] == "condo")
 
 
 class AmenityCRUD:
@@ -14,7 +32,7 @@ class AmenityCRUD:
 
     async def create_amenity(self, amenity: AmenityCreate) -> AmenityOut:
         try:
-            logger.debug(f"Creating amenity with data: {amenity}")
+            logger.debug("Creating amenity with data: %s", amenity)
             new_amenity = Amenity(
                 name=amenity.name,
                 description=amenity.description,
@@ -24,83 +42,134 @@ class AmenityCRUD:
             )
             self.db.add(new_amenity)
             await self.db.commit()
-            await self.db.refresh(new_amenity)
-            logger.info(f"Amenity created successfully: {new_amenity}")
+            _invalidate_amenity(new_amenity.condo_id)
+            logger.info("Amenity created successfully with ID: %s", new_amenity.id)
             return AmenityOut.model_validate(new_amenity)  # Use model_validate for output
         except Exception as e:
-            logger.error(f"Error creating amenity: {str(e)}")
+            logger.error("Error creating amenity: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating amenity: {str(e)}")
 
     async def get_amenity_by_id(self, amenity_id: int) -> AmenityOut:
         try:
-            logger.debug(f"Fetching amenity with ID: {amenity_id}")
+            logger.debug("Fetching amenity with ID: %s", amenity_id)
+            cached = amenity_cache.get(("amenity", amenity_id))
+            if cached is not None:
+                return cached
             query = select(Amenity).where(Amenity.id == amenity_id)
             result = await self.db.execute(query)
             amenity = result.scalars().first()
             if not amenity:
-                logger.warning(f"Amenity not found with ID: {amenity_id}")
+                logger.warning("Amenity not found with ID: %s", amenity_id)
                 raise HTTPException(status_code=404, detail="Amenity not found")
-            logger.info(f"Amenity fetched successfully: {amenity}")
-            return AmenityOut.model_validate(amenity)
+            logger.info("Amenity fetched successfully with ID: %s", amenity.id)
+            amenity_out = AmenityOut.model_validate(amenity)
+            amenity_cache.set(("amenity", amenity_id), amenity_out)
+            return amenity_out
         except Exception as e:
-            logger.error(f"Error fetching amenity: {str(e)}")
+            logger.error("Error fetching amenity: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching amenity: {str(e)}")
 
     async def get_all_amenities_by_condo(self, condo_id: int) -> List[AmenityOut]:
         try:
-            logger.debug(f"Fetching all amenities for condo ID: {condo_id}")
+            logger.debug("Fetching all amenities for condo ID: %s", condo_id)
+            cached = amenity_cache.get(("condo", condo_id))
+            if cached is not None:
+                return list(cached)
             query = select(Amenity).where(Amenity.condo_id == condo_id)
             result = await self.db.execute(query)
             amenities = result.scalars().all()
-            logger.info(f"Fetched {len(amenities)} amenities for condo ID: {condo_id}")
-            return [AmenityOut.model_validate(a) for a in amenities]
+            logger.info("Fetched %s amenities for condo ID: %s", len(amenities), condo_id)
+            amenities_out = [AmenityOut.model_validate(a) for a in amenities]
+            amenity_cache.set(("condo", condo_id), amenities_out)
+            return list(amenities_out)
         except Exception as e:
-            logger.error(f"Error fetching amenities: {str(e)}")
+            logger.error("Error fetching amenities: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching amenities: {str(e)}")
 
-    async def update_amenity(self, amenity_id: int, amenity_data: AmenityUpdate) -> AmenityOut:
+    async def get_availability(self, amenity_id: int, date_from: date, date_to: date) -> AmenityAvailability:
         try:
-            logger.debug(f"Updating amenity with ID: {amenity_id} and data: {amenity_data}")
-            query = select(Amenity).where(Amenity.id == amenity_id)
-            result = await self.db.execute(query)
-            amenity = result.scalars().first()
-
-            if not amenity:
-                logger.warning(f"Amenity not found with ID: {amenity_id}")
+            logger.debug("Computing availability for amenity ID: %s from %s to %s", amenity_id, date_from, date_to)
+            result = await self.db.execute(
+                select(Amenity.start_time, Amenity.end_time).where(Amenity.id == amenity_id)
+            )
+            hours = result.first()
+            if not hours:
+                logger.warning("Amenity not found with ID: %s", amenity_id)
                 raise HTTPException(status_code=404, detail="Amenity not found")
 
-            # Update the amenity fields
-            amenity.name = amenity_data.name
-            amenity.description = amenity_data.description
-            amenity.start_time = amenity_data.start_time
-            amenity.end_time = amenity_data.end_time
+            blocks = await self.db.execute(
+                select(Block.start_date, Block.end_date, Block.start_time, Block.end_time).where(
+                    Block.amenity_id == amenity_id,
+                    Block.start_date <= date_to,
+                    Block.end_date >= date_from,
+                )
+            )
+            reservations = await self.db.execute(
+                select(Reservation.date, Reservation.start_time, Reservation.end_time).where(
+                    Reservation.amenity_id == amenity_id,
+                    Reservation.date.between(date_from, date_to),
+                    Reservation.status.notin_([ReservationStatusEnum.canceled, ReservationStatusEnum.rejected]),
+                )
+            )
+
+            free_by_day = build_availability(
+                hours.start_time, hours.end_time, date_from, date_to, blocks.all(), reservations.all()
+            )
+            logger.info("Availability computed for amenity ID: %s over %s days", amenity_id, len(free_by_day))
+            return AmenityAvailability(
+                amenity_id=amenity_id,
+                days=[
+                    {"date": day, "free": [{"start_time": start, "end_time": end} for start, end in free]}
+                    for day, free in free_by_day.items()
+                ],
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error computing availability: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error computing availability: {str(e)}")
+
+    async def update_amenity(self, amenity_id: int, amenity_data: AmenityUpdate) -> AmenityOut:
+        try:
+            logger.debug("Updating amenity with ID: %s and data: %s", amenity_id, amenity_data)
+            updated = await update_by_id(self.db, Amenity, amenity_id, {
+                "name": amenity_data.name,
+                "description": amenity_data.description,
+                "start_time": amenity_data.start_time,
+                "end_time": amenity_data.end_time,
+            })
+            if not updated:
+                logger.warning("Amenity not found with ID: %s", amenity_id)
+                raise HTTPException(status_code=404, detail="Amenity not found")
 
-            # Commit the changes to the database
+            # Read back inside the transaction, then commit
+            result = await self.db.execute(select(Amenity).where(Amenity.id == amenity_id))
+            amenity = result.scalars().first()
             await self.db.commit()
-            await self.db.refresh(amenity)
-            logger.info(f"Amenity updated successfully: {amenity}")
+            _invalidate_amenity(amenity.condo_id, amenity_id)
+            logger.info("Amenity updated successfully with ID: %s", amenity.id)
             return AmenityOut.model_validate(amenity)  # Use model_validate for output
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error updating amenity: {str(e)}")
+            logger.error("Error updating amenity: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating amenity: {str(e)}")
 
     async def delete_amenity(self, amenity_id: int):
         try:
-            logger.debug(f"Deleting amenity with ID: {amenity_id}")
-            query = select(Amenity).where(Amenity.id == amenity_id)
-            result = await self.db.execute(query)
-            amenity = result.scalars().first()
-
-            if not amenity:
-                logger.warning(f"Amenity not found with ID: {amenity_id}")
+            logger.debug("Deleting amenity with ID: %s", amenity_id)
+            # Reservations and blocks go with it through ON DELETE CASCADE
+            if not await delete_by_id(self.db, Amenity, amenity_id):
+                logger.warning("Amenity not found with ID: %s", amenity_id)
                 raise HTTPException(status_code=404, detail="Amenity not found")
 
-            # Delete the amenity
-            await self.db.delete(amenity)
             await self.db.commit()
-            logger.info(f"Amenity deleted successfully with ID: {amenity_id}")
-            return AmenityOut.model_validate(amenity)  # Optionally return the deleted amenity for confirmation
+            # The condo is not known without another query, so drop every condo list
+            _invalidate_amenity(amenity_id=amenity_id)
+            logger.info("Amenity deleted successfully with ID: %s", amenity_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting amenity: {str(e)}")
+            logger.error("Error deleting amenity: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting amenity: {str(e)}")
 
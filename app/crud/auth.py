@@ -1,3 +1,4 @@
+from sqlalchemy import bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
@@ -5,6 +6,11 @@ from app.models.user import User
 from app.schemas.user import UserOut
 from app.schemas.auth import LoginRequest
 from app.utils.logger import logger  # Import the logger
+from app.db.db import shards
+
+# Just what login needs; a Row, not an identity-mapped User. Built once, so a
+# login skips constructing the statement and its cache key.
+LOGIN_QUERY = select(User.id, User.name, User.role, User.condo_id, User.password_hash).where(User.email == bindparam("email"))
 
 
 class AuthCRUD:
@@ -13,16 +19,32 @@ class AuthCRUD:
 
     async def check_login(self, request: LoginRequest) -> UserOut:
         try:
-            logger.debug(f"Login attempt for email: {request.email}")
-            result = await self.db.execute(select(User).where(User.email == request.email))
-            user = result.scalars().first()
+            logger.debug("Login attempt for email: %s", request.email)
+            params = {"email": request.email}
+            if shards.sharded:
+                async def find(db: AsyncSession):
+                    result = await db.execute(LOGIN_QUERY, params)
+                    return result.first()
+
+                # The token does not exist yet, so the user's shard is unknown; ask them all
+                users = [row for row in await shards.fan_out(find, session=self.db) if row]
+            else:
+                result = await self.db.execute(LOGIN_QUERY, params)
+                row = result.first()
+                users = [row] if row else []
 
-            if not user:
-                logger.warning(f"Login failed: User not found for email: {request.email}")
+            if not users:
+                logger.warning("Login failed: User not found for email: %s", request.email)
+                return None
+            if len(users) > 1:
+                # UserCRUD keeps emails unique across shards; never guess which account is meant.
+                # Refused like an unknown email, so the response does not tell the accounts exist
+                logger.error("Login refused: email %s is registered on %s shards", request.email, len(users))
                 return None
+            user = users[0]
 
-            logger.info(f"User found for email: {request.email}, proceeding with password verification")
+            logger.info("User found for email: %s, proceeding with password verification", request.email)
             return user
         except Exception as e:
-            logger.error(f"Error during login check: {str(e)}")
+            logger.error("Error during login check: %s", e)
             raise HTTPException(status_code=500, detail="Internal server error")
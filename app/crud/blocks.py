@@ -2,19 +2,47 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 from typing import List
-from sqlalchemy.orm import joinedload
+from app.models.amenity import Amenity
 from app.models.block import Block
 from app.schemas.block import BlockCreate, BlockUpdate, BlockOut
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkItemError, BulkResult
+from app.utils.pagination import decode_cursor, keyset_query, split_page
+from app.utils.bulk import insert_rows
+from app.utils.writes import update_by_id, delete_by_id
 from app.utils.logger import logger
 
 
+def _block_out_query():
+    """Only the columns BlockOut needs, amenity name joined in, no ORM entities."""
+    return (
+        select(
+            Block.id,
+            Block.start_date,
+            Block.end_date,
+            Block.start_time,
+            Block.end_time,
+            Block.reason,
+            Block.version,
+            Amenity.name.label("amenity_name"),
+        )
+        .join(Amenity, Amenity.id == Block.amenity_id)
+    )
+
+
 class BlockCRUD:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _block_out(self, block_id: int) -> BlockOut:
+        """Read one block with its amenity name in a single joined SELECT."""
+        result = await self.db.execute(_block_out_query().where(Block.id == block_id))
+        row = result.first()
+        return BlockOut.model_validate(row._asdict()) if row else None
+
     async def create_block(self, block: BlockCreate) -> BlockOut:
         try:
-            logger.debug(f"Creating block with data: {block}")
+            logger.debug("Creating block with data: %s", block)
             new_block = Block(
                 amenity_id=block.amenity_id,
                 start_date=block.start_date,
@@ -24,98 +52,114 @@ class BlockCRUD:
                 reason=block.reason,
             )
             self.db.add(new_block)
+            await self.db.flush()
+            block_out = await self._block_out(new_block.id)
+            if not block_out:
+                await self.db.rollback()
+                raise HTTPException(status_code=404, detail="Amenity not found")
             await self.db.commit()
-            await self.db.refresh(new_block)
-            logger.info(f"Block created successfully: {new_block}")
-            return BlockOut.model_validate(new_block)
+            logger.info("Block created successfully with ID: %s", new_block.id)
+            return block_out
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error creating block: {str(e)}")
+            logger.error("Error creating block: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating block: {str(e)}")
 
+    async def create_blocks_bulk(self, blocks: List[BlockCreate]) -> BulkResult[BlockOut]:
+        """Insert every valid block in one transaction and report the rest per item."""
+        try:
+            logger.debug("Bulk creating %s blocks", len(blocks))
+            result = await self.db.execute(
+                select(Amenity.id, Amenity.name).where(Amenity.id.in_({b.amenity_id for b in blocks}))
+            )
+            amenity_names = dict(result.all())
+
+            errors = []
+            rows = []
+            for index, block in enumerate(blocks):
+                if block.amenity_id not in amenity_names:
+                    errors.append(BulkItemError(index=index, detail="Amenity not found"))
+                elif block.start_date > block.end_date:
+                    errors.append(BulkItemError(index=index, detail="start_date must not be after end_date"))
+                elif block.start_time >= block.end_time:
+                    errors.append(BulkItemError(index=index, detail="start_time must be before end_time"))
+                else:
+                    rows.append(block.model_dump())
+
+            if rows:
+                await insert_rows(self.db, Block, rows)
+                await self.db.commit()
+            logger.info("Bulk created %s blocks, rejected %s", len(rows), len(errors))
+            return BulkResult[BlockOut](
+                created=[BlockOut(amenity_name=amenity_names[row["amenity_id"]], **row) for row in rows],
+                errors=errors,
+            )
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Error bulk creating blocks: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error bulk creating blocks: {str(e)}")
+
     async def get_block_by_id(self, block_id: int) -> BlockOut:
         try:
-            logger.debug(f"Fetching block with ID: {block_id}")
-            query = select(Block).where(Block.id == block_id)
-            result = await self.db.execute(query)
-            block = result.scalars().first()
-            if not block:
-                logger.warning(f"Block not found with ID: {block_id}")
+            logger.debug("Fetching block with ID: %s", block_id)
+            block_out = await self._block_out(block_id)
+            if not block_out:
+                logger.warning("Block not found with ID: %s", block_id)
                 raise HTTPException(status_code=404, detail="Block not found")
-            logger.info(f"Block fetched successfully: {block}")
-            return BlockOut.model_validate(block)
+            logger.info("Block fetched successfully with ID: %s", block_id)
+            return block_out
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error fetching block: {str(e)}")
+            logger.error("Error fetching block: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching block: {str(e)}")
 
-    async def get_blocks_by_amenity(self, amenity_id: int) -> List[BlockOut]:
+    async def get_blocks_by_amenity(self, amenity_id: int, limit: int, after: str = None) -> Page[BlockOut]:
+        keys = [Block.start_date, Block.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug(f"Fetching all blocks for amenity ID: {amenity_id}")
-            query = (
-                select(Block)
-                .options(joinedload(Block.amenity))
-                .where(Block.amenity_id == amenity_id)
-            )
-            result = await self.db.execute(query)
-            blocks = result.scalars().all()
-
-            logger.info(f"Fetched {len(blocks)} blocks for amenity ID: {amenity_id}")
-            return [
-                BlockOut(
-                    id=block.id,
-                    amenity_name=block.amenity.name,
-                    start_date=block.start_date,
-                    end_date=block.end_date,
-                    start_time=block.start_time,
-                    end_time=block.end_time,
-                    reason=block.reason,
-                )
-                for block in blocks
-            ]
+            logger.debug("Fetching all blocks for amenity ID: %s", amenity_id)
+            query = _block_out_query().where(Block.amenity_id == amenity_id)
+            result = await self.db.execute(keyset_query(query, keys, after_values, limit))
+            blocks, next_cursor = split_page(result.all(), keys, limit)
+
+            logger.info("Fetched %s blocks for amenity ID: %s", len(blocks), amenity_id)
+            return Page[BlockOut](items=[BlockOut.model_validate(b._asdict()) for b in blocks], next_cursor=next_cursor)
         except Exception as e:
-            logger.error(f"Error fetching blocks: {str(e)}")
+            logger.error("Error fetching blocks: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching blocks: {str(e)}")
 
     async def update_block(self, block_id: int, block_data: BlockUpdate) -> BlockOut:
         try:
-            logger.debug(f"Updating block with ID: {block_id} and data: {block_data}")
-            query = select(Block).where(Block.id == block_id)
-            result = await self.db.execute(query)
-            block = result.scalars().first()
-
-            if not block:
-                logger.warning(f"Block not found with ID: {block_id}")
+            logger.debug("Updating block with ID: %s and data: %s", block_id, block_data)
+            # BlockUpdate carries no amenity_id; a block stays on its amenity
+            if not await update_by_id(self.db, Block, block_id, block_data.model_dump()):
+                logger.warning("Block not found with ID: %s", block_id)
                 raise HTTPException(status_code=404, detail="Block not found")
 
-            block.amenity_id = block_data.amenity_id
-            block.start_date = block_data.start_date
-            block.end_date = block_data.end_date
-            block.start_time = block_data.start_time
-            block.end_time = block_data.end_time
-            block.reason = block_data.reason
-
+            # Read back inside the transaction, then commit
+            block_out = await self._block_out(block_id)
             await self.db.commit()
-            await self.db.refresh(block)
-            logger.info(f"Block updated successfully: {block}")
-            return BlockOut.model_validate(block)
+            logger.info("Block updated successfully with ID: %s", block_id)
+            return block_out
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error updating block: {str(e)}")
+            logger.error("Error updating block: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating block: {str(e)}")
 
     async def delete_block(self, block_id: int):
         try:
-            logger.debug(f"Deleting block with ID: {block_id}")
-            query = select(Block).where(Block.id == block_id)
-            result = await self.db.execute(query)
-            block = result.scalars().first()
-
-            if not block:
-                logger.warning(f"Block not found with ID: {block_id}")
+            logger.debug("Deleting block with ID: %s", block_id)
+            if not await delete_by_id(self.db, Block, block_id):
+                logger.warning("Block not found with ID: %s", block_id)
                 raise HTTPException(status_code=404, detail="Block not found")
 
-            await self.db.delete(block)
             await self.db.commit()
-            logger.info(f"Block deleted successfully with ID: {block_id}")
-            return BlockOut.model_validate(block)
+            logger.info("Block deleted successfully with ID: %s", block_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting block: {str(e)}")
+            logger.error("Error deleting block: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting block: {str(e)}")
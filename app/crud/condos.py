@@ -3,9 +3,27 @@ from sqlalchemy.future import select
 from fastapi import HTTPException
 from typing import List
 
+from sqlalchemy import delete
+
+from app.models.amenity import Amenity
 from app.models.condo import Condo  # Assuming you have the Condo model
 from app.schemas.condo import CondoCreate, CondoUpdate, CondoOut
+from app.schemas.pagination import Page
+from app.utils.pagination import decode_cursor, keyset_query, merge_pages
+from app.db.db import shards
 from app.utils.logger import logger  # Import the logger
+from app.utils.cache import read_cache
+from app.utils.writes import update_by_id, delete_by_id
+from app.crud.amenities import amenity_cache
+
+# Condos change a few times a year; reads are served from here between writes
+condo_cache = read_cache("condos")
+
+
+def _invalidate_condo(condo_id: int = None):
+    if condo_id is not None:
+        condo_cache.delete(("condo", condo_id))
+    condo_cache.delete_where(lambda key: key[0] == "condos")
 
 
 class CondosCRUD:
@@ -14,88 +32,105 @@ class CondosCRUD:
 
     async def create_condo(self, condo: CondoCreate) -> CondoOut:
         try:
-            logger.debug(f"Creating condo with data: {condo}")
+            logger.debug("Creating condo with data: %s", condo)
             new_condo = Condo(
                 name=condo.name,
                 address=condo.address,
             )
             self.db.add(new_condo)
             await self.db.commit()
-            await self.db.refresh(new_condo)
-            logger.info(f"Condo created successfully: {new_condo}")
+            _invalidate_condo()
+            logger.info("Condo created successfully with ID: %s", new_condo.id)
             return CondoOut.model_validate(new_condo)  # Use model_validate for output
         except Exception as e:
-            logger.error(f"Error creating condo: {str(e)}")
+            logger.error("Error creating condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating condo: {str(e)}")
 
     async def get_condo_by_id(self, condo_id: int) -> CondoOut:
         try:
-            logger.debug(f"Fetching condo with ID: {condo_id}")
+            logger.debug("Fetching condo with ID: %s", condo_id)
+            cached = condo_cache.get(("condo", condo_id))
+            if cached is not None:
+                return cached
             query = select(Condo).where(Condo.id == condo_id)
             result = await self.db.execute(query)
             condo = result.scalars().first()
             if not condo:
-                logger.warning(f"Condo not found with ID: {condo_id}")
+                logger.warning("Condo not found with ID: %s", condo_id)
                 raise HTTPException(status_code=404, detail="Condo not found")
-            logger.info(f"Condo fetched successfully: {condo}")
-            return CondoOut.model_validate(condo)  # Use model_validate for output
+            logger.info("Condo fetched successfully with ID: %s", condo.id)
+            condo_out = CondoOut.model_validate(condo)  # Use model_validate for output
+            condo_cache.set(("condo", condo_id), condo_out)
+            return condo_out
         except Exception as e:
-            logger.error(f"Error fetching condo: {str(e)}")
+            logger.error("Error fetching condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching condo: {str(e)}")
 
-    async def get_all_condos(self) -> List[CondoOut]:
+    async def get_all_condos(self, limit: int, after: str = None) -> Page[CondoOut]:
+        keys = [Condo.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug("Fetching all condos")
-            query = select(Condo)
-            result = await self.db.execute(query)
-            condos = result.scalars().all()
-            logger.info(f"Fetched {len(condos)} condos")
-            return [CondoOut.model_validate(c) for c in condos]
+            logger.debug("Fetching condos page after: %s", after)
+            cached = condo_cache.get(("condos", limit, after))
+            if cached is not None:
+                return cached
+            query = keyset_query(select(Condo), keys, after_values, limit)
+
+            async def fetch(db: AsyncSession):
+                result = await db.execute(query)
+                return result.scalars().all()
+
+            # Condos are spread over the shards; ask all of them at once
+            condos, next_cursor = merge_pages(await shards.fan_out(fetch, session=self.db), keys, limit)
+            logger.info("Fetched %s condos", len(condos))
+            page = Page[CondoOut](items=[CondoOut.model_validate(c) for c in condos], next_cursor=next_cursor)
+            condo_cache.set(("condos", limit, after), page)
+            return page
         except Exception as e:
-            logger.error(f"Error fetching condos: {str(e)}")
+            logger.error("Error fetching condos: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching condos: {str(e)}")
 
     async def update_condo(self, condo_id: int, condo_data: CondoUpdate) -> CondoOut:
         try:
-            logger.debug(f"Updating condo with ID: {condo_id} and data: {condo_data}")
-            query = select(Condo).where(Condo.id == condo_id)
-            result = await self.db.execute(query)
-            condo = result.scalars().first()
-
-            if not condo:
-                logger.warning(f"Condo not found with ID: {condo_id}")
+            logger.debug("Updating condo with ID: %s and data: %s", condo_id, condo_data)
+            updated = await update_by_id(self.db, Condo, condo_id, {
+                "name": condo_data.name,
+                "address": condo_data.address,
+            })
+            if not updated:
+                logger.warning("Condo not found with ID: %s", condo_id)
                 raise HTTPException(status_code=404, detail="Condo not found")
 
-            # Update the condo fields
-            condo.name = condo_data.name
-            condo.address = condo_data.address
-
             # Commit the changes to the database
             await self.db.commit()
-            await self.db.refresh(condo)
-            logger.info(f"Condo updated successfully: {condo}")
-            return CondoOut.model_validate(condo)  # Use model_validate for output
+            _invalidate_condo(condo_id)
+            logger.info("Condo updated successfully with ID: %s", condo_id)
+            # CondoOut holds only the written fields, so no read-back is needed
+            return CondoOut(name=condo_data.name, address=condo_data.address)
 
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error updating condo: {str(e)}")
+            logger.error("Error updating condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating condo: {str(e)}")
 
     async def delete_condo(self, condo_id: int):
         try:
-            logger.debug(f"Deleting condo with ID: {condo_id}")
-            query = select(Condo).where(Condo.id == condo_id)
-            result = await self.db.execute(query)
-            condo = result.scalars().first()
-
-            if not condo:
-                logger.warning(f"Condo not found with ID: {condo_id}")
+            logger.debug("Deleting condo with ID: %s", condo_id)
+            # The ORM used to cascade to amenities; their reservations and blocks
+            # follow through ON DELETE CASCADE
+            await self.db.execute(delete(Amenity).where(Amenity.condo_id == condo_id))
+            if not await delete_by_id(self.db, Condo, condo_id):
+                await self.db.rollback()
+                logger.warning("Condo not found with ID: %s", condo_id)
                 raise HTTPException(status_code=404, detail="Condo not found")
 
-            # Delete the condo
-            await self.db.delete(condo)
             await self.db.commit()
-            logger.info(f"Condo deleted successfully with ID: {condo_id}")
-            return CondoOut.model_validate(condo)  # Optionally return the deleted condo for confirmation
+            _invalidate_condo(condo_id)
+            amenity_cache.clear()  # its amenities were deleted with it
+            logger.info("Condo deleted successfully with ID: %s", condo_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting condo: {str(e)}")
+            logger.error("Error deleting condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting condo: {str(e)}")
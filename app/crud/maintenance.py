@@ -0,0 +1,77 @@
+import os
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.db.db import shards
+from app.models.reservation import Reservation, ReservationStatusEnum
+from app.models.visitor import Visitor, VisitorStatus
+from app.utils.logger import logger
+from app.utils.writes import update_in_chunks
+
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "500"))
+# Breathing room between chunks for replicas and concurrent requests
+JOB_CHUNK_PAUSE = float(os.getenv("JOB_CHUNK_PAUSE", "0.05"))
+
+
+class MaintenanceCRUD:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def reject_past_pending_reservations(self, today: date) -> int:
+        try:
+            logger.debug("Rejecting pending reservations dated before %s", today)
+            rejected = await update_in_chunks(
+                self.db,
+                Reservation,
+                [Reservation.status == ReservationStatusEnum.pending, Reservation.date < today],
+                {"status": ReservationStatusEnum.rejected},
+                JOB_CHUNK_SIZE,
+                JOB_CHUNK_PAUSE,
+            )
+            logger.info("Rejected %s past pending reservations", rejected)
+            return rejected
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Error rejecting past reservations: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error rejecting past reservations: {str(e)}")
+
+    async def expire_past_pending_visitors(self, today: date) -> int:
+        try:
+            logger.debug("Expiring pending visitors dated before %s", today)
+            expired = await update_in_chunks(
+                self.db,
+                Visitor,
+                [Visitor.status == VisitorStatus.pending, Visitor.visit_date < today],
+                {"status": VisitorStatus.expired},
+                JOB_CHUNK_SIZE,
+                JOB_CHUNK_PAUSE,
+            )
+            logger.info("Expired %s past pending visitors", expired)
+            return expired
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Error expiring past visitors: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error expiring past visitors: {str(e)}")
+
+
+async def _on_every_shard(method_name: str) -> dict:
+    """Run one MaintenanceCRUD method on the primary of every shard; rows changed per shard."""
+    today = date.today()
+    results = {}
+    for shard in shards.order:
+        session = await shard.get_session()
+        try:
+            results[shard.name] = await getattr(MaintenanceCRUD(session), method_name)(today)
+        finally:
+            await session.close()
+    return results
+
+
+async def reject_past_reservations_job() -> dict:
+    return await _on_every_shard("reject_past_pending_reservations")
+
+
+async def expire_past_visitors_job() -> dict:
+    return await _on_every_shard("expire_past_pending_visitors")
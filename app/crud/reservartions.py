@@ -1,143 +1,347 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 from typing import List
-from app.models.reservation import Reservation
+from datetime import date, time
+from weakref import WeakValueDictionary
+from contextlib import AsyncExitStack
+import asyncio
+from app.models.amenity import Amenity
+from app.models.block import Block
+from app.models.reservation import Reservation, ReservationStatusEnum
+from app.models.user import User
 from app.schemas.reservation import ReservationCreate, ReservationUpdate, ReservationOut
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkItemError, BulkResult
+from app.utils.pagination import decode_cursor, keyset_query, split_page
+from app.utils.bulk import insert_rows
+from app.utils.writes import update_by_id, delete_by_id
 from app.utils.logger import logger  # Import the logger
 
 
+RESERVATION_EXPORT_FIELDS = [
+    "id", "date", "start_time", "end_time", "status",
+    "user_id", "user_name", "amenity_id", "amenity_name",
+]
+
+# Statuses that do not hold their slot
+RELEASED_STATUSES = [ReservationStatusEnum.canceled, ReservationStatusEnum.rejected]
+
+# Bookings for the same amenity and day queue here first, so a burst inside
+# one worker waits in memory instead of on the database row lock.
+_slot_locks = WeakValueDictionary()
+
+
+def _reservation_out_query():
+    """Only the columns ReservationOut needs, names joined in, no ORM entities."""
+    return (
+        select(
+            Reservation.id,
+            Reservation.date,
+            Reservation.start_time,
+            Reservation.end_time,
+            Reservation.status,
+            Reservation.version,
+            User.name.label("user_name"),
+            Amenity.name.label("amenity_name"),
+        )
+        .join(User, User.id == Reservation.user_id)
+        .join(Amenity, Amenity.id == Reservation.amenity_id)
+    )
+
+
+def _slot_lock(amenity_id: int, day: date) -> asyncio.Lock:
+    key = (amenity_id, day)
+    lock = _slot_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _slot_locks[key] = lock
+    return lock
+
+
 class ReservationCRUD:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _check_slot(self, amenity_id: int, day: date, start_time: time, end_time: time, exclude_id: int = None):
+        """Validate a slot inside the current transaction.
+
+        Locks the amenity row (SELECT ... FOR UPDATE) so concurrent bookings of
+        the same amenity are serialised across workers without locking the
+        reservations table, then checks opening hours, blocks and overlapping
+        reservations with indexed range predicates.
+        """
+        if start_time >= end_time:
+            raise HTTPException(status_code=400, detail="start_time must be before end_time")
+
+        result = await self.db.execute(
+            select(Amenity.start_time, Amenity.end_time).where(Amenity.id == amenity_id).with_for_update()
+        )
+        hours = result.first()
+        if not hours:
+            raise HTTPException(status_code=404, detail="Amenity not found")
+        if start_time < hours.start_time or end_time > hours.end_time:
+            raise HTTPException(status_code=409, detail="Reservation is outside the amenity opening hours")
+
+        result = await self.db.execute(
+            select(Block.id).where(
+                Block.amenity_id == amenity_id,
+                Block.start_date <= day,
+                Block.end_date >= day,
+                Block.start_time < end_time,
+                Block.end_time > start_time,
+            ).limit(1)
+        )
+        if result.first():
+            raise HTTPException(status_code=409, detail="The amenity is blocked for that time")
+
+        query = select(Reservation.id).where(
+            Reservation.amenity_id == amenity_id,
+            Reservation.date == day,
+            Reservation.start_time < end_time,
+            Reservation.end_time > start_time,
+            Reservation.status.notin_(RELEASED_STATUSES),
+        )
+        if exclude_id is not None:
+            query = query.where(Reservation.id != exclude_id)
+        result = await self.db.execute(query.limit(1))
+        if result.first():
+            raise HTTPException(status_code=409, detail="The slot is already reserved")
+
     async def create_reservation(self, reservation: ReservationCreate) -> ReservationOut:
         try:
-            logger.debug(f"Creating reservation with data: {reservation}")
+            logger.debug("Creating reservation with data: %s", reservation)
+            amenity_id = reservation.amenity_id
             new_reservation = Reservation(
                 user_id=reservation.user_id,
-                amenity_id=reservation.amenity_id,
+                amenity_id=amenity_id,
                 date=reservation.date,
                 start_time=reservation.start_time,
                 end_time=reservation.end_time,
                 status=reservation.status
             )
-            self.db.add(new_reservation)
-            await self.db.commit()
-            await self.db.refresh(new_reservation)
-            logger.info(f"Reservation created successfully: {new_reservation}")
+            async with _slot_lock(amenity_id, reservation.date):
+                try:
+                    if reservation.status not in RELEASED_STATUSES:
+                        await self._check_slot(amenity_id, reservation.date, reservation.start_time, reservation.end_time)
+                    self.db.add(new_reservation)
+                    await self.db.commit()
+                except Exception:
+                    await self.db.rollback()
+                    raise
+            logger.info("Reservation created successfully with ID: %s", new_reservation.id)
+            # One joined read-back for the user and amenity names
             return await self.get_reservation_by_id(new_reservation.id)
+        except HTTPException as e:
+            logger.warning("Reservation rejected: %s", e.detail)
+            raise
         except Exception as e:
-            logger.error(f"Error creating reservation: {str(e)}")
+            logger.error("Error creating reservation: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating reservation: {str(e)}")
 
-    async def get_reservation_by_id(self, reservation_id: int) -> ReservationOut:
+    async def create_reservations_bulk(self, reservations: List[ReservationCreate]) -> BulkResult[ReservationOut]:
+        """Check every slot and insert the accepted reservations in one transaction.
+
+        Items are checked in request order against the database and against the
+        items accepted before them, so two overlapping items in one request
+        cannot both be booked.
+        """
         try:
-            logger.debug(f"Fetching reservation with ID: {reservation_id}")
-            query = (
-                select(Reservation)
-                .options(
-                    joinedload(Reservation.user),
-                    joinedload(Reservation.amenity)
-                )
-                .where(Reservation.id == reservation_id)
+            logger.debug("Bulk creating %s reservations", len(reservations))
+            result = await self.db.execute(
+                select(User.id, User.name).where(User.id.in_({r.user_id for r in reservations}))
+            )
+            user_names = dict(result.all())
+            result = await self.db.execute(
+                select(Amenity.id, Amenity.name).where(Amenity.id.in_({r.amenity_id for r in reservations}))
+            )
+            amenity_names = dict(result.all())
+
+            errors = []
+            rows = []
+            accepted = {}  # (amenity_id, date) -> [(start_time, end_time)] booked by this request
+            async with AsyncExitStack() as stack:
+                # Sorted so two bulk requests never wait on each other's locks in opposite order
+                for key in sorted({(r.amenity_id, r.date) for r in reservations}):
+                    await stack.enter_async_context(_slot_lock(*key))
+                try:
+                    # Take the amenity row locks up front in id order; _check_slot's own
+                    # FOR UPDATE then only re-reads rows this transaction already holds
+                    locked = sorted({
+                        r.amenity_id for r in reservations
+                        if r.amenity_id in amenity_names and r.status not in RELEASED_STATUSES
+                    })
+                    if locked:
+                        await self.db.execute(
+                            select(Amenity.id).where(Amenity.id.in_(locked)).order_by(Amenity.id).with_for_update()
+                        )
+                    for index, reservation in enumerate(reservations):
+                        amenity_id = reservation.amenity_id
+                        if reservation.user_id not in user_names:
+                            errors.append(BulkItemError(index=index, detail="User not found"))
+                            continue
+                        if amenity_id not in amenity_names:
+                            errors.append(BulkItemError(index=index, detail="Amenity not found"))
+                            continue
+                        if reservation.status not in RELEASED_STATUSES:
+                            booked = accepted.setdefault((amenity_id, reservation.date), [])
+                            if any(start < reservation.end_time and end > reservation.start_time for start, end in booked):
+                                errors.append(BulkItemError(index=index, detail="The slot is already reserved"))
+                                continue
+                            try:
+                                await self._check_slot(amenity_id, reservation.date, reservation.start_time, reservation.end_time)
+                            except HTTPException as e:
+                                errors.append(BulkItemError(index=index, detail=e.detail))
+                                continue
+                            booked.append((reservation.start_time, reservation.end_time))
+                        rows.append({
+                            "user_id": reservation.user_id,
+                            "amenity_id": amenity_id,
+                            "date": reservation.date,
+                            "start_time": reservation.start_time,
+                            "end_time": reservation.end_time,
+                            "status": reservation.status,
+                        })
+
+                    if rows:
+                        await insert_rows(self.db, Reservation, rows)
+                    await self.db.commit()
+                except Exception:
+                    await self.db.rollback()
+                    raise
+            logger.info("Bulk created %s reservations, rejected %s", len(rows), len(errors))
+            return BulkResult[ReservationOut](
+                created=[
+                    ReservationOut(user_name=user_names[row["user_id"]], amenity_name=amenity_names[row["amenity_id"]], **row)
+                    for row in rows
+                ],
+                errors=errors,
             )
-            result = await self.db.execute(query)
-            reservation = result.scalars().first()
+        except Exception as e:
+            logger.error("Error bulk creating reservations: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error bulk creating reservations: {str(e)}")
+
+    async def get_reservation_by_id(self, reservation_id: int) -> ReservationOut:
+        try:
+            logger.debug("Fetching reservation with ID: %s", reservation_id)
+            result = await self.db.execute(_reservation_out_query().where(Reservation.id == reservation_id))
+            reservation = result.first()
 
             if not reservation:
-                logger.warning(f"Reservation not found with ID: {reservation_id}")
+                logger.warning("Reservation not found with ID: %s", reservation_id)
                 raise HTTPException(status_code=404, detail="Reservation not found")
 
-            logger.info(f"Reservation fetched successfully: {reservation}")
-            return ReservationOut.model_validate({
-                "id": reservation.id,
-                "date": reservation.date,
-                "start_time": reservation.start_time,
-                "end_time": reservation.end_time,
-                "status": reservation.status,
-                "user_name": reservation.user.name,
-                "amenity_name": reservation.amenity.name
-            })
+            logger.info("Reservation fetched successfully with ID: %s", reservation.id)
+            return ReservationOut.model_validate(reservation._asdict())
         except Exception as e:
-            logger.error(f"Error fetching reservation: {str(e)}")
+            logger.error("Error fetching reservation: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching reservation: {str(e)}")
 
-    async def get_reservations_by_user(self, user_id: int) -> List[ReservationOut]:
+    async def get_reservations_by_user(self, user_id: int, limit: int, after: str = None) -> Page[ReservationOut]:
+        # Latest reservation dates first
+        keys = [Reservation.date, Reservation.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug(f"Fetching reservations for user ID: {user_id}")
+            logger.debug("Fetching reservations for user ID: %s", user_id)
+            query = _reservation_out_query().where(Reservation.user_id == user_id)
+            result = await self.db.execute(keyset_query(query, keys, after_values, limit, descending=True))
+            reservations, next_cursor = split_page(result.all(), keys, limit)
+
+            if not reservations:
+               return Page[ReservationOut](items=[])
+
+            logger.info("Fetched %s reservations for user ID: %s", len(reservations), user_id)
+            return Page[ReservationOut](
+                items=[ReservationOut.model_validate(r._asdict()) for r in reservations],
+                next_cursor=next_cursor,
+            )
+        except Exception as e:
+            logger.error("Error fetching reservations: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error fetching reservations: {str(e)}")
+
+    async def stream_reservations_by_condo(self, condo_id: int, date_from: date = None, date_to: date = None):
+        """Yield reservation rows for every amenity of a condo from a server-side cursor."""
+        try:
+            logger.debug("Exporting reservations for condo ID: %s from %s to %s", condo_id, date_from, date_to)
             query = (
-                select(Reservation)
-                .options(
-                    joinedload(Reservation.user),
-                    joinedload(Reservation.amenity)
+                select(
+                    Reservation.id,
+                    Reservation.date,
+                    Reservation.start_time,
+                    Reservation.end_time,
+                    Reservation.status,
+                    Reservation.user_id,
+                    User.name.label("user_name"),
+                    Reservation.amenity_id,
+                    Amenity.name.label("amenity_name"),
                 )
-                .where(Reservation.user_id == user_id)
+                .join(User, User.id == Reservation.user_id)
+                .join(Amenity, Amenity.id == Reservation.amenity_id)
+                .where(Amenity.condo_id == condo_id)
             )
-            result = await self.db.execute(query)
-            reservations = result.scalars().all()
+            if date_from:
+                query = query.where(Reservation.date >= date_from)
+            if date_to:
+                query = query.where(Reservation.date <= date_to)
+            query = query.order_by(Reservation.date, Reservation.id).execution_options(yield_per=1000)
 
-            if not reservations:
-               return []
-
-            logger.info(f"Fetched {len(reservations)} reservations for user ID: {user_id}")
-            return [
-                ReservationOut.model_validate({
-                    "id": r.id,
-                    "date": r.date,
-                    "start_time": r.start_time,
-                    "end_time": r.end_time,
-                    "status": r.status,
-                    "user_name": r.user.name,
-                    "amenity_name": r.amenity.name
-                })
-                for r in reservations
-            ]
+            result = await self.db.stream(query)
+            count = 0
+            async for row in result.mappings():
+                count += 1
+                yield row
+            logger.info("Exported %s reservations for condo ID: %s", count, condo_id)
         except Exception as e:
-            logger.error(f"Error fetching reservations: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching reservations: {str(e)}")
+            logger.error("Error exporting reservations: %s", e)
+            raise
 
     async def update_reservation(self, reservation_id: int, data: ReservationUpdate) -> ReservationOut:
         try:
-            logger.debug(f"Updating reservation with ID: {reservation_id} and data: {data}")
-            query = select(Reservation).where(Reservation.id == reservation_id)
-            result = await self.db.execute(query)
-            reservation = result.scalars().first()
-
-            if not reservation:
-                logger.warning(f"Reservation not found with ID: {reservation_id}")
-                raise HTTPException(status_code=404, detail="Reservation not found")
+            logger.debug("Updating reservation with ID: %s and data: %s", reservation_id, data)
+            amenity_id = data.amenity_id
+            async with _slot_lock(amenity_id, data.date):
+                try:
+                    if data.status not in RELEASED_STATUSES:
+                        await self._check_slot(amenity_id, data.date, data.start_time, data.end_time, exclude_id=reservation_id)
 
-            reservation.user_id = data.user_id
-            reservation.amenity_id = data.amenity_id
-            reservation.date = data.date
-            reservation.start_time = data.start_time
-            reservation.end_time = data.end_time
-            reservation.status = data.status
+                    updated = await update_by_id(self.db, Reservation, reservation_id, {
+                        "user_id": data.user_id,
+                        "amenity_id": amenity_id,
+                        "date": data.date,
+                        "start_time": data.start_time,
+                        "end_time": data.end_time,
+                        "status": data.status,
+                    })
+                    if not updated:
+                        logger.warning("Reservation not found with ID: %s", reservation_id)
+                        raise HTTPException(status_code=404, detail="Reservation not found")
 
-            await self.db.commit()
-            await self.db.refresh(reservation)
-            logger.info(f"Reservation updated successfully: {reservation}")
-            return ReservationOut.model_validate(reservation)
+                    # Read back inside the transaction, then commit
+                    reservation_out = await self.get_reservation_by_id(reservation_id)
+                    await self.db.commit()
+                except Exception:
+                    await self.db.rollback()
+                    raise
+            logger.info("Reservation updated successfully with ID: %s", reservation_id)
+            return reservation_out
+        except HTTPException as e:
+            logger.warning("Reservation update rejected: %s", e.detail)
+            raise
         except Exception as e:
-            logger.error(f"Error updating reservation: {str(e)}")
+            logger.error("Error updating reservation: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating reservation: {str(e)}")
 
     async def delete_reservation(self, reservation_id: int):
         try:
-            logger.debug(f"Deleting reservation with ID: {reservation_id}")
-            query = select(Reservation).where(Reservation.id == reservation_id)
-            result = await self.db.execute(query)
-            reservation = result.scalars().first()
-
-            if not reservation:
-                logger.warning(f"Reservation not found with ID: {reservation_id}")
+            logger.debug("Deleting reservation with ID: %s", reservation_id)
+            if not await delete_by_id(self.db, Reservation, reservation_id):
+                logger.warning("Reservation not found with ID: %s", reservation_id)
                 raise HTTPException(status_code=404, detail="Reservation not found")
 
-            await self.db.delete(reservation)
             await self.db.commit()
-            logger.info(f"Reservation deleted successfully with ID: {reservation_id}")
+            logger.info("Reservation deleted successfully with ID: %s", reservation_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting reservation: {str(e)}")
+            logger.error("Error deleting reservation: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting reservation: {str(e)}")
@@ -2,106 +2,144 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 from app.models.user import User
-from app.schemas.user import UserCreate, UserOut
+from app.schemas.user import UserCreate, UserOut, UserUpdate
+from app.schemas.pagination import Page
+from app.utils.pagination import decode_cursor, keyset_query, merge_pages, split_page
+from app.db.db import shards
 from typing import List
 from app.utils.logger import logger  # Import the logger
+from app.utils.writes import update_by_id, delete_by_id
 
 class UserCRUD:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _check_email_free(self, email: str, user_id: int = None):
+        """The unique index only covers one database; with shards, ask every one first."""
+        if not shards.sharded:
+            return
+        query = select(User.id).where(User.email == email)
+        if user_id is not None:
+            query = query.where(User.id != user_id)
+
+        async def find(db: AsyncSession):
+            result = await db.execute(query)
+            return result.first()
+
+        if any(await shards.fan_out(find, read_only=False)):
+            logger.warning("Email already registered: %s", email)
+            raise HTTPException(status_code=409, detail="Email already registered")
+
     async def create_user(self, user: UserCreate) -> UserOut:
         try:
-            logger.debug(f"Creating user with data: {user}")
+            logger.debug("Creating user with data: %s", user)
+            await self._check_email_free(user.email)
             new_user = User(
                 name=user.name,
                 email=user.email,
+                # Stored as the client sends it, as before; clients send the bcrypt hash
                 password_hash=user.password,
                 condo_id=user.condo_id,
                 unit=user.unit
             )
             self.db.add(new_user)
             await self.db.commit()
-            await self.db.refresh(new_user)
-            logger.info(f"User created successfully: {new_user}")
+            logger.info("User created successfully with ID: %s", new_user.id)
             return UserOut.model_validate(new_user)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error creating user: {str(e)}")
+            logger.error("Error creating user: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
 
     async def get_user(self, user_id: int) -> UserOut:
         try:
-            logger.debug(f"Fetching user with ID: {user_id}")
+            logger.debug("Fetching user with ID: %s", user_id)
             result = await self.db.execute(select(User).where(User.id == user_id))
             user_data = result.scalars().first()
             if not user_data:
-                logger.warning(f"User not found with ID: {user_id}")
+                logger.warning("User not found with ID: %s", user_id)
                 raise HTTPException(status_code=404, detail="User not found")
-            logger.info(f"User fetched successfully: {user_data}")
+            logger.info("User fetched successfully with ID: %s", user_data.id)
             return UserOut.model_validate(user_data)
         except Exception as e:
-            logger.error(f"Error fetching user: {str(e)}")
+            logger.error("Error fetching user: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching user: {str(e)}")
 
-    async def get_all_users(self) -> List[UserOut]:
+    async def get_all_users(self, limit: int, after: str = None) -> Page[UserOut]:
+        keys = [User.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug("Fetching all users")
-            result = await self.db.execute(select(User))
-            users_data = result.scalars().all()
-            logger.info(f"Fetched {len(users_data)} users")
-            return [UserOut.model_validate(user) for user in users_data]
+            logger.debug("Fetching users page after: %s", after)
+            query = keyset_query(select(User), keys, after_values, limit)
+
+            async def fetch(db: AsyncSession):
+                result = await db.execute(query)
+                return result.scalars().all()
+
+            # Users of every condo: ask all shards at once
+            users_data, next_cursor = merge_pages(await shards.fan_out(fetch, session=self.db), keys, limit)
+            logger.info("Fetched %s users", len(users_data))
+            return Page[UserOut](items=[UserOut.model_validate(user) for user in users_data], next_cursor=next_cursor)
         except Exception as e:
-            logger.error(f"Error fetching users: {str(e)}")
+            logger.error("Error fetching users: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching users: {str(e)}")
 
-    async def get_users_by_condo(self, condo_id: int) -> List[UserOut]:
+    async def get_users_by_condo(self, condo_id: int, limit: int, after: str = None) -> Page[UserOut]:
+        keys = [User.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug(f"Fetching users for condo ID: {condo_id}")
-            result = await self.db.execute(select(User).filter(User.condo_id == condo_id))
-            users_data = result.scalars().all()
-            logger.info(f"Fetched {len(users_data)} users for condo ID: {condo_id}")
-            return [UserOut.model_validate(user) for user in users_data]
+            logger.debug("Fetching users for condo ID: %s", condo_id)
+            query = keyset_query(select(User).filter(User.condo_id == condo_id), keys, after_values, limit)
+            result = await self.db.execute(query)
+            users_data, next_cursor = split_page(result.scalars().all(), keys, limit)
+            logger.info("Fetched %s users for condo ID: %s", len(users_data), condo_id)
+            return Page[UserOut](items=[UserOut.model_validate(user) for user in users_data], next_cursor=next_cursor)
         except Exception as e:
-            logger.error(f"Error fetching users by condo: {str(e)}")
+            logger.error("Error fetching users by condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching users by condo: {str(e)}")
 
-    async def update_user(self, user_id: int, user: UserCreate) -> UserOut:
+    async def update_user(self, user_id: int, user: UserUpdate) -> UserOut:
         try:
-            logger.debug(f"Updating user with ID: {user_id} and data: {user}")
-            result = await self.db.execute(select(User).filter(User.id == user_id))
-            db_user = result.scalars().first()
+            logger.debug("Updating user with ID: %s", user_id)
+            # Only the fields sent by the client are written
+            values = user.model_dump(exclude_unset=True, exclude={"password"})
+            if values.get("email"):
+                await self._check_email_free(values["email"], user_id)
+            if user.password:
+                values["password_hash"] = user.password
 
-            if not db_user:
-                logger.warning(f"User not found with ID: {user_id}")
+            if values and not await update_by_id(self.db, User, user_id, values):
+                logger.warning("User not found with ID: %s", user_id)
                 raise HTTPException(status_code=404, detail="User not found")
 
-            db_user.name = user.name
-            db_user.email = user.email
-            db_user.password_hash = user.password
-            db_user.condo_id = user.condo_id
-            db_user.unit = user.unit
-
+            # Read back inside the transaction, then commit
+            result = await self.db.execute(select(User.name, User.email, User.unit).where(User.id == user_id))
+            db_user = result.first()
+            if not db_user:
+                logger.warning("User not found with ID: %s", user_id)
+                raise HTTPException(status_code=404, detail="User not found")
             await self.db.commit()
-            await self.db.refresh(db_user)
-            logger.info(f"User updated successfully: {db_user}")
+            logger.info("User updated successfully with ID: %s", user_id)
             return UserOut.model_validate(db_user)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error updating user: {str(e)}")
+            logger.error("Error updating user: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating user: {str(e)}")
 
     async def delete_user(self, user_id: int):
         try:
-            logger.debug(f"Deleting user with ID: {user_id}")
-            result = await self.db.execute(select(User).filter(User.id == user_id))
-            db_user = result.scalars().first()
-
-            if not db_user:
-                logger.warning(f"User not found with ID: {user_id}")
+            logger.debug("Deleting user with ID: %s", user_id)
+            # Reservations go with it through ON DELETE CASCADE
+            if not await delete_by_id(self.db, User, user_id):
+                logger.warning("User not found with ID: %s", user_id)
                 raise HTTPException(status_code=404, detail="User not found")
 
-            await self.db.delete(db_user)
             await self.db.commit()
-            logger.info(f"User deleted successfully with ID: {user_id}")
+            logger.info("User deleted successfully with ID: %s", user_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting user: {str(e)}")
+            logger.error("Error deleting user: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting user: {str(e)}")
@@ -1,19 +1,51 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, or_
 from fastapi import HTTPException
 from typing import List
+from datetime import date
+from app.models.condo import Condo
+from app.models.user import User
 from app.models.visitor import Visitor
-from app.schemas.visitor import VisitorCreate, VisitorUpdate, VisitorOut
+from app.schemas.visitor import VisitorCreate, VisitorUpdate, VisitorOut, VisitorStatus
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkItemError, BulkResult
+from app.utils.pagination import decode_cursor, keyset_query, split_page
+from app.utils.bulk import insert_rows
+from app.utils.writes import update_by_id, delete_by_id
+from app.utils.gate_index import GateIndex, normalize_plate
+from app.utils.gate_snapshot import GateSnapshots, Snapshot, SNAPSHOT_KEYS, STATUS_CODES
 from app.utils.logger import logger
 
 
+VISITOR_EXPORT_FIELDS = [
+    "id", "visit_name", "identification", "plate", "visit_date",
+    "status", "unit_number", "user_id", "condo_id",
+]
+
+# Today's visitors per condo, for plate/ID checks at the gate
+gate_index = GateIndex()
+# Compact visitor lists for the gate tablets, per condo and date window
+gate_snapshots = GateSnapshots()
+
+
+def _record_visitor(visitor: VisitorOut):
+    gate_index.record(visitor)
+    gate_snapshots.record(visitor)
+
+
+def _discard_visitor(visitor_id: int):
+    gate_index.discard(visitor_id)
+    gate_snapshots.discard(visitor_id)
+
+
 class VisitorsCRUD:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_visitor(self, visitor: VisitorCreate) -> VisitorOut:
         try:
-            logger.debug(f"Creating visitor with data: {visitor}")
+            logger.debug("Creating visitor with data: %s", visitor)
             new_visitor = Visitor(
                 identification=visitor.identification,
                 user_id=visitor.user_id,
@@ -26,98 +58,216 @@ class VisitorsCRUD:
             )
             self.db.add(new_visitor)
             await self.db.commit()
-            await self.db.refresh(new_visitor)
-            logger.info(f"Visitor created successfully: {new_visitor}")
-            return VisitorOut.model_validate(new_visitor)
+            logger.info("Visitor created successfully with ID: %s", new_visitor.id)
+            visitor_out = VisitorOut.model_validate(new_visitor)
+            _record_visitor(visitor_out)
+            return visitor_out
         except Exception as e:
-            logger.error(f"Error creating visitor: {str(e)}")
+            logger.error("Error creating visitor: %s", e)
             raise HTTPException(status_code=500, detail=f"Error creating visitor: {str(e)}")
 
+    async def create_visitors_bulk(self, visitors: List[VisitorCreate]) -> BulkResult[VisitorOut]:
+        """Insert every valid visitor in one transaction and report the rest per item."""
+        try:
+            logger.debug("Bulk creating %s visitors", len(visitors))
+            user_ids = await self.db.execute(select(User.id).where(User.id.in_({v.user_id for v in visitors})))
+            user_ids = set(user_ids.scalars().all())
+            condo_ids = await self.db.execute(select(Condo.id).where(Condo.id.in_({v.condo_id for v in visitors})))
+            condo_ids = set(condo_ids.scalars().all())
+
+            errors = []
+            rows = []
+            for index, visitor in enumerate(visitors):
+                if visitor.user_id not in user_ids:
+                    errors.append(BulkItemError(index=index, detail="User not found"))
+                elif visitor.condo_id not in condo_ids:
+                    errors.append(BulkItemError(index=index, detail="Condo not found"))
+                else:
+                    rows.append(visitor.model_dump())
+
+            ids = []
+            if rows:
+                ids = await insert_rows(self.db, Visitor, rows)
+                await self.db.commit()
+            logger.info("Bulk created %s visitors, rejected %s", len(rows), len(errors))
+            created = [VisitorOut(id=visitor_id, **row) for visitor_id, row in zip(ids, rows)]
+            for visitor_out in created:
+                _record_visitor(visitor_out)
+            return BulkResult[VisitorOut](created=created, errors=errors)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Error bulk creating visitors: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error bulk creating visitors: {str(e)}")
+
     async def get_visitor_by_id(self, visitor_id: int) -> VisitorOut:
         try:
-            logger.debug(f"Fetching visitor with ID: {visitor_id}")
+            logger.debug("Fetching visitor with ID: %s", visitor_id)
             query = select(Visitor).where(Visitor.id == visitor_id)
             result = await self.db.execute(query)
             visitor = result.scalars().first()
 
             if not visitor:
-                logger.warning(f"Visitor not found with ID: {visitor_id}")
+                logger.warning("Visitor not found with ID: %s", visitor_id)
                 raise HTTPException(status_code=404, detail="Visitor not found")
 
-            logger.info(f"Visitor fetched successfully: {visitor}")
+            logger.info("Visitor fetched successfully with ID: %s", visitor.id)
             return VisitorOut.model_validate(visitor)
         except Exception as e:
-            logger.error(f"Error fetching visitor: {str(e)}")
+            logger.error("Error fetching visitor: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching visitor: {str(e)}")
 
-    async def get_visitors_by_user(self, user_id: int) -> List[VisitorOut]:
+    async def get_visitors_by_user(self, user_id: int, limit: int, after: str = None) -> Page[VisitorOut]:
+        # Newest visits first
+        keys = [Visitor.visit_date, Visitor.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug(f"Fetching visitors for user ID: {user_id}")
-            query = select(Visitor).where(Visitor.user_id == user_id)
+            logger.debug("Fetching visitors for user ID: %s", user_id)
+            query = keyset_query(select(Visitor).where(Visitor.user_id == user_id), keys, after_values, limit, descending=True)
             result = await self.db.execute(query)
-            visitors = result.scalars().all()
+            visitors, next_cursor = split_page(result.scalars().all(), keys, limit)
 
-            logger.info(f"Fetched {len(visitors)} visitors for user ID: {user_id}")
-            return [VisitorOut.model_validate(v) for v in visitors]
+            logger.info("Fetched %s visitors for user ID: %s", len(visitors), user_id)
+            return Page[VisitorOut](items=[VisitorOut.model_validate(v) for v in visitors], next_cursor=next_cursor)
         except Exception as e:
-            logger.error(f"Error fetching visitors: {str(e)}")
+            logger.error("Error fetching visitors: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching visitors: {str(e)}")
 
-    async def get_visitors_by_condo(self, condo_id: int) -> List[VisitorOut]:
+    async def get_visitors_by_condo(self, condo_id: int, limit: int, after: str = None) -> Page[VisitorOut]:
+        # Newest visits first
+        keys = [Visitor.visit_date, Visitor.id]
+        after_values = decode_cursor(after, keys)
         try:
-            logger.debug(f"Fetching visitors for condo ID: {condo_id}")
-            query = select(Visitor).where(Visitor.condo_id == condo_id)
+            logger.debug("Fetching visitors for condo ID: %s", condo_id)
+            query = keyset_query(select(Visitor).where(Visitor.condo_id == condo_id), keys, after_values, limit, descending=True)
             result = await self.db.execute(query)
-            visitors = result.scalars().all()
+            visitors, next_cursor = split_page(result.scalars().all(), keys, limit)
 
-            logger.info(f"Fetched {len(visitors)} visitors for condo ID: {condo_id}")
-            return [VisitorOut.model_validate(v) for v in visitors]
+            logger.info("Fetched %s visitors for condo ID: %s", len(visitors), condo_id)
+            return Page[VisitorOut](items=[VisitorOut.model_validate(v) for v in visitors], next_cursor=next_cursor)
         except Exception as e:
-            logger.error(f"Error fetching visitors by condo: {str(e)}")
+            logger.error("Error fetching visitors by condo: %s", e)
             raise HTTPException(status_code=500, detail=f"Error fetching visitors by condo: {str(e)}")
 
-    async def update_visitor(self, visitor_id: int, data: VisitorUpdate) -> VisitorOut:
+    async def lookup_visitors(self, condo_id: int, visit_date: date, plate: str = None, identification: str = None, status: VisitorStatus = None) -> List[VisitorOut]:
+        """A condo's visitors of one day matching a plate or an identification, of any status unless given.
+
+        Plates match regardless of case, spaces and dashes (normalize_plate).
+        Today's lookups are answered from the gate index. A miss there, or any
+        other day, goes to the database through the (condo_id, visit_date, plate)
+        index, since the visitor may have been written by another worker.
+        """
         try:
-            logger.debug(f"Updating visitor with ID: {visitor_id} and data: {data}")
-            query = select(Visitor).where(Visitor.id == visitor_id)
+            logger.debug("Gate lookup for condo ID: %s on %s, plate: %s, identification: %s, status: %s", condo_id, visit_date, plate, identification, status)
+            if gate_index.enabled and visit_date == date.today():
+                entry = gate_index.get(condo_id, visit_date)
+                built = entry is None
+                if built:
+                    result = await self.db.execute(
+                        select(Visitor).where(Visitor.condo_id == condo_id, Visitor.visit_date == visit_date)
+                    )
+                    entry = gate_index.build(condo_id, visit_date, [VisitorOut.model_validate(v) for v in result.scalars().all()])
+                    logger.info("Built gate index for condo ID: %s with %s visitors", condo_id, len(entry.visitors))
+                visitors = entry.lookup(plate, identification, status)
+                # A freshly built entry already reflects the database
+                if visitors or built:
+                    return visitors
+
+            matches = []
+            if plate:
+                # The same normalization as the index, in SQL; the condo and day narrow the rows first
+                stored_plate = func.upper(func.replace(func.replace(Visitor.plate, " ", ""), "-", ""))
+                matches.append(stored_plate == normalize_plate(plate))
+            if identification:
+                matches.append(Visitor.identification == identification)
+            query = select(Visitor).where(Visitor.condo_id == condo_id, Visitor.visit_date == visit_date, or_(*matches))
+            if status is not None:
+                query = query.where(Visitor.status == status)
+            result = await self.db.execute(query.order_by(Visitor.id))
+            visitors = [VisitorOut.model_validate(v) for v in result.scalars().all()]
+            for visitor_out in visitors:
+                gate_index.record(visitor_out)
+            logger.info("Gate lookup for condo ID: %s found %s visitors in the database", condo_id, len(visitors))
+            return visitors
+        except Exception as e:
+            logger.error("Error looking up visitors: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error looking up visitors: {str(e)}")
+
+    async def get_visitor_snapshot(self, condo_id: int, date_from: date, date_to: date) -> Snapshot:
+        """The gate snapshot of a condo's window, loaded once and then kept current by writes."""
+        try:
+            snapshot = gate_snapshots.get(condo_id, date_from, date_to)
+            if snapshot is not None:
+                return snapshot
+            logger.debug("Building visitor snapshot for condo ID: %s from %s to %s", condo_id, date_from, date_to)
+            query = select(*[getattr(Visitor, field) for field in SNAPSHOT_KEYS.values()]).where(
+                Visitor.condo_id == condo_id,
+                Visitor.visit_date >= date_from,
+                Visitor.visit_date <= date_to,
+                Visitor.status.in_(list(STATUS_CODES)),
+            )
             result = await self.db.execute(query)
-            visitor = result.scalars().first()
+            snapshot = gate_snapshots.build(condo_id, date_from, date_to, result.all())
+            logger.info("Built visitor snapshot for condo ID: %s with %s visitors", condo_id, len(snapshot.rows))
+            return snapshot
+        except Exception as e:
+            logger.error("Error building visitor snapshot: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error building visitor snapshot: {str(e)}")
 
-            if not visitor:
-                logger.warning(f"Visitor not found with ID: {visitor_id}")
-                raise HTTPException(status_code=404, detail="Visitor not found")
+    async def stream_visitors_by_condo(self, condo_id: int, date_from: date = None, date_to: date = None):
+        """Yield visitor rows from a server-side cursor without loading the whole history."""
+        try:
+            logger.debug("Exporting visitors for condo ID: %s from %s to %s", condo_id, date_from, date_to)
+            query = select(*[getattr(Visitor, field) for field in VISITOR_EXPORT_FIELDS]).where(Visitor.condo_id == condo_id)
+            if date_from:
+                query = query.where(Visitor.visit_date >= date_from)
+            if date_to:
+                query = query.where(Visitor.visit_date <= date_to)
+            query = query.order_by(Visitor.visit_date, Visitor.id).execution_options(yield_per=1000)
+
+            result = await self.db.stream(query)
+            count = 0
+            async for row in result.mappings():
+                count += 1
+                yield row
+            logger.info("Exported %s visitors for condo ID: %s", count, condo_id)
+        except Exception as e:
+            logger.error("Error exporting visitors: %s", e)
+            raise
 
-            visitor.identification = data.identification
-            visitor.user_id = data.user_id
-            visitor.condo_id = data.condo_id
-            visitor.plate = data.plate
-            visitor.visit_date = data.visit_date
-            visitor.status = data.status
-            visitor.unit_number = data.unit_number
-            visitor.visit_name = data.visit_name  # ✅ Added field
+    async def update_visitor(self, visitor_id: int, data: VisitorUpdate) -> VisitorOut:
+        try:
+            logger.debug("Updating visitor with ID: %s and data: %s", visitor_id, data)
+            # VisitorUpdate carries no user_id/condo_id; a visitor stays with its resident
+            if not await update_by_id(self.db, Visitor, visitor_id, data.model_dump()):
+                logger.warning("Visitor not found with ID: %s", visitor_id)
+                raise HTTPException(status_code=404, detail="Visitor not found")
 
+            # Read back inside the transaction, then commit
+            result = await self.db.execute(select(Visitor).where(Visitor.id == visitor_id))
+            visitor = result.scalars().first()
             await self.db.commit()
-            await self.db.refresh(visitor)
-            logger.info(f"Visitor updated successfully: {visitor}")
-            return VisitorOut.model_validate(visitor)
+            logger.info("Visitor updated successfully with ID: %s", visitor.id)
+            visitor_out = VisitorOut.model_validate(visitor)
+            _record_visitor(visitor_out)
+            return visitor_out
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error updating visitor: {str(e)}")
+            logger.error("Error updating visitor: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating visitor: {str(e)}")
 
     async def delete_visitor(self, visitor_id: int):
         try:
-            logger.debug(f"Deleting visitor with ID: {visitor_id}")
-            query = select(Visitor).where(Visitor.id == visitor_id)
-            result = await self.db.execute(query)
-            visitor = result.scalars().first()
-
-            if not visitor:
-                logger.warning(f"Visitor not found with ID: {visitor_id}")
+            logger.debug("Deleting visitor with ID: %s", visitor_id)
+            if not await delete_by_id(self.db, Visitor, visitor_id):
+                logger.warning("Visitor not found with ID: %s", visitor_id)
                 raise HTTPException(status_code=404, detail="Visitor not found")
 
-            await self.db.delete(visitor)
             await self.db.commit()
-            logger.info(f"Visitor deleted successfully with ID: {visitor_id}")
+            _discard_visitor(visitor_id)
+            logger.info("Visitor deleted successfully with ID: %s", visitor_id)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error deleting visitor: {str(e)}")
+            logger.error("Error deleting visitor: %s", e)
             raise HTTPException(status_code=500, detail=f"Error deleting visitor: {str(e)}")
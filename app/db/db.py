@@ -1,9 +1,17 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from fastapi import HTTPException, Request
+import asyncio
+import hashlib
+import itertools
 import os
 from dotenv import load_dotenv
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Column, Integer, event, literal_column, select, text
+from sqlalchemy.orm import DeclarativeBase, Session
+from app.db.pool_metrics import PoolMetrics, PoolAutosizer, InstrumentedAsyncQueuePool
+from app.db.profiler import StatementProfiler
+from app.utils.timing import attach_db_timing
+from app.utils.cache import TTLCache
+from app.utils.jwt import verify_token
 
 # Load environment variables
 load_dotenv()
@@ -11,54 +19,347 @@ load_dotenv()
 class Base(DeclarativeBase):
     pass
 
+
+def row_version_column() -> Column:
+    """Counter bumped by every UPDATE, ORM or Core, for ETags that need no serialising."""
+    return Column(Integer, nullable=False, default=1, server_default=text("1"), onupdate=literal_column("version") + 1)
+
+class PrimarySession(Session):
+    """Session class of the primary, remembering whether it committed."""
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _mark_committed(session):
+    session.info["committed"] = True
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 class AsyncDatabase:
-    def __init__(self):
+    def __init__(self, url: str = None, read_urls: list = None, name: str = "default", profiler: StatementProfiler = None):
+        self.name = name
         self.engine = None
         self.SessionLocal = None
         self.host = os.getenv("DB_HOST")
         self.user = os.getenv("DB_USER")
         self.password = os.getenv("DB_PASSWORD")
         self.database = os.getenv("DB_NAME")
-        self.port = int(os.getenv("DB_PORT"))
-        if os.getenv("DB_DEV_URL"):
+        self.port = int(os.getenv("DB_PORT", "3306"))
+        if url:
+            self.DATABASE_URI = url
+        elif os.getenv("DB_DEV_URL"):
             self.DATABASE_URI = os.getenv("DB_DEV_URL")
         else:
             self.DATABASE_URI = os.getenv("DB_URL")
+        # Read replicas, comma separated; without any every read goes to the primary
+        if read_urls is None:
+            read_urls = [url.strip() for url in os.getenv("DB_READ_URLS", "").split(",") if url.strip()]
+        self.READ_URIS = read_urls
+        self.reader_engines = []
+        self.ReadSessionLocals = []
+        self._next_reader = None
+
+        # Pool settings, tunable per deployment
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        self.pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+        self.pool_pre_ping = _env_bool("DB_POOL_PRE_PING", True)
+        self.echo = _env_bool("DB_ECHO", False)
+
+        self.metrics = PoolMetrics()
+        self.autosizer = PoolAutosizer(self.metrics, name=name)
+        self.profiler = profiler or StatementProfiler()
+
+        # Clients that just wrote keep reading from the primary until replicas catch up
+        self.pin_seconds = float(os.getenv("DB_READ_AFTER_WRITE_PIN", "5"))
+        self.pins = TTLCache(maxsize=int(os.getenv("DB_READ_PIN_CACHE_SIZE", "10000")), ttl=self.pin_seconds, name="replica_pins" if name == "default" else f"replica_pins_{name}")
+
+    def engine_options(self, url: str = None) -> dict:
+        options = {"echo": self.echo, "pool_pre_ping": self.pool_pre_ping}
+        # SQLite (used for local benchmarks) does not take QueuePool sizing arguments
+        if not (url or self.DATABASE_URI).startswith("sqlite"):
+            options.update(
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+                pool_recycle=self.pool_recycle,
+            )
+        return options
 
     async def connect(self):
+        if self.engine is not None:
+            return
         try:
             # Create an async engine
-            self.engine = create_async_engine(
-                self.DATABASE_URI, 
-                pool_size=10,         
-                max_overflow=20,      
-                pool_timeout=30,      
-                pool_recycle=3600,    
-                echo=True             
-            )
+            self.engine = create_async_engine(self.DATABASE_URI, **self.engine_options())
+            self.metrics.attach(self.engine)
+            attach_db_timing(self.engine, self.profiler)
             # Create a session maker
-            self.SessionLocal = sessionmaker(
+            self.SessionLocal = async_sessionmaker(
                 bind=self.engine,
-                class_=AsyncSession,  
+                class_=AsyncSession,
+                sync_session_class=PrimarySession,
                 expire_on_commit=False
             )
+            for url in self.READ_URIS:
+                engine = create_async_engine(url, **self.engine_options(url))
+                attach_db_timing(engine, self.profiler)
+                self.reader_engines.append(engine)
+                self.ReadSessionLocals.append(async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+            self._next_reader = itertools.cycle(self.ReadSessionLocals)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Could not connect to database: {str(e)}")
 
-    async def get_session(self) -> AsyncSession:
+    async def close(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+        for engine in self.reader_engines:
+            await engine.dispose()
+        self.engine = None
+        self.SessionLocal = None
+        self.reader_engines = []
+        self.ReadSessionLocals = []
+        self._next_reader = None
+
+    async def get_session(self, read_only: bool = False) -> AsyncSession:
+        """A primary session, or with read_only a replica session (round robin) when replicas exist.
+
+        The session's info["read_only"] keeps the choice, for ShardRouter.fan_out.
+        """
         if not self.SessionLocal:
             await self.connect()
-        return self.SessionLocal()
+        if read_only and self.ReadSessionLocals:
+            session = next(self._next_reader)()
+        else:
+            session = self.SessionLocal()
+        session.info["read_only"] = read_only
+        return session
+
+    def pin_to_primary(self, client: bytes):
+        self.pins.set(client, True)
+
+    def is_pinned(self, client: bytes) -> bool:
+        return self.pins.get(client) is not None
 
     async def __aenter__(self):
         await self.connect()
-        return await self.get_session()
+        return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if self.engine:
-            await self.engine.dispose()
+        await self.close()
+
+class ShardRouter:
+    """Maps a condo to the database holding its rows.
+
+    The default database (DB_URL) is always the first shard; DB_SHARDS adds
+    more as "name=url,name=url". A condo lives where DB_SHARD_MAP puts it
+    ("condo_id=name,..."), otherwise on shard (condo_id - 1) % shard count.
+    That default matches MySQL servers configured with
+    auto_increment_increment = shard count and auto_increment_offset =
+    shard position + 1, which also keeps ids unique across shards, so a
+    condo created on a shard is placed back on it, merged listings can
+    page by id and locate() can find a row by id alone. With those
+    settings a multi-row INSERT's ids step by the shard count, which is
+    why insert_rows reads them back instead of counting up from the first.
+    Every table carries condo_id directly or through its parent, so a
+    condo's rows never span shards.
+
+    A shard's read replicas come from DB_READ_URLS_<NAME> (e.g.
+    DB_READ_URLS_B); the default shard keeps DB_READ_URLS. User emails
+    must be unique across shards, since login looks a user up on all of
+    them; UserCRUD checks the other shards before writing one.
+    """
+
+    def __init__(self, default: AsyncDatabase):
+        self.shards = {default.name: default}
+        for item in filter(None, os.getenv("DB_SHARDS", "").split(",")):
+            name, _, url = item.partition("=")
+            name = name.strip()
+            read_urls = [read_url.strip() for read_url in os.getenv(f"DB_READ_URLS_{name.upper()}", "").split(",") if read_url.strip()]
+            self.shards[name] = AsyncDatabase(url=url.strip(), read_urls=read_urls, name=name, profiler=default.profiler)
+        self.order = list(self.shards.values())
+        self.placement = {}
+        for item in filter(None, os.getenv("DB_SHARD_MAP", "").split(",")):
+            condo_id, _, name = item.partition("=")
+            self.placement[int(condo_id)] = self.shards[name.strip()]
+        # (table, id) -> shard; rows never move between shards
+        self.locations = TTLCache(maxsize=int(os.getenv("DB_SHARD_LOCATION_CACHE_SIZE", "10000")), ttl=3600, name="shard_locations")
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.order) > 1
+
+    def for_condo(self, condo_id: int = None) -> AsyncDatabase:
+        if condo_id is None or not self.sharded:
+            return self.order[0]
+        placed = self.placement.get(condo_id)
+        if placed is not None:
+            return placed
+        return self.order[(condo_id - 1) % len(self.order)]
+
+    async def connect(self):
+        """Connect every shard and start its pool autosizer (a no-op unless DB_POOL_AUTOSIZE is set)."""
+        for shard in self.order:
+            await shard.connect()
+            shard.autosizer.start()
+
+    async def close(self):
+        for shard in self.order:
+            await shard.autosizer.stop()
+            await shard.close()
+
+    def is_pinned(self, client: bytes) -> bool:
+        """Whether the client wrote to any shard within its read-after-write window."""
+        return any(shard.is_pinned(client) for shard in self.order)
+
+    async def fan_out(self, fn, session: AsyncSession = None, read_only: bool = None) -> list:
+        """Run `fn(session)` on every shard concurrently, one result per shard.
+
+        Unsharded, `fn` runs once on `session` when one is given. Shard
+        sessions are closed before returning. They are read-only when the
+        caller's session is, so a client pinned to the primaries stays
+        there; without a session, unless `read_only` says otherwise.
+        """
+        if not self.sharded and session is not None:
+            return [await fn(session)]
+        if read_only is None:
+            read_only = session.info.get("read_only", False) if session is not None else True
+        sessions = [await shard.get_session(read_only=read_only) for shard in self.order]
+        try:
+            return await asyncio.gather(*(fn(shard_session) for shard_session in sessions))
+        finally:
+            for shard_session in sessions:
+                await shard_session.close()
+
+    async def locate(self, table_name: str, row_id: int):
+        """The shard holding row `row_id` of `table_name`, or None if no shard has it.
+
+        Asks the primaries, so a row created a moment ago is found too.
+        """
+        key = (table_name, row_id)
+        shard = self.locations.get(key)
+        if shard is not None:
+            return shard
+        table = Base.metadata.tables[table_name]
+        query = select(table.c.id).where(table.c.id == row_id)
+
+        async def find(session: AsyncSession) -> bool:
+            result = await session.execute(query)
+            return result.first() is not None
+
+        hits = await self.fan_out(find, read_only=False)
+        shard = next((shard for shard, hit in zip(self.order, hits) if hit), None)
+        if shard is not None:
+            self.locations.set(key, shard)
+        return shard
+
+
+# Application-wide database, connected and disposed by the app lifespan
+database = AsyncDatabase()
+# The shards, database first; with no DB_SHARDS it is the only one
+shards = ShardRouter(database)
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _client_key(request: Request) -> bytes:
+    # The bearer token identifies the user across requests; anonymous callers by address.
+    # Hashed like the token cache's keys, so the pin cache holds no usable credentials.
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).digest()
+    return (request.client.host if request.client else "").encode()
+
+
+# Path and body fields naming a row by id, and its table; the row's shard is the request's
+ROUTING_FIELDS = {
+    "user_id": "users",
+    "visitor_id": "visitors",
+    "amenity_id": "amenities",
+    "block_id": "blocks",
+    "reservation_id": "reservations",
+}
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _routing_keys(values: dict, condo_ids: set, rows: set):
+    for field, value in values.items():
+        value = _as_int(value)
+        if value is None:
+            continue
+        if field == "condo_id":
+            condo_ids.add(value)
+        elif field in ROUTING_FIELDS:
+            rows.add((ROUTING_FIELDS[field], value))
+
+
+def _token_condo(request: Request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    credentials = verify_token(token) if scheme.lower() == "bearer" and token else None
+    return _as_int(credentials.get("condo_id")) if credentials else None
+
+
+async def _request_shard(request: Request) -> AsyncDatabase:
+    """The shard of the condo a request works on.
+
+    The condo_id of the path or of a JSON body (an object or a list of
+    them, as the bulk routes take) places the request; ids in the path,
+    like /visitors/{visitor_id}, are located on the shards. Ids in the body,
+    like a reservation's user_id and amenity_id, are located only when
+    nothing carries a condo_id. With none of those, the caller's token
+    condo decides. A request whose keys live on different shards cannot
+    run in one transaction and is rejected with 400.
+    """
+    condo_ids, path_rows, body_rows = set(), set(), set()
+    _routing_keys(request.path_params, condo_ids, path_rows)
+    if request.method not in READ_METHODS and "json" in request.headers.get("content-type", ""):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None  # FastAPI reports the malformed body itself
+        for item in body if isinstance(body, list) else [body]:
+            if isinstance(item, dict):
+                _routing_keys(item, condo_ids, body_rows)
+    found = {shards.for_condo(condo_id) for condo_id in condo_ids}
+    for table_name, row_id in path_rows | (body_rows if not condo_ids else set()):
+        shard = await shards.locate(table_name, row_id)
+        if shard is not None:
+            found.add(shard)
+    if len(found) > 1:
+        raise HTTPException(status_code=400, detail="The request refers to condos on different shards")
+    return found.pop() if found else shards.for_condo(_token_condo(request))
+
 
 # Dependency function to get session
-async def get_db_session():
-    async with AsyncDatabase() as db_session:
-        yield db_session
+async def get_db_session(request: Request):
+    """Replica session for reads, primary session for writes, on the request's condo shard.
+
+    A request that commits pins its client to the primary for DB_READ_AFTER_WRITE_PIN
+    seconds, so it reads its own data while replicas catch up; a pin on any
+    shard keeps the client's reads, fan-outs included, on the primaries. Pins live in
+    this process; with several workers, keep replica lag below the window or
+    route a client to the same worker.
+    """
+    shard = await _request_shard(request) if shards.sharded else database
+    client = _client_key(request)
+    read_only = request.method in READ_METHODS and not shards.is_pinned(client)
+    session = await shard.get_session(read_only=read_only)
+    try:
+        yield session
+        if session.info.get("committed"):
+            shard.pin_to_primary(client)
+    finally:
+        # Returns the connection to the pool
+        await session.close()
@@ -0,0 +1,239 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.logger import logger
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PoolMetrics:
+    """Counters fed by SQLAlchemy pool events and the instrumented pool."""
+
+    def __init__(self, window: int = 2048):
+        self.started_at = time.monotonic()
+        self.waits = deque(maxlen=window)  # seconds spent acquiring a connection
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.pool = None
+
+    def attach(self, engine):
+        """Register pool event listeners on an (async) engine."""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        self.pool = sync_engine.pool
+        if isinstance(self.pool, InstrumentedAsyncQueuePool):
+            self.pool.metrics = self
+
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(sync_engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            self.closes += 1
+
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+            checked_out = self.checked_out()
+            if checked_out > self.peak_checked_out:
+                self.peak_checked_out = checked_out
+
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+
+        @event.listens_for(sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float):
+        self.waits.append(seconds)
+
+    def record_timeout(self):
+        self.timeouts += 1
+
+    def checked_out(self) -> int:
+        if self.pool is not None and hasattr(self.pool, "checkedout"):
+            return self.pool.checkedout()
+        return self.checkouts - self.checkins
+
+    def reset_window(self):
+        """Start a new observation window for the autosizer."""
+        self.waits.clear()
+        self.peak_checked_out = self.checked_out()
+
+    def wait_percentiles(self) -> dict:
+        waits = list(self.waits)
+        return {
+            "p50_ms": round(_percentile(waits, 50) * 1000, 3),
+            "p95_ms": round(_percentile(waits, 95) * 1000, 3),
+            "p99_ms": round(_percentile(waits, 99) * 1000, 3),
+            "max_ms": round(max(waits, default=0.0) * 1000, 3),
+            "samples": len(waits),
+        }
+
+    def snapshot(self) -> dict:
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        pool = self.pool
+        has_queue = isinstance(pool, AsyncAdaptedQueuePool)
+        return {
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "pool_size": pool.size() if has_queue else None,
+            "max_overflow": pool._max_overflow if has_queue else None,
+            "checked_out": self.checked_out(),
+            "checked_in": pool.checkedin() if has_queue else None,
+            "overflow": pool.overflow() if has_queue else None,
+            "peak_checked_out": self.peak_checked_out,
+            "checkout_wait": self.wait_percentiles(),
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connections_created": self.connects,
+            "connections_closed": self.closes,
+            "connections_created_per_s": round(self.connects / uptime, 4),
+            "connections_closed_per_s": round(self.closes / uptime, 4),
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "uptime_s": round(uptime, 1),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times connection acquisition and counts timeouts."""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolAutosizer:
+    """Recommends (or applies) pool sizing from observed checkout waits.
+
+    Modes (DB_POOL_AUTOSIZE): "off", "recommend" (log and expose only) and
+    "adjust", which also applies the recommended max_overflow to the live
+    pool. pool_size is only ever recommended because the underlying queue
+    cannot be resized in place; set DB_POOL_SIZE on the next deploy.
+
+    SQLAlchemy has no public setter for max_overflow, so "adjust" writes
+    QueuePool's private `_max_overflow`. The pool reads it on every
+    overflow checkout, and recreate() copies it to the new pool. Recheck
+    this after SQLAlchemy upgrades.
+    """
+
+    def __init__(self, metrics: PoolMetrics, name: str = "default"):
+        self.metrics = metrics
+        self.name = name
+        self.mode = os.getenv("DB_POOL_AUTOSIZE", "off").strip().lower()
+        self.interval = float(os.getenv("DB_POOL_AUTOSIZE_INTERVAL", "60"))
+        self.target_wait_ms = float(os.getenv("DB_POOL_WAIT_TARGET_MS", "50"))
+        self.max_connections = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "60"))
+        self.last_recommendation = None
+        self.last_applied = None  # only set in "adjust" mode, when a change was made
+        self._last_timeouts = 0
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("recommend", "adjust")
+
+    def recommend(self) -> dict:
+        pool = self.metrics.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return None
+        pool_size = pool.size()
+        max_overflow = pool._max_overflow
+        p95 = self.metrics.wait_percentiles()["p95_ms"]
+        peak = self.metrics.peak_checked_out
+        new_timeouts = self.metrics.timeouts - self._last_timeouts
+
+        recommended_size, recommended_overflow = pool_size, max_overflow
+        if new_timeouts or p95 > self.target_wait_ms:
+            # Saturated: keep the observed peak warm and allow more burst room
+            recommended_size = max(pool_size, min(peak, self.max_connections))
+            recommended_overflow = max(max_overflow + 1, int(max_overflow * 1.5))
+            reason = f"p95 wait {p95}ms, {new_timeouts} timeouts"
+        elif p95 < self.target_wait_ms / 10 and peak < pool_size // 2:
+            # Mostly idle: fewer warm connections, same burst headroom
+            recommended_size = max(2, peak * 2)
+            reason = f"peak {peak} of {pool_size} connections in use"
+        else:
+            reason = "pool sized within target"
+
+        # Never exceed the per-worker connection ceiling
+        recommended_size = min(recommended_size, self.max_connections)
+        recommended_overflow = max(0, min(recommended_overflow, self.max_connections - recommended_size))
+        return {
+            "pool_size": recommended_size,
+            "max_overflow": recommended_overflow,
+            "current_pool_size": pool_size,
+            "current_max_overflow": max_overflow,
+            "reason": reason,
+        }
+
+    def evaluate(self) -> dict:
+        recommendation = self.recommend()
+        if recommendation is None:
+            return None
+        self.last_recommendation = recommendation
+        if (recommendation["pool_size"], recommendation["max_overflow"]) != (
+            recommendation["current_pool_size"], recommendation["current_max_overflow"]
+        ):
+            logger.info("Pool sizing recommendation for %s: %s", self.name, recommendation)
+            if self.mode == "adjust" and recommendation["max_overflow"] != recommendation["current_max_overflow"]:
+                # Private attribute; see the class docstring
+                self.metrics.pool._max_overflow = recommendation["max_overflow"]
+                self.last_applied = {"max_overflow": recommendation["max_overflow"], "applied_at": time.time()}
+        self._last_timeouts = self.metrics.timeouts
+        self.metrics.reset_window()
+        return recommendation
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.evaluate()
+            except Exception as e:
+                logger.error("Pool autosizer for %s failed: %s", self.name, e)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,132 @@
+import os
+import re
+from collections import Counter, deque
+from functools import lru_cache
+
+from app.utils.logger import logger
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))+\s*\)")
+_REPEATED_ROWS = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement with literals, IN lists and multi-row VALUES collapsed, so repeats group together."""
+    normalized = _STRING.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    normalized = _REPEATED_ROWS.sub(r"\1, ...", normalized)
+    return _SPACE.sub(" ", normalized).strip()
+
+
+class StatementStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class StatementProfiler:
+    """Opt-in statement profiler and N+1 detector.
+
+    DB_PROFILE turns it on. attach_db_timing hands it every statement it
+    times, grouped by fingerprint, and counts them per request on the
+    request's RequestTimings; TimingMiddleware closes each request. Per
+    request, it flags going over the query budget (DB_QUERY_BUDGET,
+    overridable per route) and the same fingerprint running
+    DB_NPLUS1_THRESHOLD or more times, the usual shape of a lazy load
+    inside a loop. Violations are logged and kept for the report;
+    DB_PROFILE_STRICT also sends them in an X-Query-Budget-Exceeded
+    response header, for test runs. Not thread-safe; fed from the event loop.
+    """
+
+    def __init__(self, recent: int = 100):
+        self.enabled = os.getenv("DB_PROFILE", "false").lower() in ("1", "true", "yes", "on")
+        self.strict = os.getenv("DB_PROFILE_STRICT", "false").lower() in ("1", "true", "yes", "on")
+        self.default_budget = int(os.getenv("DB_QUERY_BUDGET", "10"))
+        self.repeat_threshold = int(os.getenv("DB_NPLUS1_THRESHOLD", "5"))
+        # "GET /users/{user_id}=2,POST /reservations/=5"
+        self.budgets = {}
+        for item in filter(None, os.getenv("DB_QUERY_BUDGETS", "").split(",")):
+            route, _, budget = item.rpartition("=")
+            self.budgets[route.strip()] = int(budget)
+        self.statements = {}  # fingerprint -> StatementStats
+        self.violations = deque(maxlen=recent)
+        self.requests = 0
+
+    def record(self, statement: str, seconds: float, timings=None):
+        """Time one statement, and count its fingerprint on the request's RequestTimings."""
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats()
+        stats.add(seconds)
+        if timings is not None:
+            if timings.fingerprints is None:
+                timings.fingerprints = Counter()
+            timings.fingerprints[key] += 1
+
+    def set_budget(self, route: str, budget: int):
+        """Budget for one route, keyed like "GET /users/{user_id}"."""
+        self.budgets[route] = budget
+
+    def check(self, route: str, timings) -> list:
+        """What the request's statements so far break of the route's budget."""
+        problems = []
+        budget = self.budgets.get(route, self.default_budget)
+        if timings.db_queries > budget:
+            problems.append(f"{timings.db_queries} statements, budget {budget}")
+        for key, count in (timings.fingerprints or Counter()).most_common():
+            if count < self.repeat_threshold:
+                break
+            problems.append(f"possible N+1: {count}x {key[:200]}")
+        return problems
+
+    def end_request(self, route: str, timings):
+        self.requests += 1
+        problems = self.check(route, timings)
+        if not problems:
+            return
+        budget = self.budgets.get(route, self.default_budget)
+        violation = {"route": route, "statements": timings.db_queries, "budget": budget, "problems": problems}
+        self.violations.append(violation)
+        logger.warning("Query budget exceeded on %s: %s", route, "; ".join(problems))
+
+    def report(self, top: int = 20) -> dict:
+        slowest = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)[:top]
+        return {
+            "enabled": self.enabled,
+            "strict": self.strict,
+            "default_budget": self.default_budget,
+            "repeat_threshold": self.repeat_threshold,
+            "requests": self.requests,
+            "fingerprints": len(self.statements),
+            "top": [
+                {
+                    "statement": key,
+                    "count": stats.count,
+                    "total_ms": round(stats.total * 1000, 3),
+                    "avg_ms": round(stats.total / stats.count * 1000, 3),
+                    "max_ms": round(stats.max * 1000, 3),
+                }
+                for key, stats in slowest
+            ],
+            "violations": list(self.violations),
+        }
+
+    def reset(self):
+        self.statements.clear()
+        self.violations.clear()
+        self.requests = 0
+
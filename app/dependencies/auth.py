@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.utils.jwt import verify_token
 from app.utils.logger import logger  # Import the logger
+from app.utils.timing import timed
 import os
 
 ENVIROMENT = os.getenv("ENV")
@@ -9,6 +10,10 @@ ENVIROMENT = os.getenv("ENV")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    with timed("auth"):
+        return _verify_credentials(token)
+
+def _verify_credentials(token: str):
     try:
         logger.debug("Attempting to verify token")
         if ENVIROMENT == "DeVeLoPmEnT":
@@ -20,25 +25,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             logger.warning("Invalid token provided")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-        logger.info(f"Token verified successfully for user ID: {credentials.get('user_id')}")
+        logger.info("Token verified successfully for user ID: %s", credentials.get('user_id'))
         return credentials  
     except Exception as e:
-        logger.error(f"Error verifying token: {str(e)}")
+        logger.error("Error verifying token: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Token verification failed")
 
 def require_role(required_roles: list[str]):
     async def role_checker(current_user: dict = Depends(get_current_user)):
+        with timed("auth"):
+            return _check_role(current_user)
+
+    def _check_role(current_user: dict):
         try:
-            logger.debug(f"Checking roles for user: {current_user.get('user_id')}")
+            logger.debug("Checking roles for user: %s", current_user.get('user_id'))
             if current_user["user_role"] not in required_roles:
-                logger.warning(f"Access denied for user ID: {current_user.get('user_id')} with role: {current_user['role']}")
+                logger.warning("Access denied for user ID: %s with role: %s", current_user.get('user_id'), current_user.get('user_role'))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You don't have access to this resource"
                 )
-            logger.info(f"Role check passed for user ID: {current_user.get('user_id')}")
+            logger.info("Role check passed for user ID: %s", current_user.get('user_id'))
             return current_user
         except Exception as e:
-            logger.error(f"Error during role check: {str(e)}")
+            logger.error("Error during role check: %s", e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Role verification failed")
     return role_checker
\ No newline at end of file
@@ -1,8 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # ⬅️ Add this line
 from contextlib import asynccontextmanager
-from app.db.db import AsyncDatabase  # Import the AsyncDatabase class
-from app.db.db import AsyncDatabase as db  # Your AsyncDatabase singleton
+import os
+from app.db.db import database, shards  # Application-wide AsyncDatabase and its shards
 from app.routers.users import router as user_router
 from app.routers.amenities import router as amenity_router
 from app.routers.condos import router as condo_router
@@ -10,19 +10,32 @@ from app.routers.reservations import router as reservation_router
 from app.routers.auth import router as auth_router
 from app.routers.blocks import router as block_router
 from app.routers.visitors import router as visitor_router
+from app.routers.internal import router as internal_router
+from app.routers.metrics import router as metrics_router
+from app.utils.responses import TimedORJSONResponse
+from app.utils.timing import TimingMiddleware
+from app.utils.scheduler import scheduler
+from app.crud.maintenance import reject_past_reservations_job, expire_past_visitors_job
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db = AsyncDatabase()
-    await db.connect()
+    await shards.connect()
+    scheduler.start()
     print("✅ Database connected")
 
     yield
 
-    await db.close()
+    await scheduler.stop()
+    await shards.close()
     print("🛑 Database disconnected")
 
-app = FastAPI(lifespan=lifespan)
+# Housekeeping jobs; intervals in seconds, first runs shortly after startup
+JOB_START_DELAY = float(os.getenv("JOB_START_DELAY", "60"))
+scheduler.add_job("reject_past_reservations", float(os.getenv("RESERVATION_EXPIRY_INTERVAL", "900")), reject_past_reservations_job, delay=JOB_START_DELAY)
+scheduler.add_job("expire_past_visitors", float(os.getenv("VISITOR_EXPIRY_INTERVAL", "3600")), expire_past_visitors_job, delay=JOB_START_DELAY)
+
+# orjson renders every response that still goes through FastAPI's encoder
+app = FastAPI(lifespan=lifespan, default_response_class=TimedORJSONResponse)
 
 # ✅ CORS middleware configuration
 app.add_middleware(
@@ -33,6 +46,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the Server-Timing total covers CORS handling as well;
+# also closes the opt-in profiler's per-request budget checks (DB_PROFILE)
+app.add_middleware(TimingMiddleware, profiler=database.profiler)
+
 # Include routers
 app.include_router(user_router)
 app.include_router(amenity_router)
@@ -41,3 +58,5 @@ app.include_router(reservation_router)
 app.include_router(auth_router)
 app.include_router(block_router)
 app.include_router(visitor_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
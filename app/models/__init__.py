@@ -2,4 +2,5 @@ from .user import User
 from .reservation import Reservation
 from .amenity import Amenity
 from .condo import Condo
-from .block import Block
\ No newline at end of file
+from .block import Block
+from .visitor import Visitor
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Time, ForeignKey
 from sqlalchemy.orm import relationship
-from app.db.db import Base  # Assuming this is your declarative base
+from app.db.db import Base, row_version_column  # Assuming this is your declarative base
 
 class Amenity(Base):
     __tablename__ = "amenities"
@@ -13,6 +13,7 @@ class Amenity(Base):
     
     # ForeignKey to the Condo table
     condo_id = Column(Integer, ForeignKey('condos.id'), nullable=False)
+    version = row_version_column()  # bumped on every update; see app/utils/http_cache.py
 
     # Relationship to Condo (this allows you to access the condo from an amenity instance)
     condo = relationship("Condo", back_populates="amenities")  # This needs to match the reverse relationship in Condo model
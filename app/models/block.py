@@ -1,10 +1,14 @@
 # models/block.py
-from sqlalchemy import Column, Integer, ForeignKey, Date, Time, Text, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, Date, Time, Text, DateTime, func, Index
 from sqlalchemy.orm import relationship
-from app.db.db import Base  # Assuming this is your declarative base
+from app.db.db import Base, row_version_column  # Assuming this is your declarative base
 
 class Block(Base):
     __tablename__ = "blocks"
+    __table_args__ = (
+        # get_blocks_by_amenity keyset and slot/availability range checks
+        Index("ix_blocks_amenity_start_date", "amenity_id", "start_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amenity_id = Column(Integer, ForeignKey("amenities.id", ondelete="CASCADE"), nullable=False)
@@ -14,6 +18,7 @@ class Block(Base):
     end_time = Column(Time, nullable=False)
     reason = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
+    version = row_version_column()  # bumped on every update; see app/utils/http_cache.py
    
    # Relationship
     amenity = relationship("Amenity", back_populates="blocks")
\ No newline at end of file
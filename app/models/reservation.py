@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Enum, TIMESTAMP
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Enum, TIMESTAMP, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from app.db.db import Base  # Assuming this is your declarative base
+from app.db.db import Base, row_version_column  # Assuming this is your declarative base
 
 
 class ReservationStatusEnum(str, enum.Enum):
@@ -13,6 +13,14 @@ class ReservationStatusEnum(str, enum.Enum):
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # get_reservations_by_user: user_id filter, (date, id) keyset
+        Index("ix_reservations_user_date", "user_id", "date"),
+        # slot overlap checks, availability and exports: amenity_id + date range
+        Index("ix_reservations_amenity_date_start", "amenity_id", "date", "start_time"),
+        # expiry job: pending rows with a past date
+        Index("ix_reservations_status_date", "status", "date"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -22,6 +30,7 @@ class Reservation(Base):
     end_time = Column(Time, nullable=False)
     status = Column(Enum(ReservationStatusEnum), default=ReservationStatusEnum.pending)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), nullable=True)
+    version = row_version_column()  # bumped on every update; see app/utils/http_cache.py
     
     # Relationships
     user = relationship("User", back_populates="reservations")
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.db import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # get_users_by_condo: condo_id filter, id keyset
+        Index("ix_users_condo_id", "condo_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -1,14 +1,25 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, TIMESTAMP, text
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, TIMESTAMP, text, Index
 from sqlalchemy.orm import relationship
-from app.db.db import Base  # Adjust import path to your project structure
+from app.db.db import Base, row_version_column  # Adjust import path to your project structure
 import enum
 
 class VisitorStatus(str, enum.Enum):
     pending = "pending"
     approved = "approved"
+    expired = "expired"  # still pending when its visit date passed
 
 class Visitor(Base):
     __tablename__ = "visitors"
+    __table_args__ = (
+        # get_visitors_by_condo and exports: condo_id filter, (visit_date, id) keyset
+        Index("ix_visitors_condo_visit_date", "condo_id", "visit_date"),
+        # gate lookups by plate for a condo and day; the normalized plate is compared on the index entries
+        Index("ix_visitors_condo_visit_date_plate", "condo_id", "visit_date", "plate"),
+        # get_visitors_by_user: user_id filter, (visit_date, id) keyset
+        Index("ix_visitors_user_visit_date", "user_id", "visit_date"),
+        # expiry job: pending rows with a past visit_date
+        Index("ix_visitors_status_visit_date", "status", "visit_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     identification = Column(String(100), nullable=True)
@@ -20,6 +31,7 @@ class Visitor(Base):
     status = Column(Enum(VisitorStatus), default=VisitorStatus.pending, nullable=False)
     unit_number = Column(String(50), nullable=False)  # Added unit_number
     created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+    version = row_version_column()  # bumped on every update; see app/utils/http_cache.py
 
     # Optional relationships
     user = relationship("User", back_populates="visitors")
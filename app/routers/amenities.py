@@ -1,16 +1,24 @@
-from fastapi import HTTPException, Depends, Response
+from fastapi import HTTPException, Depends, Response, Query, Request
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date, timedelta
 
-from app.schemas.amenity import AmenityCreate, AmenityOut, AmenityUpdate
+from app.schemas.amenity import AmenityCreate, AmenityOut, AmenityUpdate, AmenityAvailability
 from app.crud.amenities import AmenityCRUD
 from app.db.db import get_db_session
 from app.dependencies.auth import require_role# Import get_current_user dependency
+from app.utils.http_cache import etag_response, version_etag
+from app.utils.responses import model_response, list_adapter
 
 router = InferringRouter(prefix="/amenities", tags=["amenities"])
 
+MAX_AVAILABILITY_DAYS = 62
+# Amenities change a few times a year; let clients reuse them for a while
+AMENITY_MAX_AGE = 300
+AMENITY_LIST = list_adapter(AmenityOut)
+
 @cbv(router)
 class AmenitysRoutes:
     def __init__(self, db: AsyncSession = Depends(get_db_session)):
@@ -22,31 +30,43 @@ class AmenitysRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create this amenity")
             created_amenity = await self.amenity_crud.create_amenity(amenity)
-            return created_amenity
+            return model_response(created_amenity, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     @router.get("/amenitiesbycondo/{condo_id}", response_model=List[AmenityOut], status_code=200)
-    async def get_amenities_by_condo(self, condo_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    async def get_amenities_by_condo(self, condo_id: int, request: Request, current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access amenities for this condo")
             amenities_data = await self.amenity_crud.get_all_amenities_by_condo(condo_id)
             if not amenities_data:
                 raise HTTPException(status_code=404, detail="Amenities not found for this condo")
-            return amenities_data
+            return etag_response(request, amenities_data, max_age=AMENITY_MAX_AGE, adapter=AMENITY_LIST, etag=version_etag(amenities_data))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     @router.get("/{amenity_id}", response_model=AmenityOut, status_code=200)
-    async def get_amenity_by_id(self, amenity_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    async def get_amenity_by_id(self, amenity_id: int, request: Request, current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access this amenity")
             amenity_data = await self.amenity_crud.get_amenity_by_id(amenity_id)
             if not amenity_data:
                 raise HTTPException(status_code=404, detail="Amenity not found")
-            return amenity_data
+            return etag_response(request, amenity_data, max_age=AMENITY_MAX_AGE, etag=version_etag(amenity_data))
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.get("/{amenity_id}/availability", response_model=AmenityAvailability, status_code=200)
+    async def get_amenity_availability(self, amenity_id: int, date_from: date = Query(...), date_to: Optional[date] = None, current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to access this amenity")
+            date_to = date_to or date_from
+            if date_to < date_from or date_to - date_from > timedelta(days=MAX_AVAILABILITY_DAYS):
+                raise HTTPException(status_code=400, detail=f"date_to must be within {MAX_AVAILABILITY_DAYS} days after date_from")
+            return model_response(await self.amenity_crud.get_availability(amenity_id, date_from, date_to))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -56,7 +76,7 @@ class AmenitysRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this amenity")
             updated_amenity = await self.amenity_crud.update_amenity(amenity_id, amenity)
-            return updated_amenity
+            return model_response(updated_amenity)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
         
@@ -1,11 +1,16 @@
-from fastapi import HTTPException, Depends, Response
+from fastapi import HTTPException, Depends, Response, Request, Body
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.schemas.block import BlockCreate, BlockOut, BlockUpdate
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkResult, MAX_BULK_ITEMS
+from app.utils.pagination import PageParams
+from app.utils.http_cache import etag_response, version_etag
 from app.crud.blocks import BlockCRUD
+from app.utils.responses import model_response
 from app.db.db import get_db_session
 from app.dependencies.auth import require_role
 
@@ -22,19 +27,31 @@ class BlockRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create a block")
             created_block = await self.block_crud.create_block(block)
-            return created_block
+            return model_response(created_block, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/blocksbyamenity/{amenity_id}", response_model=List[BlockOut], status_code=200)
-    async def get_blocks_by_amenity(self, amenity_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.post("/bulk", response_model=BulkResult[BlockOut], status_code=201)
+    async def create_blocks_bulk(self, blocks: List[BlockCreate] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS), current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to create blocks")
+            result = await self.block_crud.create_blocks_bulk(blocks)
+            if not result.created:
+                raise HTTPException(status_code=422, detail=[error.model_dump() for error in result.errors])
+            return model_response(result, status_code=201)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.get("/blocksbyamenity/{amenity_id}", response_model=Page[BlockOut], status_code=200)
+    async def get_blocks_by_amenity(self, amenity_id: int, request: Request, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to view blocks")
-            blocks_data = await self.block_crud.get_blocks_by_amenity(amenity_id)
-            if not blocks_data:
+            blocks_data = await self.block_crud.get_blocks_by_amenity(amenity_id, page.limit, page.after)
+            if not blocks_data.items:
                 raise HTTPException(status_code=404, detail="No blocks found for this amenity")
-            return blocks_data
+            return etag_response(request, blocks_data, etag=version_etag(blocks_data, "amenity_name"))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -46,7 +63,7 @@ class BlockRoutes:
             block_data = await self.block_crud.get_block_by_id(block_id)
             if not block_data:
                 raise HTTPException(status_code=404, detail="Block not found")
-            return block_data
+            return model_response(block_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -56,7 +73,7 @@ class BlockRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this block")
             updated_block = await self.block_crud.update_block(block_id, block)
-            return updated_block
+            return model_response(updated_block)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -2,7 +2,10 @@ from fastapi import HTTPException, Response, Depends
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from app.schemas.condo import CondoCreate, CondoOut, CondoUpdate
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams
 from app.crud.condos import CondosCRUD
+from app.utils.responses import model_response
 from app.db.db import get_db_session
 from app.dependencies.auth import require_role# Import get_current_user dependency
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -20,7 +23,7 @@ class CondosRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create this condo")
             created_condo = await self.condo_crud.create_condo(condo)
-            return created_condo
+            return model_response(created_condo, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -32,19 +35,19 @@ class CondosRoutes:
             condo_data = await self.condo_crud.get_condo_by_id(condo_id)
             if not condo_data:
                 raise HTTPException(status_code=404, detail="Condo not found")
-            return condo_data
+            return model_response(condo_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/", response_model=list[CondoOut], status_code=200)
-    async def get_all_condos(self, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/", response_model=Page[CondoOut], status_code=200)
+    async def get_all_condos(self, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access all condos")
-            condos_data = await self.condo_crud.get_all_condos()
-            if not condos_data:
+            condos_data = await self.condo_crud.get_all_condos(page.limit, page.after)
+            if not condos_data.items:
                 raise HTTPException(status_code=404, detail="No condos found")
-            return condos_data
+            return model_response(condos_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -54,7 +57,7 @@ class CondosRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this condo")
             updated_condo = await self.condo_crud.update_condo(condo_id, condo)
-            return updated_condo
+            return model_response(updated_condo)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -0,0 +1,59 @@
+from fastapi import Depends, HTTPException, Query
+from fastapi_utils.inferring_router import InferringRouter
+
+from app.db.db import database, shards
+from app.dependencies.auth import require_role
+from app.utils.cache import caches
+from app.utils.scheduler import JobAlreadyRunning, scheduler
+
+router = InferringRouter(prefix="/internal", tags=["internal"])
+
+
+def _pool_report(db) -> dict:
+    return {
+        "pool": db.metrics.snapshot(),
+        "autosize": {
+            "mode": db.autosizer.mode,
+            "recommendation": db.autosizer.recommend(),
+            "last_recommendation": db.autosizer.last_recommendation,
+            "last_applied": db.autosizer.last_applied,
+        },
+    }
+
+
+@router.get("/db/pool", status_code=200)
+async def get_pool_metrics(current_user: dict = Depends(require_role(["admin"]))):
+    """The default shard's primary pool at the top level, every shard's under "shards"."""
+    return {**_pool_report(database), "shards": {name: _pool_report(shard) for name, shard in shards.shards.items()}}
+
+
+@router.get("/db/queries", status_code=200)
+async def get_query_profile(top: int = Query(20, ge=1, le=200), current_user: dict = Depends(require_role(["admin"]))):
+    return database.profiler.report(top)
+
+
+@router.delete("/db/queries", status_code=204)
+async def reset_query_profile(current_user: dict = Depends(require_role(["admin"]))):
+    database.profiler.reset()
+
+
+@router.get("/caches", status_code=200)
+async def get_cache_stats(current_user: dict = Depends(require_role(["admin"]))):
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@router.get("/jobs", status_code=200)
+async def get_jobs(current_user: dict = Depends(require_role(["admin"]))):
+    return scheduler.snapshot()
+
+
+@router.post("/jobs/{name}/run", status_code=200)
+async def run_job(name: str, current_user: dict = Depends(require_role(["admin"]))):
+    job = scheduler.jobs.get(name)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        await scheduler.run_now(name)
+    except JobAlreadyRunning:
+        raise HTTPException(status_code=409, detail="Job is already running")
+    return {name: job.snapshot()}
@@ -0,0 +1,33 @@
+import os
+import secrets
+
+from fastapi import Header, HTTPException, Response
+from fastapi_utils.inferring_router import InferringRouter
+
+from app.dependencies.auth import get_current_user, require_role
+from app.utils.timing import latency_metrics
+
+router = InferringRouter(tags=["metrics"])
+
+# Scrapers do not carry user JWTs; when set, this shared token must be presented instead.
+# Without it the endpoint is for admins only, like the /internal routes.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+_require_admin = require_role(["admin"])
+
+
+async def _check_metrics_access(authorization: str):
+    if METRICS_TOKEN:
+        if not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    await _require_admin(await get_current_user(token))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: str = Header(None)):
+    await _check_metrics_access(authorization)
+    return Response(content=latency_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,11 +1,18 @@
-from fastapi import HTTPException, Depends, Response
+from fastapi import HTTPException, Depends, Response, Query, Request, Body
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date
 
 from app.schemas.reservation import ReservationCreate, ReservationOut, ReservationUpdate
-from app.crud.reservartions import ReservationCRUD
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkResult, MAX_BULK_ITEMS
+from app.utils.pagination import PageParams
+from app.utils.export import export_response
+from app.utils.http_cache import etag_response, version_etag
+from app.crud.reservartions import ReservationCRUD, RESERVATION_EXPORT_FIELDS
+from app.utils.responses import model_response
 from app.db.db import get_db_session
 from app.dependencies.auth import require_role# Import get_current_user dependency
 
@@ -22,7 +29,19 @@ class ReservationsRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create this reservation")
             created_reservation = await self.reservation_crud.create_reservation(reservation)
-            return created_reservation
+            return model_response(created_reservation, status_code=201)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.post("/bulk", response_model=BulkResult[ReservationOut], status_code=201)
+    async def create_reservations_bulk(self, reservations: List[ReservationCreate] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS), current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to create these reservations")
+            result = await self.reservation_crud.create_reservations_bulk(reservations)
+            if not result.created:
+                raise HTTPException(status_code=422, detail=[error.model_dump() for error in result.errors])
+            return model_response(result, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -34,17 +53,29 @@ class ReservationsRoutes:
             reservation_data = await self.reservation_crud.get_reservation_by_id(reservation_id)
             if not reservation_data:
                 raise HTTPException(status_code=404, detail="Reservation not found")
-            return reservation_data
+            return model_response(reservation_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/reservationsbyuser/{user_id}", response_model=List[ReservationOut], status_code=200)
-    async def get_reservations_by_user(self, user_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/export/condo/{condo_id}", status_code=200)
+    async def export_reservations_by_condo(self, condo_id: int, export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"), date_from: Optional[date] = None, date_to: Optional[date] = None, current_user: dict = Depends(require_role(["admin"]))):
+        if current_user is False:
+            raise HTTPException(status_code=403, detail="Not authorized to export reservations for this condo")
+        return export_response(
+            lambda session: ReservationCRUD(session).stream_reservations_by_condo(condo_id, date_from, date_to),
+            RESERVATION_EXPORT_FIELDS,
+            export_format,
+            f"reservations-condo-{condo_id}",
+            condo_id=condo_id,
+        )
+
+    @router.get("/reservationsbyuser/{user_id}", response_model=Page[ReservationOut], status_code=200)
+    async def get_reservations_by_user(self, user_id: int, request: Request, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access reservations for this user")
-            reservations_data = await self.reservation_crud.get_reservations_by_user(user_id)
-            return reservations_data
+            reservations_data = await self.reservation_crud.get_reservations_by_user(user_id, page.limit, page.after)
+            return etag_response(request, reservations_data, etag=version_etag(reservations_data, "user_name", "amenity_name"))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -54,7 +85,7 @@ class ReservationsRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this reservation")
             updated_reservation = await self.reservation_crud.update_reservation(reservation_id, reservation)
-            return updated_reservation
+            return model_response(updated_reservation)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
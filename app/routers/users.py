@@ -3,7 +3,10 @@ from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import UserCreate, UserOut, UserUpdate
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams
 from app.crud.users import UserCRUD
+from app.utils.responses import model_response
 from app.db.db import get_db_session  # Import the session dependency
 from app.dependencies.auth import require_role  # Import the get_current_user dependency
 
@@ -20,7 +23,7 @@ class UserRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create a user")
             new_user_data = await self.user_crud.create_user(user)
-            return new_user_data
+            return model_response(new_user_data, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -32,29 +35,29 @@ class UserRoutes:
             user_data = await self.user_crud.get_user(user_id)
             if not user_data:
                 raise HTTPException(status_code=404, detail="User not found")
-            return user_data
+            return model_response(user_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/usersbycondo/{condo_id}", response_model=list[UserOut], status_code=200)
-    async def get_users_by_condo_route(self, condo_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/usersbycondo/{condo_id}", response_model=Page[UserOut], status_code=200)
+    async def get_users_by_condo_route(self, condo_id: int, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access users in this condo")
-            users_data = await self.user_crud.get_users_by_condo(condo_id)
-            if not users_data:
+            users_data = await self.user_crud.get_users_by_condo(condo_id, page.limit, page.after)
+            if not users_data.items:
                 raise HTTPException(status_code=404, detail="Users not found for this condo")
-            return users_data
+            return model_response(users_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/", response_model=list[UserOut], status_code=200)
-    async def get_all_users(self, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/", response_model=Page[UserOut], status_code=200)
+    async def get_all_users(self, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is None:
                 raise HTTPException(status_code=403, detail="Not authorized to access all users")
-            users_data = await self.user_crud.get_all_users()
-            return users_data
+            users_data = await self.user_crud.get_all_users(page.limit, page.after)
+            return model_response(users_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -64,7 +67,7 @@ class UserRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this user")
             updated_user_data = await self.user_crud.update_user(user_id, user)
-            return updated_user_data
+            return model_response(updated_user_data)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
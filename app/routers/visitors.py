@@ -1,16 +1,26 @@
-from fastapi import HTTPException, Depends, Response
+from fastapi import HTTPException, Depends, Response, Query, Request, Body
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date
 
-from app.schemas.visitor import VisitorCreate, VisitorOut, VisitorUpdate
-from app.crud.visitors import VisitorsCRUD
+from app.schemas.visitor import VisitorCreate, VisitorOut, VisitorStatus, VisitorUpdate
+from app.schemas.pagination import Page
+from app.schemas.bulk import BulkResult, MAX_BULK_ITEMS
+from app.utils.pagination import PageParams
+from app.utils.export import export_response
+from app.utils.http_cache import etag_response, gzip_etag_response, version_etag
+from app.crud.visitors import VisitorsCRUD, VISITOR_EXPORT_FIELDS
+from app.utils.responses import model_response, list_adapter
 from app.db.db import get_db_session
 from app.dependencies.auth import require_role  # Import get_current_user dependency
 
 router = InferringRouter(prefix="/visitors", tags=["visitors"])
 
+VISITOR_LIST = list_adapter(VisitorOut)
+MAX_SNAPSHOT_DAYS = 31
+
 @cbv(router)
 class VisitorsRoutes:
     def __init__(self, db: AsyncSession = Depends(get_db_session)):
@@ -22,7 +32,19 @@ class VisitorsRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to create this visitor")
             created_visitor = await self.visitor_crud.create_visitor(visitor)
-            return created_visitor
+            return model_response(created_visitor, status_code=201)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.post("/bulk", response_model=BulkResult[VisitorOut], status_code=201)
+    async def create_visitors_bulk(self, visitors: List[VisitorCreate] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS), current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to create these visitors")
+            result = await self.visitor_crud.create_visitors_bulk(visitors)
+            if not result.created:
+                raise HTTPException(status_code=422, detail=[error.model_dump() for error in result.errors])
+            return model_response(result, status_code=201)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -34,27 +56,66 @@ class VisitorsRoutes:
             visitor_data = await self.visitor_crud.get_visitor_by_id(visitor_id)
             if not visitor_data:
                 raise HTTPException(status_code=404, detail="Visitor not found")
-            return visitor_data
+            return model_response(visitor_data)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.get("/visitorsbycondo/{condo_id}", response_model=Page[VisitorOut], status_code=200)
+    async def get_visitors_by_condo(self, condo_id: int, request: Request, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to access visitors for this condo")
+            visitors_data = await self.visitor_crud.get_visitors_by_condo(condo_id, page.limit, page.after)
+            return etag_response(request, visitors_data, etag=version_etag(visitors_data))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/visitorsbycondo/{condo_id}", response_model=List[VisitorOut], status_code=200)
-    async def get_visitors_by_condo(self, condo_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/gate/{condo_id}", response_model=List[VisitorOut], status_code=200)
+    async def lookup_visitors(self, condo_id: int, plate: Optional[str] = Query(None, max_length=20), identification: Optional[str] = Query(None, max_length=100), visit_date: Optional[date] = None, status: VisitorStatus = Query(VisitorStatus.approved, description="Only visitors of this status; the gate lets in approved ones"), current_user: dict = Depends(require_role(["admin", "resident"]))):
+        try:
+            if current_user is False:
+                raise HTTPException(status_code=403, detail="Not authorized to look up visitors for this condo")
+            if not plate and not identification:
+                raise HTTPException(status_code=422, detail="Either plate or identification is required")
+            visitors = await self.visitor_crud.lookup_visitors(condo_id, visit_date or date.today(), plate, identification, status)
+            return model_response(visitors, VISITOR_LIST)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    @router.get("/snapshot/{condo_id}", status_code=200)
+    async def get_visitor_snapshot(self, condo_id: int, request: Request, date_from: Optional[date] = None, date_to: Optional[date] = None, current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access visitors for this condo")
-            visitors_data = await self.visitor_crud.get_visitors_by_condo(condo_id)
-            return visitors_data
+            date_from = date_from or date.today()
+            date_to = date_to or date_from
+            if not 0 <= (date_to - date_from).days < MAX_SNAPSHOT_DAYS:
+                raise HTTPException(status_code=422, detail=f"The date window must span 1 to {MAX_SNAPSHOT_DAYS} days")
+            snapshot = await self.visitor_crud.get_visitor_snapshot(condo_id, date_from, date_to)
+            body = snapshot.render()
+            return gzip_etag_response(request, body, snapshot.etag)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    @router.get("/visitorsbyuser/{user_id}", response_model=List[VisitorOut], status_code=200)
-    async def get_visitors_by_user(self, user_id: int, current_user: dict = Depends(require_role(["admin", "resident"]))):
+    @router.get("/export/condo/{condo_id}", status_code=200)
+    async def export_visitors_by_condo(self, condo_id: int, export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"), date_from: Optional[date] = None, date_to: Optional[date] = None, current_user: dict = Depends(require_role(["admin"]))):
+        if current_user is False:
+            raise HTTPException(status_code=403, detail="Not authorized to export visitors for this condo")
+        return export_response(
+            lambda session: VisitorsCRUD(session).stream_visitors_by_condo(condo_id, date_from, date_to),
+            VISITOR_EXPORT_FIELDS,
+            export_format,
+            f"visitors-condo-{condo_id}",
+            condo_id=condo_id,
+        )
+
+    @router.get("/visitorsbyuser/{user_id}", response_model=Page[VisitorOut], status_code=200)
+    async def get_visitors_by_user(self, user_id: int, request: Request, page: PageParams = Depends(), current_user: dict = Depends(require_role(["admin", "resident"]))):
         try:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to access visitors for this user")
-            visitors_data = await self.visitor_crud.get_visitors_by_user(user_id)
-            return visitors_data
+            visitors_data = await self.visitor_crud.get_visitors_by_user(user_id, page.limit, page.after)
+            return etag_response(request, visitors_data, etag=version_etag(visitors_data))
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
@@ -64,7 +125,7 @@ class VisitorsRoutes:
             if current_user is False:
                 raise HTTPException(status_code=403, detail="Not authorized to update this visitor")
             updated_visitor = await self.visitor_crud.update_visitor(visitor_id, visitor)
-            return updated_visitor
+            return model_response(updated_visitor)
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=e.detail)
 
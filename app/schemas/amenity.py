@@ -1,7 +1,8 @@
 from typing import Optional  # Import Optional from typing
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi import HTTPException  # Importing HTTPException from FastAPI
-from datetime import time
+from datetime import time, date
+from typing import List
 class AmenityCreate(BaseModel):
     name: str
     description: str
@@ -15,6 +16,7 @@ class AmenityOut(BaseModel):
     description: str
     start_time: time
     end_time: time
+    version: Optional[int] = Field(None, exclude=True)  # row version for the ETag, not sent
     
     model_config = {
         "from_attributes": True
@@ -26,4 +28,15 @@ class AmenityUpdate(BaseModel):
     start_time: time
     end_time: time
     condo_id: int
-    
+
+class TimeSlot(BaseModel):
+    start_time: time
+    end_time: time
+
+class AvailabilityDay(BaseModel):
+    date: date
+    free: List[TimeSlot]
+
+class AmenityAvailability(BaseModel):
+    amenity_id: int
+    days: List[AvailabilityDay]
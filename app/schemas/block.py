@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, time
 
 class BlockCreate(BaseModel):
@@ -17,6 +17,8 @@ class BlockOut(BaseModel):
     start_time: time
     end_time: time
     reason: Optional[str] = None
+    id: Optional[int] = Field(None, exclude=True)
+    version: Optional[int] = Field(None, exclude=True)  # row version for the ETag, not sent
 
     model_config = {
         "from_attributes": True
@@ -0,0 +1,15 @@
+from typing import Generic, List, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Largest list accepted by the /bulk endpoints
+MAX_BULK_ITEMS = 500
+
+class BulkItemError(BaseModel):
+    index: int  # Position of the rejected item in the request list
+    detail: str
+
+class BulkResult(BaseModel, Generic[T]):
+    created: List[T]
+    errors: List[BulkItemError] = []
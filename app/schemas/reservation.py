@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import time, date
 from enum import Enum
+from typing import Optional
 
 class ReservationStatus(str, Enum):
     pending = "pending"
@@ -10,7 +11,7 @@ class ReservationStatus(str, Enum):
     
 class ReservationCreate(BaseModel):
     user_id: int
-    amenity_id: str
+    amenity_id: int
     date: date
     start_time: time
     end_time: time
@@ -27,13 +28,15 @@ class ReservationOut(BaseModel):
     start_time: time
     end_time: time
     status: str    # Assuming you have a predefined enum for status
+    id: Optional[int] = Field(None, exclude=True)
+    version: Optional[int] = Field(None, exclude=True)  # row version for the ETag, not sent
 
     class Config:
         from_attributes = True
         
 class ReservationUpdate(BaseModel):
     user_id: int
-    amenity_id: str
+    amenity_id: int
     date: date
     start_time: time
     end_time: time
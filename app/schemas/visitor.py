@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 from enum import Enum
 from typing import Optional
@@ -6,6 +6,7 @@ from typing import Optional
 class VisitorStatus(str, Enum):
     pending = "pending"
     approved = "approved"
+    expired = "expired"
 
 class VisitorCreate(BaseModel):
     identification: Optional[str] = None  # Made identification optional (nullable)
@@ -30,6 +31,7 @@ class VisitorOut(BaseModel):
     visit_date: date
     status: VisitorStatus
     unit_number: str  # Added unit_number
+    version: Optional[int] = Field(None, exclude=True)  # row version for the ETag, not sent
 
     class Config:
         from_attributes = True
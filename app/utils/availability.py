@@ -0,0 +1,42 @@
+from datetime import date, time, timedelta
+
+
+def daterange(start: date, end: date):
+    current = start
+    while current <= end:
+        yield current
+        current += timedelta(days=1)
+
+
+def free_intervals(open_time: time, close_time: time, busy: list[tuple[time, time]]) -> list[tuple[time, time]]:
+    """Sweep sorted busy intervals and return the gaps inside opening hours."""
+    free = []
+    cursor = open_time
+    for start, end in sorted(busy):
+        if end <= cursor or start >= close_time:
+            continue
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= close_time:
+            break
+    if cursor < close_time:
+        free.append((cursor, close_time))
+    return free
+
+
+def build_availability(open_time: time, close_time: time, date_from: date, date_to: date, blocks, reservations) -> dict:
+    """Free slots per day.
+
+    `blocks` are (start_date, end_date, start_time, end_time) tuples and apply
+    their time window on every day of their date range; `reservations` are
+    (date, start_time, end_time) tuples.
+    """
+    busy_by_day = {day: [] for day in daterange(date_from, date_to)}
+    for start_date, end_date, start_time, end_time in blocks:
+        for day in daterange(max(start_date, date_from), min(end_date, date_to)):
+            busy_by_day[day].append((start_time, end_time))
+    for day, start_time, end_time in reservations:
+        if day in busy_by_day:
+            busy_by_day[day].append((start_time, end_time))
+    return {day: free_intervals(open_time, close_time, busy) for day, busy in busy_by_day.items()}
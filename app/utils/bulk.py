@@ -0,0 +1,27 @@
+from typing import List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def insert_rows(db: AsyncSession, model, rows: List[dict]) -> List[int]:
+    """Insert `rows` with one multi-row INSERT and return their ids in row order.
+
+    Runs inside the caller's transaction; the caller commits. Auto-increment
+    ids are handed out in VALUES order, so sorted ids line up with `rows`.
+    """
+    statement = insert(model).values(rows)
+    if db.bind.dialect.insert_returning:
+        result = await db.execute(statement.returning(model.id))
+        return sorted(result.scalars().all())
+    # MySQL has no RETURNING: LAST_INSERT_ID() is the first id of the statement.
+    # The ids after it depend on auto_increment_increment (see ShardRouter), so
+    # read them back: InnoDB reserves a multi-row VALUES insert's ids as one
+    # block, so the first len(rows) ids from there on are this statement's.
+    result = await db.execute(statement)
+    first_id = result.lastrowid
+    result = await db.execute(select(model.id).where(model.id >= first_id).order_by(model.id).limit(len(rows)))
+    ids = result.scalars().all()
+    if len(ids) != len(rows):
+        raise RuntimeError(f"Read back {len(ids)} of {len(rows)} inserted {model.__tablename__} ids")
+    return ids
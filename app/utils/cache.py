@@ -0,0 +1,93 @@
+import os
+import time
+from collections import OrderedDict
+
+# Every named cache, for the internal metrics endpoint
+caches = {}
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a TTL.
+
+    Not thread-safe; meant to be used from the event loop thread.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, enabled: bool = True, name: str = None):
+        self.name = name
+        if name:
+            caches[name] = self
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+    def values(self):
+        """Live values, least recently used first; does not count as lookups."""
+        now = time.monotonic()
+        return [value for value, expires_at in self._data.values() if expires_at > now]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def read_cache(name: str) -> TTLCache:
+    """Cache for rarely changing CRUD reads, configured by READ_CACHE_* env vars."""
+    return TTLCache(
+        maxsize=int(os.getenv("READ_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("READ_CACHE_TTL", "300")),
+        enabled=os.getenv("READ_CACHE_ENABLED", "true").lower() not in ("0", "false", "no", "off"),
+        name=name,
+    )
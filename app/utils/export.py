@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from enum import Enum
+
+from fastapi.responses import StreamingResponse
+
+from app.db.db import shards
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+ROWS_PER_CHUNK = 500
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+async def ndjson_chunks(rows, fields: list[str]):
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps({field: _plain(row[field]) for field in fields}, separators=(",", ":")))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def csv_chunks(rows, fields: list[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    count = 0
+    async for row in rows:
+        writer.writerow([_plain(row[field]) for field in fields])
+        count += 1
+        if count >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+def export_chunks(rows, fields: list[str], export_format: str):
+    if export_format == "csv":
+        return csv_chunks(rows, fields)
+    return ndjson_chunks(rows, fields)
+
+
+def export_response(rows_factory, fields: list[str], export_format: str, filename: str, condo_id: int = None) -> StreamingResponse:
+    """Stream rows produced by `rows_factory(session)` as NDJSON or CSV.
+
+    The body runs after the route returns, when the request-scoped session is
+    already closed, so the stream opens and releases its own session, on a
+    replica of the condo's shard when there is one.
+    """
+    async def body():
+        session = await shards.for_condo(condo_id).get_session(read_only=True)
+        try:
+            async for chunk in export_chunks(rows_factory(session), fields, export_format):
+                yield chunk
+        finally:
+            await session.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -0,0 +1,106 @@
+import os
+import re
+from datetime import date
+
+from app.utils.cache import TTLCache
+
+_PLATE_SEPARATORS = re.compile(r"[\s-]+")
+
+
+def normalize_plate(plate: str) -> str:
+    """Plate as the gate compares it: upper case, no spaces or dashes, so "abc 123" is "ABC-123"."""
+    return _PLATE_SEPARATORS.sub("", plate).upper()
+
+
+class DayIndex:
+    """One condo's visitors of one day, by id, normalized plate and identification."""
+
+    __slots__ = ("day", "visitors", "by_plate", "by_identification")
+
+    def __init__(self, day: date, visitors=()):
+        self.day = day
+        self.visitors = {}
+        self.by_plate = {}
+        self.by_identification = {}
+        for visitor in visitors:
+            self.add(visitor)
+
+    def add(self, visitor):
+        self.discard(visitor.id)
+        self.visitors[visitor.id] = visitor
+        if visitor.plate:
+            self.by_plate.setdefault(normalize_plate(visitor.plate), set()).add(visitor.id)
+        if visitor.identification:
+            self.by_identification.setdefault(visitor.identification, set()).add(visitor.id)
+
+    def discard(self, visitor_id: int):
+        visitor = self.visitors.pop(visitor_id, None)
+        if visitor is None:
+            return
+        plate = normalize_plate(visitor.plate) if visitor.plate else None
+        for keys, key in ((self.by_plate, plate), (self.by_identification, visitor.identification)):
+            ids = keys.get(key)
+            if ids is not None:
+                ids.discard(visitor_id)
+                if not ids:
+                    del keys[key]
+
+    def lookup(self, plate: str = None, identification: str = None, status=None) -> list:
+        """Visitors matching the plate or the identification, by id; only of `status` when given."""
+        ids = set()
+        if plate:
+            ids |= self.by_plate.get(normalize_plate(plate), set())
+        if identification:
+            ids |= self.by_identification.get(identification, set())
+        visitors = [self.visitors[visitor_id] for visitor_id in sorted(ids)]
+        if status is not None:
+            visitors = [visitor for visitor in visitors if visitor.status == status]
+        return visitors
+
+
+class GateIndex:
+    """In-memory index of each condo's visitors of the day, for gate lookups.
+
+    A condo's entry is built from one query on its first lookup of the day
+    and kept current by the visitor writes of this process. Entries expire
+    after GATE_INDEX_TTL seconds, which bounds how long another worker's
+    write can be missing; callers also confirm misses against the database.
+    """
+
+    def __init__(self):
+        self.entries = TTLCache(
+            maxsize=int(os.getenv("GATE_INDEX_SIZE", "2048")),
+            ttl=float(os.getenv("GATE_INDEX_TTL", "300")),
+            enabled=os.getenv("GATE_INDEX_ENABLED", "true").lower() not in ("0", "false", "no", "off"),
+            name="gate_index",
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.entries.enabled
+
+    def get(self, condo_id: int, day: date) -> DayIndex:
+        entry = self.entries.get(condo_id)
+        return entry if entry is not None and entry.day == day else None
+
+    def build(self, condo_id: int, day: date, visitors) -> DayIndex:
+        entry = DayIndex(day, visitors)
+        self.entries.set(condo_id, entry)
+        return entry
+
+    def record(self, visitor):
+        """Apply a created or updated visitor to its condo's entry, if one is built.
+
+        A visitor never changes condo, but an update may move it to another day.
+        """
+        entry = self.entries.get(visitor.condo_id)
+        if entry is None:
+            return
+        entry.discard(visitor.id)
+        if entry.day == visitor.visit_date:
+            entry.add(visitor)
+
+    def discard(self, visitor_id: int):
+        """Drop a deleted visitor from whichever entry holds it."""
+        for entry in self.entries.values():
+            entry.discard(visitor_id)
@@ -0,0 +1,125 @@
+import gzip
+import os
+from datetime import date
+
+import orjson
+
+from app.utils.cache import TTLCache
+from app.utils.http_cache import make_etag
+from app.utils.timing import timed
+
+SNAPSHOT_VERSION = 1
+# Short key sent in "k" -> visitor field; each row in "r" lists the values in this order
+SNAPSHOT_KEYS = {
+    "id": "id",
+    "n": "visit_name",
+    "d": "visit_date",
+    "p": "plate",
+    "i": "identification",
+    "s": "status",
+    "u": "unit_number",
+    "r": "user_id",
+}
+# Only visitors the gate may still let in; "expired" ones are left out
+STATUS_CODES = {"pending": "p", "approved": "a"}
+GZIP_LEVEL = int(os.getenv("GATE_SNAPSHOT_GZIP_LEVEL", "6"))
+
+
+def snapshot_row(visitor) -> list:
+    """Row of a visitor model, schema object or column-projection row."""
+    return [
+        visitor.id, visitor.visit_name, visitor.visit_date, visitor.plate, visitor.identification,
+        STATUS_CODES[visitor.status.value], visitor.unit_number, visitor.user_id,
+    ]
+
+
+class Snapshot:
+    """A condo's pending and approved visitors of a date window, kept gzip-serialised.
+
+    Writes change `rows` in place and drop the body; the next request
+    serialises and compresses again without going back to the database.
+    """
+
+    __slots__ = ("condo_id", "date_from", "date_to", "rows", "body", "etag", "size")
+
+    def __init__(self, condo_id: int, date_from: date, date_to: date, visitors=()):
+        self.condo_id = condo_id
+        self.date_from = date_from
+        self.date_to = date_to
+        self.rows = {visitor.id: snapshot_row(visitor) for visitor in visitors}
+        self.body = None
+        self.etag = None
+        self.size = None  # uncompressed bytes
+
+    def covers(self, visitor) -> bool:
+        return (
+            visitor.condo_id == self.condo_id
+            and self.date_from <= visitor.visit_date <= self.date_to
+            and visitor.status.value in STATUS_CODES
+        )
+
+    def apply(self, visitor):
+        row = snapshot_row(visitor) if self.covers(visitor) else None
+        if self.rows.get(visitor.id) == row:
+            return
+        if row is None:
+            del self.rows[visitor.id]
+        else:
+            self.rows[visitor.id] = row
+        self.body = None
+
+    def discard(self, visitor_id: int):
+        if self.rows.pop(visitor_id, None) is not None:
+            self.body = None
+
+    def render(self) -> bytes:
+        """The gzip body, serialised again only after a change."""
+        if self.body is None:
+            with timed("serialization"):
+                raw = orjson.dumps({
+                    "v": SNAPSHOT_VERSION,
+                    "c": self.condo_id,
+                    "f": self.date_from,
+                    "t": self.date_to,
+                    "k": list(SNAPSHOT_KEYS),
+                    "r": [self.rows[visitor_id] for visitor_id in sorted(self.rows)],
+                })
+                # mtime=0 keeps the bytes, and so the ETag, stable across rebuilds
+                self.body = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+            self.size = len(raw)
+            self.etag = make_etag(self.body)
+        return self.body
+
+
+class GateSnapshots:
+    """Gate tablet snapshots per (condo, date window), updated by visitor writes.
+
+    Writes from other workers show up when an entry expires, after
+    GATE_SNAPSHOT_TTL seconds; so do visitors the expiry job marks expired.
+    """
+
+    def __init__(self):
+        self.entries = TTLCache(
+            maxsize=int(os.getenv("GATE_SNAPSHOT_SIZE", "512")),
+            ttl=float(os.getenv("GATE_SNAPSHOT_TTL", "300")),
+            enabled=os.getenv("GATE_SNAPSHOT_ENABLED", "true").lower() not in ("0", "false", "no", "off"),
+            name="gate_snapshots",
+        )
+
+    def get(self, condo_id: int, date_from: date, date_to: date) -> Snapshot:
+        return self.entries.get((condo_id, date_from, date_to))
+
+    def build(self, condo_id: int, date_from: date, date_to: date, visitors) -> Snapshot:
+        snapshot = Snapshot(condo_id, date_from, date_to, visitors)
+        self.entries.set((condo_id, date_from, date_to), snapshot)
+        return snapshot
+
+    def record(self, visitor):
+        """Apply a created or updated visitor to every snapshot of its condo."""
+        for snapshot in self.entries.values():
+            if snapshot.condo_id == visitor.condo_id:
+                snapshot.apply(visitor)
+
+    def discard(self, visitor_id: int):
+        for snapshot in self.entries.values():
+            snapshot.discard(visitor_id)
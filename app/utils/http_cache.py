@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.schemas.pagination import Page
+from app.utils.responses import dump_json
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def version_etag(content, *fields) -> Optional[str]:
+    """ETag of a model, list or Page from each row's id and version, without serialising.
+
+    Every UPDATE bumps a row's version (see row_version_column), inserts and
+    deletes change the ids, and `fields` adds values the version does not
+    cover, like names joined from other tables. None if a row has no version.
+    """
+    if isinstance(content, Page):
+        items, extra = content.items, content.next_cursor
+    else:
+        items, extra = (content if isinstance(content, list) else [content]), None
+    parts = []
+    for item in items:
+        if item.version is None:
+            return None
+        parts.append((item.id, item.version, *(getattr(item, field) for field in fields)))
+    return make_etag(repr((parts, extra)).encode())
+
+
+def etag_response(request: Request, content, max_age: int = 0, adapter: TypeAdapter = None, etag: str = None) -> Response:
+    """Tag `content` with a strong ETag and answer 304 on a match.
+
+    With an `etag` from version_etag, a match is answered before anything is
+    serialised; otherwise the body is serialised once and its hash is the tag.
+    Returning a Response also skips FastAPI's second validation pass through
+    response_model, since CRUD results are already the declared models.
+    """
+    body = None
+    if etag is None:
+        body = dump_json(content, adapter)
+        etag = make_etag(body)
+    headers = {
+        "ETag": etag,
+        # Responses are per user (bearer auth), so only private caches may keep them
+        "Cache-Control": f"private, max-age={max_age}" if max_age else "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if body is None:
+        body = dump_json(content, adapter)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def gzip_etag_response(request: Request, body: bytes, etag: str, media_type: str = "application/json") -> Response:
+    """Serve a body kept gzip-compressed, tagged with `etag`, answering 304 on a match.
+
+    The rare client that does not accept gzip gets it decompressed. The two
+    bodies differ byte for byte, so the gzip one is tagged `etag` with a
+    "-gzip" suffix and a strong ETag never names both.
+    """
+    compressed = "gzip" in request.headers.get("accept-encoding", "").lower()
+    if compressed:
+        etag = etag[:-1] + '-gzip"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,10 +1,22 @@
+import hashlib
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
+from app.utils.cache import TTLCache
 
 SECRET_KEY = "your-secret-key"  # Replace with env var in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Decoded claims of tokens already verified, kept until the token expires
+token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "4096")),
+    ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    enabled=os.getenv("TOKEN_CACHE_ENABLED", "true").lower() not in ("0", "false", "no", "off"),
+    name="token",
+)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -13,10 +25,19 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 def verify_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = int(payload.get("user_id"))
         user_role = payload.get("user_role")
-        return {"user_id": user_id, "user_role": user_role}
+        condo_id = payload.get("condo_id")
+        credentials = {"user_id": user_id, "user_role": user_role, "condo_id": int(condo_id) if condo_id else None}
+        exp = payload.get("exp")
+        if exp is not None:
+            token_cache.set(key, credentials, ttl=exp - time.time())
+        return dict(credentials)
     except JWTError:
-        return None
\ No newline at end of file
+        return None
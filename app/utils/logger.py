@@ -1,14 +1,75 @@
+import atexit
 import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-# Configure the logger
-logging.basicConfig(
-    level=logging.DEBUG,  # Set to DEBUG for detailed logs
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Log to console
-        logging.FileHandler("app_debug.log", mode="a"),  # Log to a file
-    ],
-)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "app_debug.log")  # empty disables the file handler
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Per-logger sampling of INFO and below, e.g. "niddo-api=0.1,httpx=0.01"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+
+def _parse_sample_rates(value: str) -> dict:
+    rates = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of low-severity records per logger; warnings always pass."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        # Longest prefix first so "niddo-api.crud" wins over "niddo-api"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                return random.random() < rate
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueues the record untouched so %-formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Tracebacks cannot cross to another thread lazily; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+handlers = [logging.StreamHandler()]  # Log to console
+if LOG_FILE:
+    handlers.append(RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT))
+for handler in handlers:
+    handler.setFormatter(formatter)
+
+log_queue = queue.SimpleQueue()
+queue_handler = DeferredQueueHandler(log_queue)
+queue_handler.addFilter(SamplingFilter(_parse_sample_rates(LOG_SAMPLE_RATES)))
+
+# Configure the root logger to hand records to the background writer
+root_logger = logging.getLogger()
+root_logger.handlers = [queue_handler]
+root_logger.setLevel(LOG_LEVEL)
+
+listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
 
 # Create a logger instance
-logger = logging.getLogger("niddo-api")
\ No newline at end of file
+logger = logging.getLogger("niddo-api")
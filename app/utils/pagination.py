@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    """Query parameters shared by every keyset-paginated list route."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+def _to_json(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value):
+    python_type = column.type.python_type
+    if value is not None and python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], columns) -> Optional[list]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match ordering")
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_query(query, columns, after_values, limit: int, descending: bool = False):
+    """Order by `columns`, skip past `after_values` and fetch one extra row."""
+    if after_values is not None:
+        # (a, b) > (x, y) expanded to a > x OR (a = x AND b > y) so MySQL can use the index
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == after_values[j] for j in range(i)]
+            beyond = column < after_values[i] if descending else column > after_values[i]
+            clauses.append(and_(*equal, beyond))
+        query = query.where(or_(*clauses))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def merge_pages(row_lists, columns, limit: int):
+    """Merge keyset pages fetched from several shards into one page.
+
+    Each list must come from keyset_query with the same `after_values`, so
+    the first `limit` rows of the merge are the true next page.
+    """
+    rows = sorted(
+        (row for rows in row_lists for row in rows),
+        key=lambda row: tuple(getattr(row, column.key) for column in columns),
+    )
+    return split_page(rows, columns, limit)
+
+
+def split_page(rows, columns, limit: int):
+    """Drop the lookahead row and build the cursor pointing past the last item."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
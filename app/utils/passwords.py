@@ -0,0 +1,38 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel
+# without blocking the event loop. Requests beyond the queue limit are
+# rejected instead of piling up behind a login burst.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_in_flight = 0
+
+
+async def _run_bounded(func, *args):
+    global _in_flight
+    # Running plus queued jobs; the executor itself caps how many run at once
+    if _in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(status_code=503, detail="Too many login attempts, retry shortly", headers={"Retry-After": "1"})
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _in_flight -= 1
+
+
+async def verify_password(plain_password: str, password_hash: str) -> bool:
+    return await _run_bounded(pwd_context.verify, plain_password, password_hash)
+
+
+async def hash_password(plain_password: str) -> str:
+    return await _run_bounded(pwd_context.hash, plain_password)
@@ -0,0 +1,40 @@
+from functools import lru_cache
+from typing import List
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.utils.timing import timed
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model) -> TypeAdapter:
+    """Serializer for List[model], compiled once per model."""
+    return TypeAdapter(List[model])
+
+
+def dump_json(content, adapter: TypeAdapter = None) -> bytes:
+    with timed("serialization"):
+        if adapter is not None:
+            return adapter.dump_json(content)
+        # Models (and Page/BulkResult of models) carry their own compiled serializer
+        return pydantic_core.to_json(content)
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that reports its rendering time to the request timings."""
+
+    def render(self, content) -> bytes:
+        with timed("serialization"):
+            return super().render(content)
+
+
+def model_response(content, adapter: TypeAdapter = None, status_code: int = 200, headers: dict = None) -> Response:
+    """Serialise a CRUD result that already is the route's response model.
+
+    FastAPI would validate it against response_model again, dump it to dicts
+    and JSON-encode those; returning a Response skips straight to the bytes.
+    """
+    return Response(content=dump_json(content, adapter), status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+from app.utils.logger import logger
+
+
+class JobAlreadyRunning(Exception):
+    pass
+
+
+class Job:
+    """A periodic coroutine function plus the metrics of its runs."""
+
+    def __init__(self, name: str, interval: float, func, delay: float = None):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.delay = interval if delay is None else delay  # before the first run
+        self.next_run = None  # monotonic
+        self.last_started_at = None  # wall clock
+        self.last_duration_s = None
+        self.last_result = None
+        self.last_error = None
+        self.total_duration_s = 0.0
+
+    async def run(self):
+        if self.running:
+            raise JobAlreadyRunning(self.name)
+        self.running = True
+        self.last_started_at = time.time()
+        start = time.perf_counter()
+        try:
+            self.last_result = await self.func()
+            self.last_error = None
+            logger.info("Job %s finished: %s", self.name, self.last_result)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error("Job %s failed: %s", self.name, e)
+        finally:
+            self.running = False
+            self.runs += 1
+            self.last_duration_s = time.perf_counter() - start
+            self.total_duration_s += self.last_duration_s
+        return self.last_result
+
+    def snapshot(self) -> dict:
+        return {
+            "interval_s": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "next_run_in_s": round(max(self.next_run - time.monotonic(), 0.0), 1) if self.next_run is not None else None,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": round(self.last_duration_s * 1000, 2) if self.last_duration_s is not None else None,
+            "avg_duration_ms": round(self.total_duration_s / self.runs * 1000, 2) if self.runs else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Runs periodic jobs from a heap ordered by next run time.
+
+    One loop task sleeps until the earliest job is due, starts it as its own
+    task and pushes it back one interval later. A job still running when it
+    comes due again is skipped for that round. Started and stopped by the app
+    lifespan; JOBS_ENABLED=false leaves the loop off (e.g. on all but one
+    worker) while run-now keeps working.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("JOBS_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+        self.jobs = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self._running = set()
+
+    def add_job(self, name: str, interval: float, func, delay: float = None) -> Job:
+        """Register `func` (an async callable) to run every `interval` seconds, first after `delay`."""
+        job = Job(name, interval, func, delay)
+        self.jobs[name] = job
+        if self._task is not None:
+            self._schedule(job, job.delay)
+        return job
+
+    def _schedule(self, job: Job, delay: float):
+        job.next_run = time.monotonic() + delay
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            if self._heap:
+                due_at, _, job = self._heap[0]
+                timeout = max(due_at - time.monotonic(), 0.0)
+            else:
+                timeout = None
+            if timeout:
+                try:
+                    # Woken early when a job is added or rescheduled
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            elif timeout is None:
+                await self._wakeup.wait()
+                continue
+            _, _, job = heapq.heappop(self._heap)
+            if job.running:
+                logger.warning("Job %s still running, skipping this round", job.name)
+            else:
+                task = asyncio.create_task(job.run())
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            self._schedule(job, job.interval)
+
+    async def run_now(self, name: str):
+        """Run a job immediately, outside its schedule; KeyError if unknown."""
+        return await self.jobs[name].run()
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._wakeup = asyncio.Event()
+            # First runs count from startup, not from registration
+            self._heap = []
+            for job in self.jobs.values():
+                self._schedule(job, job.delay)
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        return {"enabled": self.enabled, "jobs": {name: job.snapshot() for name, job in self.jobs.items()}}
+
+
+# Application-wide scheduler, started and stopped by the app lifespan
+scheduler = JobScheduler()
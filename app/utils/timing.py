@@ -0,0 +1,228 @@
+import bisect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Upper bounds in seconds; the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ("auth", "db", "serialization")
+
+# Server-Timing tells any client where the time went; turn it off where that matters
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() not in ("0", "false", "no", "off")
+
+
+class RequestTimings:
+    """Seconds spent per stage while serving one request."""
+
+    __slots__ = ("auth", "db", "serialization", "db_queries", "fingerprints")
+
+    def __init__(self):
+        self.auth = 0.0
+        self.db = 0.0
+        self.serialization = 0.0
+        self.db_queries = 0
+        self.fingerprints = None  # statement fingerprint -> count, kept by the profiler
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f"auth;dur={self.auth * 1000:.2f}, "
+            f'db;dur={self.db * 1000:.2f};desc="{self.db_queries} queries", '
+            f"serialization;dur={self.serialization * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+_current: ContextVar = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings:
+    """Timings of the request being served, or None outside the middleware."""
+    return _current.get()
+
+
+@contextmanager
+def timed(stage: str):
+    """Add the wall time of the block to `stage` of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, stage, getattr(timings, stage) + time.perf_counter() - start)
+
+
+def attach_db_timing(engine, profiler=None):
+    """Charge every statement's execution time to the request that issued it.
+
+    An enabled StatementProfiler (app/db/profiler.py) is handed each
+    statement as well, to group them by fingerprint.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if profiler is not None and not profiler.enabled:
+        profiler = None
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.db += elapsed
+            timings.db_queries += 1
+        if profiler is not None:
+            profiler.record(statement, elapsed, timings)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def _render_histogram(lines: list, name: str, labels: str, histogram: Histogram):
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+class LatencyMetrics:
+    """Per-route latency histograms, rendered in the Prometheus text format.
+
+    Keyed by the route template, not the raw path, so ids in URLs do not
+    create new series. Not thread-safe; fed from the event loop.
+    """
+
+    def __init__(self):
+        self.requests = {}  # (method, route) -> Histogram
+        self.stages = {}  # (method, route, stage) -> Histogram
+        self.statuses = {}  # (method, route, status) -> count
+        self.db_queries = {}  # (method, route) -> count
+
+    def observe(self, method: str, route: str, status: int, total: float, timings: RequestTimings):
+        key = (method, route)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+            for stage in STAGES:
+                self.stages[(method, route, stage)] = Histogram()
+            self.db_queries[key] = 0
+        histogram.observe(total)
+        for stage in STAGES:
+            self.stages[(method, route, stage)].observe(getattr(timings, stage))
+        self.db_queries[key] += timings.db_queries
+        status_key = (method, route, status)
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Wall time to serve a request.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.requests.items()):
+            _render_histogram(lines, "http_request_duration_seconds", _labels(method=method, route=route), histogram)
+        lines += [
+            "# HELP http_request_stage_duration_seconds Time per request spent in auth, db and serialization.",
+            "# TYPE http_request_stage_duration_seconds histogram",
+        ]
+        for (method, route, stage), histogram in sorted(self.stages.items()):
+            _render_histogram(lines, "http_request_stage_duration_seconds", _labels(method=method, route=route, stage=stage), histogram)
+        lines += [
+            "# HELP http_requests_total Requests served, by response status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.statuses.items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        lines += [
+            "# HELP http_request_db_queries_total SQL statements executed while serving requests.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        for (method, route), count in sorted(self.db_queries.items()):
+            lines.append(f"http_request_db_queries_total{{{_labels(method=method, route=route)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Application-wide histograms, exposed on /metrics
+latency_metrics = LatencyMetrics()
+
+
+def _route(scope) -> str:
+    # The router stores the matched route in the scope; unmatched paths share one series
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class TimingMiddleware:
+    """ASGI middleware: times each request, adds Server-Timing and feeds latency_metrics.
+
+    With an enabled `profiler`, it also closes each request's query budget
+    check; in strict mode the problems found before the response starts
+    are sent in an X-Query-Budget-Exceeded header.
+    """
+
+    def __init__(self, app, metrics: LatencyMetrics = None, header: bool = None, profiler=None):
+        self.app = app
+        self.metrics = metrics if metrics is not None else latency_metrics
+        self.header = SERVER_TIMING_HEADER if header is None else header
+        self.profiler = profiler if profiler is not None and profiler.enabled else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if self.header:
+                    headers.append("Server-Timing", timings.server_timing(time.perf_counter() - start))
+                if self.profiler is not None and self.profiler.strict:
+                    problems = self.profiler.check(f"{scope['method']} {_route(scope)}", timings)
+                    if problems:
+                        headers.append("X-Query-Budget-Exceeded", "; ".join(problems))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = _route(scope)
+            self.metrics.observe(scope["method"], route, status, time.perf_counter() - start, timings)
+            if self.profiler is not None:
+                self.profiler.end_request(f"{scope['method']} {route}", timings)
@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def update_by_id(db: AsyncSession, model, row_id: int, values: dict) -> bool:
+    """UPDATE ... WHERE id = row_id in the caller's transaction; False if no row matched.
+
+    The MySQL dialects connect with CLIENT_FOUND_ROWS, so rowcount counts
+    matched rows and an update that changes nothing still reports 1.
+    """
+    statement = update(model).where(model.id == row_id).values(**values)
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    return result.rowcount > 0
+
+
+async def delete_by_id(db: AsyncSession, model, row_id: int) -> bool:
+    """DELETE ... WHERE id = row_id in the caller's transaction; False if no row matched."""
+    statement = delete(model).where(model.id == row_id)
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    return result.rowcount > 0
+
+
+async def update_in_chunks(db: AsyncSession, model, conditions: list, values: dict, chunk_size: int = 500, pause: float = 0.0) -> int:
+    """UPDATE every row matching `conditions`, at most `chunk_size` rows per transaction.
+
+    Each chunk selects the next ids past the previous chunk, then updates
+    them. The conditions are checked again in the UPDATE, in case a row
+    changed in between. Every chunk commits before the next starts, so row
+    locks are held only for one short statement. Returns the rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(model.id).where(*conditions, model.id > last_id).order_by(model.id).limit(chunk_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            await db.commit()
+            return updated
+        statement = update(model).where(model.id.in_(ids), *conditions).values(**values)
+        result = await db.execute(statement.execution_options(synchronize_session=False))
+        await db.commit()
+        updated += result.rowcount
+        last_id = ids[-1]
+        if pause:
+            await asyncio.sleep(pause)
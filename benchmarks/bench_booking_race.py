@@ -0,0 +1,114 @@
+"""Fire many simultaneous bookings for one slot and check exactly one wins.
+
+    python -m benchmarks.bench_booking_race
+    BENCH_DB_URL=mysql+aiomysql://... python -m benchmarks.bench_booking_race --no-process-lock
+
+Every booking must check its slot under SELECT ... FOR UPDATE on the
+amenity row; the script counts those statements on any database. On SQLite,
+which has no row locks, the in-process per-slot lock is what serialises
+the bookings. --no-process-lock replaces that lock with a no-op, so against
+MySQL only the row lock stands between the bookings, as it does between
+workers. Exits non-zero on a double booking or a booking that skipped the
+row lock.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import os
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+from benchmarks.common import admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+
+BOOKINGS = int(os.getenv("BENCH_BOOKINGS", "300"))
+
+
+async def seed():
+    from app.db.db import database
+    from app.models.amenity import Amenity
+    from app.models.condo import Condo
+    from app.models.user import User
+
+    async with database.SessionLocal() as session:
+        session.add(Condo(id=1, name="Bench", address="Somewhere"))
+        session.add(User(id=1, name="bench", email="bench@example.com", password_hash="x", role="admin", condo_id=1, unit="1A"))
+        session.add(Amenity(id=1, name="Grill", description="Rooftop grill", start_time=datetime.time(8), end_time=datetime.time(22), condo_id=1))
+        await session.commit()
+
+
+class AmenityLockCounter:
+    """Counts SELECT ... FOR UPDATE statements on the amenities table.
+
+    Checked on the compiled statement, since SQLite drops the FOR UPDATE
+    clause from the SQL it sends.
+    """
+
+    def __init__(self, engine):
+        self.locks = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        compiled = getattr(context, "compiled", None)
+        select = getattr(compiled, "statement", None)
+        if isinstance(select, Select) and select._for_update_arg is not None:
+            if any(getattr(table, "name", None) == "amenities" for table in select.get_final_froms()):
+                self.locks += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-process-lock", action="store_true", help="leave serialisation to the database row lock")
+    args = parser.parse_args()
+
+    if os.getenv("BENCH_DB_URL"):
+        os.environ["DB_URL"] = os.environ["BENCH_DB_URL"]
+    else:
+        use_sqlite()
+        if args.no_process_lock:
+            print("warning: SQLite has no row locks; --no-process-lock is only meaningful against MySQL")
+    quiet_logging()
+    await create_schema()
+    await seed()
+
+    from app.crud import reservartions
+    from app.db.db import database
+
+    if args.no_process_lock:
+        reservartions._slot_lock = lambda amenity_id, day: contextlib.nullcontext()
+    counter = AmenityLockCounter(database.engine)
+
+    body = {
+        "user_id": 1,
+        "amenity_id": 1,
+        "date": "2030-01-15",
+        "start_time": "18:00:00",
+        "end_time": "20:00:00",
+        "status": "pending",
+    }
+    async with client(admin_token()) as http:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(http.post("/reservations/", json=body) for _ in range(BOOKINGS)))
+        elapsed = time.perf_counter() - start
+
+    statuses = Counter(response.status_code for response in responses)
+    await close_database()
+    print(f"{BOOKINGS} bookings in {elapsed:.2f}s: {dict(statuses)}, {counter.locks} amenity row locks")
+    failed = False
+    if statuses.get(201) != 1 or statuses.get(409) != BOOKINGS - 1:
+        print("FAIL: expected exactly one 201 and the rest 409")
+        failed = True
+    if counter.locks != BOOKINGS:
+        print(f"FAIL: expected every booking to lock the amenity row, {counter.locks} of {BOOKINGS} did")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK: exactly one booking won, each under the amenity row lock")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
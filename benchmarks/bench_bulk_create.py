@@ -0,0 +1,97 @@
+"""N single POSTs versus one /bulk POST for visitors, reservations and blocks.
+
+    python -m benchmarks.bench_bulk_create
+    BENCH_DB_URL=mysql+aiomysql://... python -m benchmarks.bench_bulk_create
+
+Counts the INSERT statements and commits each run sends to the database
+alongside the wall time. Use an empty scratch database with BENCH_DB_URL.
+"""
+import asyncio
+import datetime
+import os
+import time
+
+from benchmarks.bench_booking_race import seed
+from benchmarks.common import StatementCounter, admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+
+ITEMS = int(os.getenv("BENCH_ITEMS", "200"))
+SLOTS_PER_DAY = 14  # the seeded amenity is open 08:00-22:00
+
+
+def visitors(offset: int):
+    day = datetime.date(2030, 1, 1)
+    return [
+        {"visit_name": f"guest {offset + i}", "identification": str(offset + i), "plate": f"P{offset + i}",
+         "visit_date": str(day), "user_id": 1, "condo_id": 1, "unit_number": "1A"}
+        for i in range(ITEMS)
+    ]
+
+
+def reservations(offset: int):
+    first_day = datetime.date(2030, 1, 1) + datetime.timedelta(days=offset)
+    return [
+        {"user_id": 1, "amenity_id": "1", "date": str(first_day + datetime.timedelta(days=i // SLOTS_PER_DAY)),
+         "start_time": f"{8 + i % SLOTS_PER_DAY:02d}:00:00", "end_time": f"{9 + i % SLOTS_PER_DAY:02d}:00:00",
+         "status": "pending"}
+        for i in range(ITEMS)
+    ]
+
+
+def blocks(offset: int):
+    first_day = datetime.date(2031, 1, 1) + datetime.timedelta(days=offset)
+    return [
+        {"amenity_id": 1, "start_date": str(first_day + datetime.timedelta(days=i)),
+         "end_date": str(first_day + datetime.timedelta(days=i)), "start_time": "06:00:00",
+         "end_time": "07:00:00", "reason": "maintenance"}
+        for i in range(ITEMS)
+    ]
+
+
+async def run(http, counter, label, path, items_single, items_bulk):
+    counter.reset()
+    start = time.perf_counter()
+    for item in items_single:
+        response = await http.post(path + "/", json=item)
+        assert response.status_code == 201, response.text
+    single = time.perf_counter() - start
+    single_counts = (counter.inserts, counter.commits)
+
+    counter.reset()
+    start = time.perf_counter()
+    response = await http.post(path + "/bulk", json=items_bulk)
+    bulk = time.perf_counter() - start
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert len(body["created"]) == ITEMS and not body["errors"], body["errors"][:3]
+
+    print(f"{label:<13}{single * 1000:>10.1f}ms {single_counts[0]:>5} ins {single_counts[1]:>5} commits"
+          f"{bulk * 1000:>10.1f}ms {counter.inserts:>5} ins {counter.commits:>5} commits"
+          f"{single / bulk:>8.1f}x")
+
+
+async def main():
+    if os.getenv("BENCH_DB_URL"):
+        os.environ["DB_URL"] = os.environ["BENCH_DB_URL"]
+    else:
+        use_sqlite()
+    quiet_logging()
+    await create_schema()
+    await seed()
+
+    from app.db.db import database
+
+    counter = StatementCounter(database.engine)
+    print(f"{ITEMS} items per run")
+    print(f"{'':<13}{'singles':>10}{'':>26}{'bulk':>10}{'':>26}{'speedup':>8}")
+    day_span = ITEMS // SLOTS_PER_DAY + 1
+    try:
+        async with client(admin_token()) as http:
+            await run(http, counter, "visitors", "/visitors", visitors(0), visitors(ITEMS))
+            await run(http, counter, "reservations", "/reservations", reservations(0), reservations(day_span))
+            await run(http, counter, "blocks", "/blocks", blocks(0), blocks(ITEMS))
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
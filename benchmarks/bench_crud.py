@@ -0,0 +1,629 @@
+"""Micro-benchmarks for every class in app/crud against in-memory async SQLite.
+
+    python -m benchmarks.bench_crud                           # all cases, small dataset
+    python -m benchmarks.bench_crud -k Visitors -k by_user    # cases matching any filter
+    python -m benchmarks.bench_crud --preset medium --rounds 200
+    python -m benchmarks.bench_crud --save-baseline           # record benchmarks/baselines/crud.json
+    python -m benchmarks.bench_crud --db-url sqlite+aiosqlite:////tmp/niddo-large.db --preset large
+
+Each case calls one CRUD method on a fresh session, the way a request
+would, and times only that call; any rows it needs (a reservation to
+delete, a free slot to book) are prepared untimed first. The dataset comes
+from benchmarks/dataset.py, so numbers are comparable between runs of the
+same preset. --db-url points at a database already seeded with
+`python -m benchmarks.dataset` for the given preset; write cases add and
+remove rows in it.
+
+Reports min, median and p95 per case and compares medians with the stored
+baseline, exiting non-zero when one grows by more than --tolerance (and
+more than --floor-ms) on the run and on each of its --retries re-runs.
+Each baseline median is first scaled by a short CPU calibration loop timed
+before the case, so a slow stretch of a shared machine is not a regression.
+Password hashing is left out (see bench_login). UserCRUD.create_user has
+no case: UserCreate carries no role, so the insert fails on the NOT NULL
+users.role column.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.common import percentile, quiet_logging, use_sqlite
+from benchmarks.dataset import LOADTEST_PASSWORD, add_spec_arguments, seed_dataset, spec_from_args
+
+HERE = Path(__file__).parent
+DEFAULT_OUTPUT = HERE / "results" / "crud-latest.json"
+DEFAULT_BASELINE = HERE / "baselines" / "crud.json"
+
+
+@dataclass
+class Case:
+    crud: str
+    name: str
+    run: object  # async (db, ctx, i, prepared) -> result
+    setup: object = None  # async (db, ctx, i) -> prepared, untimed
+
+    @property
+    def key(self) -> str:
+        return f"{self.crud}.{self.name}"
+
+
+CASES = []
+
+
+def case(crud: str, setup=None):
+    def register(run):
+        CASES.append(Case(crud, run.__name__, run, setup))
+        return run
+    return register
+
+
+class Context:
+    """The dataset spec plus a few fixed ids and helpers shared by the cases."""
+
+    def __init__(self, spec, password_hash: str):
+        self.spec = spec
+        self.password_hash = password_hash
+        self.condo_id = spec.condos // 2 + 1
+        self.user_id = spec.users_of_condo(self.condo_id)[1]
+        self.amenity_id = spec.amenities_of_condo(self.condo_id)[0]
+        self._slots = itertools.count()
+
+    def free_slot(self):
+        """A (date, start, end) after the seeded range, never handed out before."""
+        n = next(self._slots)
+        day = self.spec.start + datetime.timedelta(days=self.spec.days + 1 + n // 10)
+        hour = 9 + n % 10
+        return day, datetime.time(hour), datetime.time(hour + 1)
+
+
+async def _insert(db, model, row: dict) -> int:
+    result = await db.execute(insert(model).values(row))
+    await db.commit()
+    return result.inserted_primary_key[0]
+
+
+async def _cold_caches(db, ctx, i):
+    """Empty the read-through caches so a read case measures the database path."""
+    from app.crud.amenities import amenity_cache
+    from app.crud.condos import condo_cache
+
+    amenity_cache.clear()
+    condo_cache.clear()
+
+
+# --- AuthCRUD -------------------------------------------------------------
+
+@case("AuthCRUD")
+async def check_login(db, ctx, i, prepared):
+    from app.crud.auth import AuthCRUD
+    from app.schemas.auth import LoginRequest
+
+    return await AuthCRUD(db).check_login(LoginRequest(email=ctx.spec.email(ctx.user_id), password=LOADTEST_PASSWORD))
+
+
+# --- UserCRUD -------------------------------------------------------------
+
+@case("UserCRUD")
+async def get_user(db, ctx, i, prepared):
+    from app.crud.users import UserCRUD
+
+    return await UserCRUD(db).get_user(ctx.user_id)
+
+
+@case("UserCRUD")
+async def get_users_by_condo(db, ctx, i, prepared):
+    from app.crud.users import UserCRUD
+
+    return await UserCRUD(db).get_users_by_condo(ctx.condo_id, 50)
+
+
+@case("UserCRUD")
+async def get_all_users(db, ctx, i, prepared):
+    from app.crud.users import UserCRUD
+
+    return await UserCRUD(db).get_all_users(50)
+
+
+@case("UserCRUD")
+async def update_user(db, ctx, i, prepared):
+    from app.crud.users import UserCRUD
+    from app.schemas.user import UserUpdate
+
+    return await UserCRUD(db).update_user(ctx.user_id, UserUpdate(name=f"Renamed {i}", unit="2B"))
+
+
+async def _new_user(db, ctx, i):
+    from app.models.user import User
+
+    return await _insert(db, User, {
+        "name": "Doomed", "email": f"doomed{i}-{time.monotonic_ns()}@example.com", "password_hash": ctx.password_hash,
+        "role": "resident", "condo_id": ctx.condo_id, "unit": "0X",
+    })
+
+
+@case("UserCRUD", setup=_new_user)
+async def delete_user(db, ctx, i, user_id):
+    from app.crud.users import UserCRUD
+
+    return await UserCRUD(db).delete_user(user_id)
+
+
+# --- CondosCRUD -----------------------------------------------------------
+
+@case("CondosCRUD")
+async def create_condo(db, ctx, i, prepared):
+    from app.crud.condos import CondosCRUD
+    from app.schemas.condo import CondoCreate
+
+    return await CondosCRUD(db).create_condo(CondoCreate(name=f"Bench condo {i}", address="1 Bench Road"))
+
+
+@case("CondosCRUD", setup=_cold_caches)
+async def get_condo_by_id(db, ctx, i, prepared):
+    from app.crud.condos import CondosCRUD
+
+    return await CondosCRUD(db).get_condo_by_id(ctx.condo_id)
+
+
+@case("CondosCRUD", setup=_cold_caches)
+async def get_all_condos(db, ctx, i, prepared):
+    from app.crud.condos import CondosCRUD
+
+    return await CondosCRUD(db).get_all_condos(50)
+
+
+@case("CondosCRUD")
+async def update_condo(db, ctx, i, prepared):
+    from app.crud.condos import CondosCRUD
+    from app.schemas.condo import CondoUpdate
+
+    return await CondosCRUD(db).update_condo(ctx.condo_id, CondoUpdate(name=f"Condo {ctx.condo_id}", address=f"{i} Main Street"))
+
+
+async def _new_condo(db, ctx, i):
+    from app.models.condo import Condo
+
+    return await _insert(db, Condo, {"name": "Doomed", "address": "Nowhere"})
+
+
+@case("CondosCRUD", setup=_new_condo)
+async def delete_condo(db, ctx, i, condo_id):
+    from app.crud.condos import CondosCRUD
+
+    return await CondosCRUD(db).delete_condo(condo_id)
+
+
+# --- AmenityCRUD ----------------------------------------------------------
+
+@case("AmenityCRUD")
+async def create_amenity(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+    from app.schemas.amenity import AmenityCreate
+
+    return await AmenityCRUD(db).create_amenity(AmenityCreate(
+        name="Bench room", description="Benchmark", start_time=datetime.time(8), end_time=datetime.time(20), condo_id=ctx.condo_id,
+    ))
+
+
+@case("AmenityCRUD", setup=_cold_caches)
+async def get_amenity_by_id(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+
+    return await AmenityCRUD(db).get_amenity_by_id(ctx.amenity_id)
+
+
+@case("AmenityCRUD", setup=_cold_caches)
+async def get_all_amenities_by_condo(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+
+    return await AmenityCRUD(db).get_all_amenities_by_condo(ctx.condo_id)
+
+
+@case("AmenityCRUD")
+async def get_all_amenities_by_condo_cached(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+
+    return await AmenityCRUD(db).get_all_amenities_by_condo(ctx.condo_id)
+
+
+@case("AmenityCRUD")
+async def get_availability(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+
+    day = ctx.spec.start + datetime.timedelta(days=i % ctx.spec.days)
+    return await AmenityCRUD(db).get_availability(ctx.amenity_id, day, day + datetime.timedelta(days=6))
+
+
+@case("AmenityCRUD")
+async def update_amenity(db, ctx, i, prepared):
+    from app.crud.amenities import AmenityCRUD
+    from app.schemas.amenity import AmenityUpdate
+
+    opens = 6 + ctx.amenity_id % 3
+    return await AmenityCRUD(db).update_amenity(ctx.amenity_id, AmenityUpdate(
+        name="Pool", description=f"Shared amenity {i}", start_time=datetime.time(opens),
+        end_time=datetime.time(opens + 14), condo_id=ctx.condo_id,
+    ))
+
+
+async def _new_amenity(db, ctx, i):
+    from app.models.amenity import Amenity
+
+    return await _insert(db, Amenity, {
+        "name": "Doomed", "description": "", "start_time": datetime.time(8), "end_time": datetime.time(9), "condo_id": ctx.condo_id,
+    })
+
+
+@case("AmenityCRUD", setup=_new_amenity)
+async def delete_amenity(db, ctx, i, amenity_id):
+    from app.crud.amenities import AmenityCRUD
+
+    return await AmenityCRUD(db).delete_amenity(amenity_id)
+
+
+# --- BlockCRUD ------------------------------------------------------------
+
+def _block(ctx, i):
+    from app.schemas.block import BlockCreate
+
+    day = ctx.spec.start + datetime.timedelta(days=i % ctx.spec.days)
+    return BlockCreate(amenity_id=ctx.amenity_id, start_date=day, end_date=day,
+                       start_time=datetime.time(5), end_time=datetime.time(6), reason="bench")
+
+
+async def _new_block(db, ctx, i):
+    from app.models.block import Block
+
+    return await _insert(db, Block, _block(ctx, i).model_dump())
+
+
+@case("BlockCRUD")
+async def create_block(db, ctx, i, prepared):
+    from app.crud.blocks import BlockCRUD
+
+    return await BlockCRUD(db).create_block(_block(ctx, i))
+
+
+@case("BlockCRUD")
+async def create_blocks_bulk_50(db, ctx, i, prepared):
+    from app.crud.blocks import BlockCRUD
+
+    return await BlockCRUD(db).create_blocks_bulk([_block(ctx, i * 50 + n) for n in range(50)])
+
+
+@case("BlockCRUD", setup=_new_block)
+async def get_block_by_id(db, ctx, i, block_id):
+    from app.crud.blocks import BlockCRUD
+
+    return await BlockCRUD(db).get_block_by_id(block_id)
+
+
+@case("BlockCRUD")
+async def get_blocks_by_amenity(db, ctx, i, prepared):
+    from app.crud.blocks import BlockCRUD
+
+    return await BlockCRUD(db).get_blocks_by_amenity(ctx.amenity_id, 50)
+
+
+@case("BlockCRUD", setup=_new_block)
+async def update_block(db, ctx, i, block_id):
+    from app.crud.blocks import BlockCRUD
+    from app.schemas.block import BlockUpdate
+
+    block = _block(ctx, i)
+    return await BlockCRUD(db).update_block(block_id, BlockUpdate(**block.model_dump(exclude={"amenity_id"}) | {"reason": "moved"}))
+
+
+@case("BlockCRUD", setup=_new_block)
+async def delete_block(db, ctx, i, block_id):
+    from app.crud.blocks import BlockCRUD
+
+    return await BlockCRUD(db).delete_block(block_id)
+
+
+# --- ReservationCRUD ------------------------------------------------------
+
+def _reservation(ctx, schema=None):
+    from app.schemas.reservation import ReservationCreate
+
+    day, start, end = ctx.free_slot()
+    return (schema or ReservationCreate)(user_id=ctx.user_id, amenity_id=str(ctx.amenity_id), date=day,
+                                         start_time=start, end_time=end, status="pending")
+
+
+async def _new_reservation(db, ctx, i):
+    from app.models.reservation import Reservation
+
+    row = _reservation(ctx).model_dump()
+    row["amenity_id"] = int(row["amenity_id"])
+    return await _insert(db, Reservation, row)
+
+
+@case("ReservationCRUD")
+async def create_reservation(db, ctx, i, prepared):
+    from app.crud.reservartions import ReservationCRUD
+
+    return await ReservationCRUD(db).create_reservation(_reservation(ctx))
+
+
+@case("ReservationCRUD")
+async def create_reservations_bulk_50(db, ctx, i, prepared):
+    from app.crud.reservartions import ReservationCRUD
+
+    return await ReservationCRUD(db).create_reservations_bulk([_reservation(ctx) for _ in range(50)])
+
+
+@case("ReservationCRUD", setup=_new_reservation)
+async def get_reservation_by_id(db, ctx, i, reservation_id):
+    from app.crud.reservartions import ReservationCRUD
+
+    return await ReservationCRUD(db).get_reservation_by_id(reservation_id)
+
+
+@case("ReservationCRUD")
+async def get_reservations_by_user(db, ctx, i, prepared):
+    from app.crud.reservartions import ReservationCRUD
+
+    return await ReservationCRUD(db).get_reservations_by_user(ctx.user_id, 50)
+
+
+@case("ReservationCRUD")
+async def stream_reservations_by_condo(db, ctx, i, prepared):
+    from app.crud.reservartions import ReservationCRUD
+
+    return [row async for row in ReservationCRUD(db).stream_reservations_by_condo(ctx.condo_id)]
+
+
+@case("ReservationCRUD", setup=_new_reservation)
+async def update_reservation(db, ctx, i, reservation_id):
+    from app.crud.reservartions import ReservationCRUD
+    from app.schemas.reservation import ReservationUpdate
+
+    return await ReservationCRUD(db).update_reservation(reservation_id, _reservation(ctx, ReservationUpdate))
+
+
+@case("ReservationCRUD", setup=_new_reservation)
+async def delete_reservation(db, ctx, i, reservation_id):
+    from app.crud.reservartions import ReservationCRUD
+
+    return await ReservationCRUD(db).delete_reservation(reservation_id)
+
+
+# --- VisitorsCRUD ---------------------------------------------------------
+
+def _visitor(ctx, i, schema=None):
+    from app.schemas.visitor import VisitorCreate
+
+    fields = {"visit_name": f"Bench guest {i}", "identification": str(i), "plate": f"B{i:06d}",
+              "visit_date": ctx.spec.start + datetime.timedelta(days=i % ctx.spec.days), "unit_number": "2A"}
+    if schema is None:
+        return VisitorCreate(user_id=ctx.user_id, condo_id=ctx.condo_id, **fields)
+    return schema(status="approved", **fields)
+
+
+async def _new_visitor(db, ctx, i):
+    from app.models.visitor import Visitor
+
+    return await _insert(db, Visitor, _visitor(ctx, i).model_dump())
+
+
+@case("VisitorsCRUD")
+async def create_visitor(db, ctx, i, prepared):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).create_visitor(_visitor(ctx, i))
+
+
+@case("VisitorsCRUD")
+async def create_visitors_bulk_50(db, ctx, i, prepared):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).create_visitors_bulk([_visitor(ctx, i * 50 + n) for n in range(50)])
+
+
+@case("VisitorsCRUD", setup=_new_visitor)
+async def get_visitor_by_id(db, ctx, i, visitor_id):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).get_visitor_by_id(visitor_id)
+
+
+@case("VisitorsCRUD")
+async def get_visitors_by_user(db, ctx, i, prepared):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).get_visitors_by_user(ctx.user_id, 50)
+
+
+@case("VisitorsCRUD")
+async def get_visitors_by_condo(db, ctx, i, prepared):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).get_visitors_by_condo(ctx.condo_id, 50)
+
+
+@case("VisitorsCRUD")
+async def stream_visitors_by_condo(db, ctx, i, prepared):
+    from app.crud.visitors import VisitorsCRUD
+
+    return [row async for row in VisitorsCRUD(db).stream_visitors_by_condo(ctx.condo_id)]
+
+
+@case("VisitorsCRUD", setup=_new_visitor)
+async def update_visitor(db, ctx, i, visitor_id):
+    from app.crud.visitors import VisitorsCRUD
+    from app.schemas.visitor import VisitorUpdate
+
+    return await VisitorsCRUD(db).update_visitor(visitor_id, _visitor(ctx, i, VisitorUpdate))
+
+
+@case("VisitorsCRUD", setup=_new_visitor)
+async def delete_visitor(db, ctx, i, visitor_id):
+    from app.crud.visitors import VisitorsCRUD
+
+    return await VisitorsCRUD(db).delete_visitor(visitor_id)
+
+
+# --- runner ---------------------------------------------------------------
+
+def calibrate(rounds: int = 10) -> float:
+    """Median ms of a fixed pure-Python loop: how fast the machine is right now."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        sum(i * i for i in range(20_000))
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+async def run_case(sessions, ctx, bench: Case, rounds: int, warmup: int) -> dict:
+    calibration_ms = calibrate()
+    timings = []
+    for i in range(warmup + rounds):
+        async with sessions() as db:
+            prepared = await bench.setup(db, ctx, i) if bench.setup else None
+        async with sessions() as db:
+            start = time.perf_counter()
+            await bench.run(db, ctx, i, prepared)
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    median = statistics.median(timings)
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(median * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "ops": round(1 / median, 1) if median else None,
+        "calibration_ms": calibration_ms,
+    }
+
+
+def compare(cases: dict, baseline: dict, tolerance: float, floor_ms: float) -> dict:
+    """Cases whose median grew past the tolerance and the floor, worst first.
+
+    The baseline median is first scaled up by how much slower the machine
+    ran the calibration loop next to this case than next to the recorded one.
+    """
+    regressions = []
+    for key, now in cases.items():
+        before = baseline["cases"].get(key)
+        if not before or not before["median_ms"]:
+            continue
+        expected = before["median_ms"]
+        if before.get("calibration_ms"):
+            # Only ever loosened: the loop is short, and a fast reading is noise too
+            expected *= max(1.0, now["calibration_ms"] / before["calibration_ms"])
+        if now["median_ms"] > expected * (1 + tolerance) and now["median_ms"] - expected > floor_ms:
+            regressions.append((
+                now["median_ms"] / expected, key,
+                f"{key}: median {before['median_ms']}ms -> {now['median_ms']}ms (expected {expected:.3f}ms at this machine speed)",
+            ))
+    return {key: message for _, key, message in sorted(regressions, reverse=True)}
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"{'case':<52}{'min':>10}{'median':>10}{'p95':>10}{'ops/s':>9}{'vs base':>9}")
+    for key, stats in results["cases"].items():
+        before = (baseline or {}).get("cases", {}).get(key)
+        delta = f"{(stats['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%" if before and before["median_ms"] else ""
+        print(f"{key:<52}{stats['min_ms']:>9.2f}m{stats['median_ms']:>9.2f}m{stats['p95_ms']:>9.2f}m{stats['ops']:>9.0f}{delta:>9}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("-k", "--filter", action="append", default=[], help="run cases whose Class.method contains this")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--db-url", help="an already seeded database instead of in-memory SQLite")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed median growth (0.3 = 30%%)")
+    parser.add_argument("--floor-ms", type=float, default=0.05, help="ignore median growth smaller than this")
+    parser.add_argument("--retries", type=int, default=2, help="re-runs a flagged case gets before it counts as regressed")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    use_sqlite()  # keeps app.db from reading a real DB_URL on import
+    quiet_logging()
+    import app.models  # noqa: F401  registers mappers
+    import app.models.visitor  # noqa: F401
+    from app.db.db import Base
+    from app.utils.passwords import hash_password
+
+    if args.db_url:
+        engine = create_async_engine(args.db_url)
+    else:
+        # One shared connection, so every session sees the same in-memory database
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    password_hash = await hash_password(LOADTEST_PASSWORD)
+    ctx = Context(spec, password_hash)
+
+    selected = [bench for bench in CASES if not args.filter or any(term in bench.key for term in args.filter)]
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else None
+    cases = {}
+    regressions = {}
+    try:
+        if not args.db_url:
+            start = time.perf_counter()
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                counts = await seed_dataset(conn, spec, password_hash)
+            print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s")
+        for bench in selected:
+            cases[bench.key] = await run_case(sessions, ctx, bench, args.rounds, args.warmup)
+        if baseline:
+            # A slow stretch on a shared machine can move a median well past the
+            # tolerance, so a case only counts as regressed if every re-run agrees
+            regressions = compare(cases, baseline, args.tolerance, args.floor_ms)
+            for _ in range(args.retries):
+                for bench in selected:
+                    if bench.key in regressions:
+                        cases[bench.key] = await run_case(sessions, ctx, bench, args.rounds, args.warmup)
+                regressions = compare({key: cases[key] for key in regressions}, baseline, args.tolerance, args.floor_ms)
+    finally:
+        await engine.dispose()
+
+    results = {
+        "meta": {
+            "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "dataset": {"preset": args.preset, "condos": spec.condos, "users": spec.users, "seed": spec.seed},
+            "database": engine.url.drivername,
+            "rounds": args.rounds,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "cases": cases,
+    }
+    print_report(results, baseline)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    for message in regressions.values():
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""Gate lookup latency from the in-memory index versus the database.
+
+    python -m benchmarks.bench_gate_lookup
+    BENCH_VISITORS=500000 python -m benchmarks.bench_gate_lookup
+
+Seeds BENCH_VISITORS visitors (default 100k) of BENCH_CONDOS condos over a
+year of history, TODAY_PER_CONDO of them on today's date. Times
+GET /visitors/gate/{condo_id} by plate and by identification for today
+(served from the gate index), for a plate nobody registered today (a miss,
+confirmed against the database) and for yesterday (database only).
+Reports p50/p99 per lookup kind, then checks that a visitor created
+through the API is found by the index at once, by a plate typed in
+another case and spacing, and that only approved visitors are returned
+unless another status is asked for.
+"""
+import asyncio
+import datetime
+import os
+import random
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import admin_token, client, close_database, create_schema, percentile, quiet_logging, use_sqlite
+
+VISITORS = int(os.getenv("BENCH_VISITORS", "100000"))
+CONDOS = int(os.getenv("BENCH_CONDOS", "20"))
+TODAY_PER_CONDO = 200
+LOOKUPS = 300
+
+
+def plate(condo_id: int, n: int) -> str:
+    return f"C{condo_id}-{n:05d}"
+
+
+async def seed():
+    from app.db.db import database
+    from app.models import Condo, User, Visitor
+
+    rng = random.Random(42)
+    today = datetime.date.today()
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(Condo), [{"id": c, "name": f"Condo {c}", "address": "Street"} for c in range(1, CONDOS + 1)])
+        await conn.execute(insert(User), [
+            {"id": c, "name": f"resident {c}", "email": f"resident{c}@example.com", "password_hash": "x" * 60,
+             "role": "resident", "condo_id": c, "unit": "1A"}
+            for c in range(1, CONDOS + 1)
+        ])
+        rows = []
+        for n in range(VISITORS):
+            condo_id = n % CONDOS + 1
+            on_today = n // CONDOS < TODAY_PER_CONDO
+            rows.append({
+                "visit_name": f"guest {n}", "identification": f"ID{n:07d}", "plate": plate(condo_id, n),
+                "visit_date": today if on_today else today - datetime.timedelta(days=rng.randrange(1, 366)),
+                "status": "approved", "unit_number": "1A", "user_id": condo_id, "condo_id": condo_id,
+            })
+            if len(rows) == 5000:
+                await conn.execute(insert(Visitor), rows)
+                rows = []
+        if rows:
+            await conn.execute(insert(Visitor), rows)
+
+
+async def timed_lookups(http, params_for) -> list:
+    rng = random.Random(7)
+    timings = []
+    for _ in range(LOOKUPS):
+        condo_id, params = params_for(rng)
+        start = time.perf_counter()
+        response = await http.get(f"/visitors/gate/{condo_id}", params=params)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return timings
+
+
+async def main():
+    use_sqlite()
+    quiet_logging()
+    await create_schema()
+    print(f"Seeding {VISITORS} visitors over {CONDOS} condos...")
+    await seed()
+
+    from app.crud.visitors import gate_index
+
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+
+    def by_plate(rng):
+        n = rng.randrange(TODAY_PER_CONDO * CONDOS)
+        return n % CONDOS + 1, {"plate": plate(n % CONDOS + 1, n)}
+
+    def by_identification(rng):
+        n = rng.randrange(TODAY_PER_CONDO * CONDOS)
+        return n % CONDOS + 1, {"identification": f"ID{n:07d}"}
+
+    def unknown_plate(rng):
+        return rng.randrange(CONDOS) + 1, {"plate": f"NONE-{rng.randrange(10**6)}"}
+
+    def yesterday_by_plate(rng):
+        return rng.randrange(CONDOS) + 1, {"plate": "C1-00000", "visit_date": str(yesterday)}
+
+    kinds = [
+        ("today by plate (index)", by_plate),
+        ("today by identification (index)", by_identification),
+        ("today, unknown plate (index miss)", unknown_plate),
+        ("yesterday by plate (database)", yesterday_by_plate),
+    ]
+    try:
+        async with client(admin_token()) as http:
+            for label, params_for in kinds:
+                timings = await timed_lookups(http, params_for)
+                print(f"{label:<36} p50 {percentile(timings, 50):6.2f}ms  p99 {percentile(timings, 99):6.2f}ms")
+            print(f"gate index: {gate_index.entries.stats()}")
+
+            for name, status in (("late guest", "approved"), ("unconfirmed guest", "pending")):
+                response = await http.post("/visitors/", json={
+                    "visit_name": name, "plate": "NEW-001", "visit_date": str(today), "status": status,
+                    "user_id": 1, "condo_id": 1, "unit_number": "1A",
+                })
+                response.raise_for_status()
+            entry = gate_index.get(1, today)
+            found = await http.get("/visitors/gate/1", params={"plate": "NEW-001"})
+            ok = entry is not None and entry.lookup("NEW-001") and [v["visit_name"] for v in found.json()] == ["late guest"]
+            print(f"{'OK  ' if ok else 'FAIL'} a visitor created through the API is in the index at once")
+            found = await http.get("/visitors/gate/1", params={"plate": "new 001"})
+            ok = [v["visit_name"] for v in found.json()] == ["late guest"]
+            print(f"{'OK  ' if ok else 'FAIL'} plates match regardless of case, spaces and dashes")
+            found = await http.get("/visitors/gate/1", params={"plate": "NEW-001", "status": "pending"})
+            ok = [v["visit_name"] for v in found.json()] == ["unconfirmed guest"]
+            print(f"{'OK  ' if ok else 'FAIL'} pending visitors are returned only when asked for")
+            response = await http.post("/visitors/", json={
+                "visit_name": "earlier guest", "plate": "OLD-777", "visit_date": str(yesterday), "status": "approved",
+                "user_id": 1, "condo_id": 1, "unit_number": "1A",
+            })
+            response.raise_for_status()
+            found = await http.get("/visitors/gate/1", params={"plate": "old 777", "visit_date": str(yesterday)})
+            ok = [v["visit_name"] for v in found.json()] == ["earlier guest"]
+            print(f"{'OK  ' if ok else 'FAIL'} the database lookup normalizes plates the same way")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Payload size and build time of the gate tablet snapshot.
+
+    python -m benchmarks.bench_gate_snapshot
+    BENCH_VISITORS=100000 BENCH_WINDOW_VISITORS=2000 python -m benchmarks.bench_gate_snapshot
+
+Seeds one condo with BENCH_VISITORS visitors (default 20k) over a year
+of history, BENCH_WINDOW_VISITORS of them (default 500) in the week
+starting today. Compares the bytes a tablet downloads today, the full
+visitor history paged through GET /visitors/visitorsbycondo/{condo_id},
+with GET /visitors/snapshot/{condo_id} for the week, uncompressed and
+gzip. Then times a cold snapshot build (query, serialise, compress), a
+warm request, a 304 revalidation and a request right after a visitor
+update, which re-serialises from memory without querying.
+"""
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+
+VISITORS = int(os.getenv("BENCH_VISITORS", "20000"))
+WINDOW_VISITORS = int(os.getenv("BENCH_WINDOW_VISITORS", "500"))
+RUNS = 20
+
+
+async def seed(today: datetime.date):
+    from app.db.db import database
+    from app.models import Condo, User, Visitor
+
+    rng = random.Random(42)
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(Condo).values(id=1, name="Bench", address="Street"))
+        await conn.execute(insert(User).values(id=1, name="resident", email="resident@example.com", password_hash="x" * 60,
+                                               role="resident", condo_id=1, unit="1A"))
+        rows = [
+            {
+                "visit_name": f"Guest number {n}", "identification": f"{rng.randrange(10**8, 10**9)}",
+                "plate": f"{rng.choice('BCDFGHJKLMNPRSTVWXYZ')}{rng.choice('BCDFGHJKLMNPRSTVWXYZ')}{rng.randrange(1000, 9999)}",
+                "visit_date": (today + datetime.timedelta(days=rng.randrange(7)) if n < WINDOW_VISITORS
+                               else today - datetime.timedelta(days=rng.randrange(1, 366))),
+                "status": rng.choice(["pending", "approved"]), "unit_number": f"{rng.randrange(1, 30)}{rng.choice('ABCD')}",
+                "user_id": 1, "condo_id": 1,
+            }
+            for n in range(VISITORS)
+        ]
+        for start in range(0, len(rows), 5000):
+            await conn.execute(insert(Visitor), rows[start:start + 5000])
+
+
+async def history_bytes(http) -> int:
+    total, after = 0, None
+    while True:
+        response = await http.get("/visitors/visitorsbycondo/1", params={"limit": 100, **({"after": after} if after else {})})
+        total += len(response.content)
+        after = response.json()["next_cursor"]
+        if not after:
+            return total
+
+
+async def timed_get(http, path: str, params: dict, headers: dict = None):
+    start = time.perf_counter()
+    response = await http.get(path, params=params, headers=headers)
+    return (time.perf_counter() - start) * 1000, response
+
+
+async def main():
+    use_sqlite()
+    quiet_logging()
+    await create_schema()
+    today = datetime.date.today()
+    await seed(today)
+
+    from app.crud.visitors import gate_snapshots
+
+    path = "/visitors/snapshot/1"
+    window = {"date_from": str(today), "date_to": str(today + datetime.timedelta(days=6))}
+    try:
+        async with client(admin_token()) as http:
+            full = await history_bytes(http)
+
+            cold = []
+            for _ in range(RUNS):
+                gate_snapshots.entries.clear()
+                elapsed, response = await timed_get(http, path, window)
+                cold.append(elapsed)
+            # httpx decodes the body; the transfer is the gzip stream
+            compressed = int(response.headers["content-length"])
+            raw = len(response.content)
+            etag = response.headers["etag"]
+            snapshot = gate_snapshots.get(1, today, today + datetime.timedelta(days=6))
+
+            warm = [(await timed_get(http, path, window))[0] for _ in range(RUNS)]
+            not_modified = [(await timed_get(http, path, window, {"If-None-Match": etag}))[0] for _ in range(RUNS)]
+
+            visitor_id = next(iter(snapshot.rows))
+            updated = []
+            for n in range(RUNS):
+                await http.put(f"/visitors/{visitor_id}", json={
+                    "visit_name": f"Renamed {n}", "visit_date": str(today), "status": "approved", "unit_number": "1A",
+                })
+                updated.append((await timed_get(http, path, window))[0])
+            check = await http.get(path, params=window)
+            incremental_ok = f"Renamed {RUNS - 1}".encode() in check.content and gate_snapshots.get(1, today, today + datetime.timedelta(days=6)) is snapshot
+    finally:
+        await close_database()
+
+    print(f"{VISITORS} visitors in the condo, {len(snapshot.rows)} pending/approved in the 7-day window\n")
+    print(f"{'full history JSON (all pages)':<36} {full:>10,} bytes")
+    print(f"{'snapshot JSON, short keys':<36} {raw:>10,} bytes")
+    print(f"{'snapshot gzip (transferred)':<36} {compressed:>10,} bytes  ({full / compressed:.0f}x smaller than the history)\n")
+    for label, timings in [
+        ("cold build (query + serialise + gzip)", cold),
+        ("warm request (cached body)", warm),
+        ("If-None-Match revalidation (304)", not_modified),
+        ("after an update (re-serialise only)", updated),
+    ]:
+        print(f"{label:<40} median {statistics.median(timings):6.2f}ms")
+    print(f"\n{'OK  ' if incremental_ok else 'FAIL'} an update is applied to the cached snapshot without a rebuild")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
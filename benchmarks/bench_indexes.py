@@ -0,0 +1,156 @@
+"""Query plans and timings of the hot CRUD queries on the initial schema's
+indexes only and with every index added since (migrations 0002-0004).
+
+    python -m benchmarks.bench_indexes
+    BENCH_DB_URL=mysql+aiomysql://... python -m benchmarks.bench_indexes
+
+Seeds BENCH_VISITORS visitors (default 200k) spread over condos, users and
+amenities, drops every index migration 0001 did not create, runs every
+query, then recreates those indexes and runs them again. Use an empty scratch database with BENCH_DB_URL.
+"""
+import asyncio
+import datetime
+import os
+import random
+import time
+
+from sqlalchemy import insert, select, text
+
+from benchmarks.common import create_schema, quiet_logging, use_sqlite
+
+VISITORS = int(os.getenv("BENCH_VISITORS", "200000"))
+RESERVATIONS = VISITORS // 2
+CONDOS = 50
+USERS_PER_CONDO = 40
+AMENITIES_PER_CONDO = 4
+RUNS = 30
+# Created by migration 0001; the "before" run keeps only these
+INITIAL_INDEXES = {
+    "ix_condos_id",
+    "ix_users_id",
+    "ix_users_email",
+    "ix_amenities_id",
+    "ix_blocks_id",
+    "ix_visitors_id",
+}
+
+
+async def seed(conn):
+    from app.models import Amenity, Block, Condo, Reservation, User, Visitor
+
+    rng = random.Random(42)
+    start = datetime.date(2024, 1, 1)
+    users = CONDOS * USERS_PER_CONDO
+    amenities = CONDOS * AMENITIES_PER_CONDO
+
+    await conn.execute(insert(Condo), [{"id": c, "name": f"Condo {c}", "address": "Street"} for c in range(1, CONDOS + 1)])
+    await conn.execute(insert(User), [
+        {"id": u, "name": f"User {u}", "email": f"user{u}@example.com", "password_hash": "x", "role": "resident",
+         "condo_id": (u - 1) // USERS_PER_CONDO + 1, "unit": str(u)}
+        for u in range(1, users + 1)
+    ])
+    await conn.execute(insert(Amenity), [
+        {"id": a, "name": f"Amenity {a}", "description": "", "start_time": datetime.time(8), "end_time": datetime.time(22),
+         "condo_id": (a - 1) // AMENITIES_PER_CONDO + 1}
+        for a in range(1, amenities + 1)
+    ])
+    await conn.execute(insert(Block), [
+        {"amenity_id": rng.randint(1, amenities), "start_date": start + datetime.timedelta(days=d), "end_date": start + datetime.timedelta(days=d + 2),
+         "start_time": datetime.time(8), "end_time": datetime.time(12)}
+        for d in range(0, 700, 2) for _ in range(5)
+    ])
+    batch = 10000
+    for offset in range(0, VISITORS, batch):
+        rows = []
+        for _ in range(min(batch, VISITORS - offset)):
+            user = rng.randint(1, users)
+            rows.append({
+                "visit_name": "Guest", "user_id": user, "condo_id": (user - 1) // USERS_PER_CONDO + 1,
+                "visit_date": start + datetime.timedelta(days=rng.randint(0, 729)), "status": "approved", "unit_number": "1",
+            })
+        await conn.execute(insert(Visitor), rows)
+    for offset in range(0, RESERVATIONS, batch):
+        rows = []
+        for _ in range(min(batch, RESERVATIONS - offset)):
+            hour = rng.randint(8, 20)
+            rows.append({
+                "user_id": rng.randint(1, users), "amenity_id": rng.randint(1, amenities),
+                "date": start + datetime.timedelta(days=rng.randint(0, 729)),
+                "start_time": datetime.time(hour), "end_time": datetime.time(hour + 1), "status": "confirmed",
+            })
+        await conn.execute(insert(Reservation), rows)
+
+
+def hot_queries():
+    from app.models import Block, Reservation, User, Visitor
+    from app.utils.pagination import keyset_query
+
+    day = datetime.date(2024, 6, 1)
+    return {
+        "visitors_by_condo": keyset_query(select(Visitor).where(Visitor.condo_id == 7), [Visitor.visit_date, Visitor.id], None, 50, descending=True),
+        "visitors_by_user": keyset_query(select(Visitor).where(Visitor.user_id == 77), [Visitor.visit_date, Visitor.id], None, 50, descending=True),
+        "reservations_by_user": keyset_query(select(Reservation).where(Reservation.user_id == 77), [Reservation.date, Reservation.id], None, 50, descending=True),
+        "reservation_overlap": select(Reservation.id).where(
+            Reservation.amenity_id == 9, Reservation.date == day,
+            Reservation.start_time < datetime.time(11), Reservation.end_time > datetime.time(10),
+        ).limit(1),
+        "availability_range": select(Reservation.date, Reservation.start_time, Reservation.end_time).where(
+            Reservation.amenity_id == 9, Reservation.date.between(day, day + datetime.timedelta(days=30)),
+        ),
+        "blocks_by_amenity": keyset_query(select(Block).where(Block.amenity_id == 9), [Block.start_date, Block.id], None, 50),
+        "users_by_condo": keyset_query(select(User).where(User.condo_id == 7), [User.id], None, 50),
+    }
+
+
+async def measure(conn, dialect: str) -> dict:
+    results = {}
+    for name, query in hot_queries().items():
+        compiled = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        explain = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        plan = (await conn.execute(text(explain + compiled))).all()
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            (await conn.execute(query)).all()
+        results[name] = {"ms": (time.perf_counter() - start) / RUNS * 1000, "plan": [" | ".join(str(c) for c in row) for row in plan]}
+    return results
+
+
+async def main():
+    if os.getenv("BENCH_DB_URL"):
+        os.environ["DB_URL"] = os.environ["BENCH_DB_URL"]
+    else:
+        use_sqlite()
+    quiet_logging()
+    await create_schema()
+
+    from app.db.db import Base, database
+
+    indexes = [index for table in Base.metadata.tables.values() for index in table.indexes if index.name not in INITIAL_INDEXES]
+    dialect = database.engine.dialect.name
+
+    async with database.engine.begin() as conn:
+        start = time.perf_counter()
+        await seed(conn)
+        print(f"seeded {VISITORS} visitors / {RESERVATIONS} reservations in {time.perf_counter() - start:.1f}s")
+
+    async with database.engine.begin() as conn:
+        for index in indexes:
+            await conn.run_sync(index.drop)
+        if dialect == "sqlite":
+            await conn.execute(text("ANALYZE"))
+        before = await measure(conn, dialect)
+        for index in indexes:
+            await conn.run_sync(index.create)
+        if dialect == "sqlite":
+            await conn.execute(text("ANALYZE"))
+        after = await measure(conn, dialect)
+    await database.close()
+
+    for name in before:
+        print(f"\n{name}: {before[name]['ms']:.2f}ms -> {after[name]['ms']:.2f}ms")
+        print("  before: " + "; ".join(before[name]["plan"]))
+        print("  after:  " + "; ".join(after[name]["plan"]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
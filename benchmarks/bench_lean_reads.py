@@ -0,0 +1,150 @@
+"""Full ORM entity loads versus the column-projection reads, on large results.
+
+    python -m benchmarks.bench_lean_reads
+    BENCH_ROWS=50000 python -m benchmarks.bench_lean_reads
+
+Seeds BENCH_ROWS (default 10k) reservations for one user and as many blocks
+for one amenity, then reads them all in one page both the old way (joinedload
+of User/Amenity, ORM objects, then schema objects) and through the CRUD
+methods. Reports the median time and the tracemalloc peak of each.
+"""
+import asyncio
+import datetime
+import os
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+
+from benchmarks.common import close_database, create_schema, quiet_logging, use_sqlite
+
+ROWS = int(os.getenv("BENCH_ROWS", "10000"))
+RUNS = 7
+LOGINS = 2000
+
+
+async def seed():
+    from app.db.db import database
+    from app.models import Amenity, Block, Condo, Reservation, User
+
+    start = datetime.date(2024, 1, 1)
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(Condo), [{"id": 1, "name": "Bench", "address": "Street"}])
+        await conn.execute(insert(User), [{"id": 1, "name": "bench", "email": "bench@example.com", "password_hash": "x" * 60,
+                                           "role": "resident", "condo_id": 1, "unit": "1A"}])
+        await conn.execute(insert(Amenity), [{"id": 1, "name": "Grill", "description": "Rooftop grill " * 20,
+                                              "start_time": datetime.time(8), "end_time": datetime.time(22), "condo_id": 1}])
+        await conn.execute(insert(Reservation), [
+            {"user_id": 1, "amenity_id": 1, "date": start + datetime.timedelta(days=i // 14),
+             "start_time": datetime.time(8 + i % 14), "end_time": datetime.time(9 + i % 14), "status": "confirmed"}
+            for i in range(ROWS)
+        ])
+        await conn.execute(insert(Block), [
+            {"amenity_id": 1, "start_date": start + datetime.timedelta(days=i), "end_date": start + datetime.timedelta(days=i),
+             "start_time": datetime.time(6), "end_time": datetime.time(7), "reason": "maintenance"}
+            for i in range(ROWS)
+        ])
+
+
+async def entity_reservations(session):
+    from app.models import Reservation
+    from app.schemas.reservation import ReservationOut
+
+    result = await session.execute(
+        select(Reservation)
+        .options(joinedload(Reservation.user), joinedload(Reservation.amenity))
+        .where(Reservation.user_id == 1)
+        .order_by(Reservation.date.desc(), Reservation.id.desc())
+        .limit(ROWS + 1)
+    )
+    return [
+        ReservationOut.model_validate({
+            "date": r.date, "start_time": r.start_time, "end_time": r.end_time, "status": r.status,
+            "user_name": r.user.name, "amenity_name": r.amenity.name,
+        })
+        for r in result.scalars().all()
+    ]
+
+
+async def entity_blocks(session):
+    from app.models import Block
+    from app.schemas.block import BlockOut
+
+    result = await session.execute(
+        select(Block).options(joinedload(Block.amenity)).where(Block.amenity_id == 1)
+        .order_by(Block.start_date, Block.id).limit(ROWS + 1)
+    )
+    return [
+        BlockOut(amenity_name=b.amenity.name, start_date=b.start_date, end_date=b.end_date,
+                 start_time=b.start_time, end_time=b.end_time, reason=b.reason)
+        for b in result.scalars().all()
+    ]
+
+
+async def entity_login(session):
+    from app.models import User
+
+    result = await session.execute(select(User).where(User.email == "bench@example.com"))
+    return result.scalars().first()
+
+
+async def measure(factory):
+    """Median wall time over RUNS fresh sessions, and the peak traced memory of one run."""
+    from app.db.db import database
+
+    times = []
+    for _ in range(RUNS):
+        async with database.SessionLocal() as session:
+            start = time.perf_counter()
+            await factory(session)
+            times.append(time.perf_counter() - start)
+    async with database.SessionLocal() as session:
+        tracemalloc.start()
+        await factory(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+async def main():
+    use_sqlite()
+    quiet_logging()
+    await create_schema()
+    await seed()
+
+    from app.crud.auth import AuthCRUD
+    from app.crud.blocks import BlockCRUD
+    from app.crud.reservartions import ReservationCRUD
+    from app.schemas.auth import LoginRequest
+
+    login = LoginRequest(email="bench@example.com", password="irrelevant")
+
+    async def logins(check):
+        async def run(session):
+            for _ in range(LOGINS):
+                await check(session)
+        return run
+
+    cases = [
+        (f"reservations by user ({ROWS})", entity_reservations,
+         lambda session: ReservationCRUD(session).get_reservations_by_user(1, ROWS)),
+        (f"blocks by amenity ({ROWS})", entity_blocks,
+         lambda session: BlockCRUD(session).get_blocks_by_amenity(1, ROWS)),
+        (f"login lookup (x{LOGINS})", await logins(entity_login),
+         await logins(lambda session: AuthCRUD(session).check_login(login))),
+    ]
+    print(f"{'':<28}{'entities':>12}{'lean':>12}{'speedup':>9}{'entities peak':>15}{'lean peak':>12}")
+    try:
+        for label, before, after in cases:
+            before_time, before_peak = await measure(before)
+            after_time, after_peak = await measure(after)
+            print(f"{label:<28}{before_time * 1000:>10.1f}ms{after_time * 1000:>10.1f}ms{before_time / after_time:>8.1f}x"
+                  f"{before_peak / 2**20:>13.2f}MB{after_peak / 2**20:>10.2f}MB")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
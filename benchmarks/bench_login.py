@@ -0,0 +1,118 @@
+"""Login burst vs. latency of unrelated requests.
+
+Fires BENCH_LOGINS concurrent logins while a probe loop keeps reading a
+condo, once with bcrypt verified inline on the event loop and once through
+app.utils.passwords. Reports probe latency percentiles for each mode, and
+how long a pooled connection stays checked out on average; login gives
+its connection back before bcrypt, so that is milliseconds, not the
+length of a password check.
+
+    python -m benchmarks.bench_login
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import admin_token, client, close_database, create_schema, percentile, quiet_logging, use_sqlite
+
+LOGINS = int(os.getenv("BENCH_LOGINS", "20"))
+
+
+async def seed():
+    from app.db.db import database
+    from app.models.condo import Condo
+    from app.models.user import User
+    from app.utils.passwords import hash_password
+
+    async with database.SessionLocal() as session:
+        session.add(Condo(id=1, name="Bench", address="Somewhere"))
+        session.add(User(id=1, name="bench", email="bench@example.com", password_hash=await hash_password("benchpass"), role="admin", condo_id=1, unit="1A"))
+        await session.commit()
+
+
+class CheckoutTimes:
+    """How long connections stay checked out of an (async) engine's pool."""
+
+    def __init__(self, engine):
+        self.started = {}
+        self.held = []
+        event.listen(engine.sync_engine, "checkout", self.on_checkout)
+        event.listen(engine.sync_engine, "checkin", self.on_checkin)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.started[id(connection_record)] = time.perf_counter()
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        start = self.started.pop(id(connection_record), None)
+        if start is not None:
+            self.held.append(time.perf_counter() - start)
+
+
+async def scenario(label: str, connections: CheckoutTimes) -> dict:
+    probe_latencies = []
+    done = asyncio.Event()
+    connections.held = []
+
+    async with client(admin_token()) as http:
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await http.get("/condos/1")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+
+        async def login():
+            response = await http.post("/auth/login", json={"email": "bench@example.com", "password": "benchpass"})
+            assert response.status_code == 200, response.text
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(LOGINS)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "mode": label,
+        "logins_per_s": LOGINS / elapsed,
+        "probe_requests": len(probe_latencies),
+        "probe_p50_ms": percentile(probe_latencies, 50) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 99) * 1000,
+        "held_ms": sum(connections.held) / len(connections.held) * 1000,
+    }
+
+
+async def main():
+    use_sqlite()
+    quiet_logging()
+    import app.routers.auth as auth_router
+    from app.utils.passwords import pwd_context, verify_password
+
+    from app.db.db import database
+
+    await create_schema()
+    await seed()
+    connections = CheckoutTimes(database.engine)
+
+    async def verify_inline(plain, hashed):
+        return pwd_context.verify(plain, hashed)
+
+    auth_router.verify_password = verify_inline
+    inline = await scenario("inline", connections)
+    auth_router.verify_password = verify_password
+    pooled = await scenario("thread pool", connections)
+    await close_database()
+
+    print(f"{LOGINS} concurrent logins")
+    for result in (inline, pooled):
+        print(
+            f"{result['mode']:>12}: {result['logins_per_s']:6.1f} logins/s, "
+            f"probe n={result['probe_requests']:4d} p50={result['probe_p50_ms']:8.1f}ms p99={result['probe_p99_ms']:8.1f}ms, "
+            f"connection held {result['held_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
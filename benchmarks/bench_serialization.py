@@ -0,0 +1,82 @@
+"""Cost of turning a large CRUD result into response bytes.
+
+    python -m benchmarks.bench_serialization
+    BENCH_ITEMS=50000 python -m benchmarks.bench_serialization
+
+Compares FastAPI's response_model path (validate, dump to dicts, encode)
+with the stdlib and orjson response classes against model_response, which
+dumps the already-validated models straight to JSON. No database needed.
+"""
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.common import quiet_logging
+
+ITEMS = int(os.getenv("BENCH_ITEMS", "10000"))
+RUNS = 9
+
+
+async def timed(func) -> float:
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        body = await func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(body)
+
+
+async def main():
+    quiet_logging()
+    from app.schemas.amenity import AmenityOut
+    from app.schemas.pagination import Page
+    from app.schemas.visitor import VisitorOut
+    from app.utils.responses import list_adapter, model_response
+
+    visitors = Page[VisitorOut](items=[
+        VisitorOut(id=i, identification=str(i), visit_name=f"Guest {i}", user_id=1, condo_id=1, plate=f"P{i}",
+                   visit_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365), status="approved",
+                   unit_number="1A")
+        for i in range(ITEMS)
+    ])
+    amenities = [
+        AmenityOut(id=i, name=f"Amenity {i}", description="Rooftop grill", start_time=datetime.time(8), end_time=datetime.time(22))
+        for i in range(ITEMS)
+    ]
+    cases = [
+        (f"Page[VisitorOut] x{ITEMS}", Page[VisitorOut], visitors, None),
+        (f"List[AmenityOut] x{ITEMS}", List[AmenityOut], amenities, list_adapter(AmenityOut)),
+    ]
+
+    print(f"{'':<26}{'stdlib json':>13}{'orjson':>11}{'model_response':>16}{'speedup':>9}")
+    for label, response_model, content, adapter in cases:
+        field = create_model_field("Response", response_model, mode="serialization")
+
+        async def fastapi_path(response_class):
+            async def run():
+                return response_class(await serialize_response(field=field, response_content=content)).body
+            return run
+
+        async def direct():
+            return model_response(content, adapter).body
+
+        expected = (await (await fastapi_path(JSONResponse))()).decode()
+        assert json.loads(expected) == json.loads(await direct()), "model_response body differs"
+
+        stdlib, size = await timed(await fastapi_path(JSONResponse))
+        orjson_time, _ = await timed(await fastapi_path(ORJSONResponse))
+        fast, fast_size = await timed(direct)
+        print(f"{label:<26}{stdlib * 1000:>11.1f}ms{orjson_time * 1000:>9.1f}ms{fast * 1000:>14.1f}ms{stdlib / fast:>8.1f}x"
+              f"   ({size / 1024:.0f}KB vs {fast_size / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
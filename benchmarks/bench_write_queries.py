@@ -0,0 +1,91 @@
+"""Statements each write endpoint sends to the database, checked against a budget.
+
+    python -m benchmarks.bench_write_queries
+
+Runs every create/update/delete route once (and each update/delete once more
+against a missing id) on SQLite, counting the statements and commits the
+request issued. Exits non-zero when a route goes over its budget.
+"""
+import asyncio
+import logging
+import sys
+
+from benchmarks.bench_booking_race import seed
+from benchmarks.common import StatementCounter, admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+
+MISSING = 999999
+
+AMENITY = {"name": "Pool", "description": "Outdoor pool", "start_time": "08:00:00", "end_time": "20:00:00", "condo_id": 1}
+BLOCK = {"amenity_id": 1, "start_date": "2030-03-01", "end_date": "2030-03-02", "start_time": "06:00:00", "end_time": "07:00:00"}
+BLOCK_UPDATE = {"start_date": "2030-03-01", "end_date": "2030-03-03", "start_time": "06:00:00", "end_time": "07:30:00", "reason": "paint"}
+VISITOR = {"visit_name": "guest", "visit_date": "2030-03-01", "user_id": 1, "condo_id": 1, "unit_number": "1A"}
+VISITOR_UPDATE = {"visit_name": "guest", "plate": "ABC123", "visit_date": "2030-03-02", "status": "approved", "unit_number": "1A"}
+RESERVATION = {"user_id": 1, "amenity_id": "1", "date": "2030-03-05", "start_time": "10:00:00", "end_time": "11:00:00", "status": "pending"}
+RESERVATION_UPDATE = dict(RESERVATION, start_time="12:00:00", end_time="13:00:00", status="confirmed")
+
+# (label, method, path, body, expected status, statement budget)
+CASES = [
+    ("create condo", "post", "/condos/", {"name": "Second", "address": "Elsewhere"}, 201, 1),
+    ("update condo", "put", "/condos/2", {"name": "Second", "address": "Moved"}, 200, 1),
+    ("update condo 404", "put", f"/condos/{MISSING}", {"name": "x", "address": "x"}, 404, 1),
+    ("create amenity", "post", "/amenities/", AMENITY, 201, 1),
+    ("update amenity", "put", "/amenities/2", dict(AMENITY, name="Big pool"), 200, 2),
+    ("update amenity 404", "put", f"/amenities/{MISSING}", AMENITY, 404, 1),
+    ("update user", "put", "/users/1", {"unit": "2B"}, 200, 2),
+    ("update user 404", "put", f"/users/{MISSING}", {"unit": "2B"}, 404, 1),
+    ("create visitor", "post", "/visitors/", VISITOR, 201, 1),
+    ("update visitor", "put", "/visitors/1", VISITOR_UPDATE, 200, 2),
+    ("update visitor 404", "put", f"/visitors/{MISSING}", VISITOR_UPDATE, 404, 1),
+    ("create block", "post", "/blocks/", BLOCK, 201, 2),
+    ("update block", "put", "/blocks/1", BLOCK_UPDATE, 200, 2),
+    ("update block 404", "put", f"/blocks/{MISSING}", BLOCK_UPDATE, 404, 1),
+    # Three slot checks (amenity lock, blocks, overlaps) plus the write and one read-back
+    ("create reservation", "post", "/reservations/", RESERVATION, 201, 5),
+    ("update reservation", "put", "/reservations/1", RESERVATION_UPDATE, 200, 5),
+    ("update reservation 404", "put", f"/reservations/{MISSING}", dict(RESERVATION_UPDATE, date="2030-03-06"), 404, 4),
+    ("delete reservation", "delete", "/reservations/1", None, 204, 1),
+    ("delete reservation 404", "delete", f"/reservations/{MISSING}", None, 404, 1),
+    ("delete block", "delete", "/blocks/1", None, 204, 1),
+    ("delete block 404", "delete", f"/blocks/{MISSING}", None, 404, 1),
+    ("delete visitor", "delete", "/visitors/1", None, 204, 1),
+    ("delete visitor 404", "delete", f"/visitors/{MISSING}", None, 404, 1),
+    ("delete amenity", "delete", "/amenities/2", None, 204, 1),
+    ("delete amenity 404", "delete", f"/amenities/{MISSING}", None, 404, 1),
+    # Amenities of the condo first, then the condo
+    ("delete condo", "delete", "/condos/2", None, 204, 2),
+    ("delete condo 404", "delete", f"/condos/{MISSING}", None, 404, 2),
+    ("delete user 404", "delete", f"/users/{MISSING}", None, 404, 1),
+]
+
+
+async def main():
+    use_sqlite()
+    quiet_logging()
+    logging.getLogger("niddo-api").setLevel(logging.ERROR)  # the 404 cases log warnings
+    await create_schema()
+    await seed()
+
+    from app.db.db import database
+
+    counter = StatementCounter(database.engine)
+    failures = 0
+    print(f"{'route':<26}{'status':>7}{'statements':>12}{'budget':>8}{'commits':>9}")
+    try:
+        async with client(admin_token()) as http:
+            for label, method, path, body, expected, budget in CASES:
+                counter.reset()
+                kwargs = {"json": body} if body is not None else {}
+                response = await http.request(method.upper(), path, **kwargs)
+                ok = response.status_code == expected and counter.statements <= budget
+                failures += not ok
+                print(f"{label:<26}{response.status_code:>7}{counter.statements:>12}{budget:>8}{counter.commits:>9}"
+                      f"{'' if ok else '  FAIL ' + response.text[:80]}")
+    finally:
+        await close_database()
+    if failures:
+        print(f"FAIL: {failures} routes over budget or with an unexpected status")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
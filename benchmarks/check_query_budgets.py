@@ -0,0 +1,89 @@
+"""Run the read routes with the statement profiler in strict mode.
+
+    python -m benchmarks.check_query_budgets
+    python -m benchmarks.check_query_budgets --top 10
+
+Seeds the small dataset preset into SQLite and turns on DB_PROFILE and
+DB_PROFILE_STRICT. Each route below then gets its own statement budget,
+and a request that goes over it or repeats a statement shape
+DB_NPLUS1_THRESHOLD times fails; strict mode flags it in the
+X-Query-Budget-Exceeded header. Prints the slowest statement
+fingerprints and exits non-zero on any violation in the profiler report,
+which also covers statements run while a response streams.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from benchmarks.common import admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+from benchmarks.dataset import PRESETS, seed_dataset
+
+# (route template, concrete path, statement budget)
+ROUTES = [
+    ("GET /users/{user_id}", "/users/2", 1),
+    ("GET /users/usersbycondo/{condo_id}", "/users/usersbycondo/1", 1),
+    ("GET /users/", "/users/", 1),
+    ("GET /condos/{condo_id}", "/condos/1", 1),
+    ("GET /condos/", "/condos/", 1),
+    ("GET /amenities/amenitiesbycondo/{condo_id}", "/amenities/amenitiesbycondo/1", 1),
+    ("GET /amenities/{amenity_id}", "/amenities/1", 1),
+    # Amenity, blocks and reservations of the window
+    ("GET /amenities/{amenity_id}/availability", "/amenities/1/availability?date_from=2030-01-01&date_to=2030-01-07", 3),
+    ("GET /blocks/blocksbyamenity/{amenity_id}", "/blocks/blocksbyamenity/1", 1),
+    ("GET /blocks/{block_id}", "/blocks/1", 1),
+    ("GET /reservations/{reservation_id}", "/reservations/1", 1),
+    ("GET /reservations/reservationsbyuser/{user_id}", "/reservations/reservationsbyuser/2", 1),
+    ("GET /reservations/export/condo/{condo_id}", "/reservations/export/condo/1", 1),
+    ("GET /visitors/{visitor_id}", "/visitors/1", 1),
+    ("GET /visitors/visitorsbycondo/{condo_id}", "/visitors/visitorsbycondo/1", 1),
+    ("GET /visitors/visitorsbyuser/{user_id}", "/visitors/visitorsbyuser/2", 1),
+    ("GET /visitors/export/condo/{condo_id}", "/visitors/export/condo/1", 1),
+    # Builds today's gate index entry; later lookups issue none
+    ("GET /visitors/gate/{condo_id}", "/visitors/gate/1?plate=ABC123", 1),
+    ("GET /visitors/snapshot/{condo_id}", "/visitors/snapshot/1?date_from=2030-01-01&date_to=2030-01-07", 1),
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=5, help="slowest statement fingerprints to print")
+    args = parser.parse_args()
+
+    use_sqlite()
+    os.environ["DB_PROFILE"] = "true"
+    os.environ["DB_PROFILE_STRICT"] = "true"
+    quiet_logging()
+    await create_schema()
+
+    from app.db.db import database
+
+    async with database.engine.begin() as conn:
+        await seed_dataset(conn, PRESETS["small"], password_hash="x")
+    profiler = database.profiler
+    profiler.reset()
+    for route, _, budget in ROUTES:
+        profiler.set_budget(route, budget)
+
+    try:
+        async with client(admin_token()) as http:
+            for route, path, budget in ROUTES:
+                response = await http.get(path)
+                status = "over budget" if "x-query-budget-exceeded" in response.headers else response.status_code
+                print(f"{route:<52} budget {budget:>2}  {status}")
+    finally:
+        await close_database()
+
+    report = profiler.report(args.top)
+    failures = [f"{violation['route']}: {'; '.join(violation['problems'])}" for violation in report["violations"]]
+    print(f"\nTop {args.top} statements by total time over {report['requests']} requests:")
+    for item in report["top"]:
+        print(f"  {item['total_ms']:>8.2f}ms {item['count']:>4}x avg {item['avg_ms']:.2f}ms  {item['statement'][:110]}")
+    for message in failures:
+        print(f"FAIL {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
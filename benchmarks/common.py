@@ -0,0 +1,84 @@
+"""Shared helpers for benchmarks that boot the app against SQLite."""
+import logging
+import os
+import tempfile
+
+import httpx
+from sqlalchemy import event
+
+
+def use_sqlite(path: str = None) -> str:
+    """Point the app at a SQLite file. Must run before importing app modules."""
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    os.environ["DB_URL"] = url
+    os.environ.pop("DB_DEV_URL", None)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    return url
+
+
+def quiet_logging():
+    import app.utils.logger  # noqa: F401  configures handlers on import
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("passlib").setLevel(logging.ERROR)  # bcrypt version probe noise
+    logging.getLogger("niddo-api").setLevel(logging.WARNING)
+
+
+async def create_schema():
+    from app.db.db import Base, database
+    import app.models  # noqa: F401  registers mappers
+    import app.models.visitor  # noqa: F401
+
+    await database.connect()
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def close_database():
+    from app.db.db import database
+
+    await database.close()
+
+
+class StatementCounter:
+    """Counts statements, INSERTs and commits sent through an (async) engine."""
+
+    def __init__(self, engine):
+        self.statements = 0
+        self.inserts = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+        event.listen(engine.sync_engine, "commit", self.on_commit)
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if statement.lstrip().upper().startswith("INSERT"):
+            self.inserts += 1
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.inserts = self.commits = 0
+
+
+def admin_token(user_id: int = 1, condo_id: int = 1) -> str:
+    from app.utils.jwt import create_access_token
+
+    return create_access_token({"user_id": str(user_id), "user_name": "bench", "user_role": "admin", "condo_id": str(condo_id)})
+
+
+def client(token: str = None) -> httpx.AsyncClient:
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers)
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
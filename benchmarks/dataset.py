@@ -0,0 +1,243 @@
+"""Deterministic synthetic data for load tests and benchmarks.
+
+    python -m benchmarks.dataset --preset large --db-url sqlite+aiosqlite:////tmp/niddo-large.db
+    python -m benchmarks.dataset --preset medium --checksum      # generate only, print a digest
+
+The same DatasetSpec always produces the same rows: ids are assigned
+sequentially and every random choice comes from one seeded generator.
+Rows are written with batched Core executemany INSERTs, so large specs
+stream through without building ORM objects. The "large" preset is 1k
+condos, 100k users and 1M visitors.
+"""
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import hashlib
+import os
+import random
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import insert
+
+BATCH = 10000
+AMENITY_NAMES = ["Pool", "Grill", "Gym", "Party room", "Tennis court", "Cinema", "Coworking", "Sauna"]
+LOADTEST_PASSWORD = "loadtest-password"
+
+
+@dataclass
+class DatasetSpec:
+    condos: int = 20
+    users_per_condo: int = 50
+    amenities_per_condo: int = 4
+    visitors_per_user: int = 10
+    reservations_per_amenity: int = 60
+    blocks_per_amenity: int = 4
+    days: int = 60  # reservations, visitors and blocks fall within this many days from start
+    start: datetime.date = datetime.date(2030, 1, 1)
+    seed: int = 42
+
+    @property
+    def users(self) -> int:
+        return self.condos * self.users_per_condo
+
+    @property
+    def amenities(self) -> int:
+        return self.condos * self.amenities_per_condo
+
+    def condo_of_user(self, user_id: int) -> int:
+        return (user_id - 1) // self.users_per_condo + 1
+
+    def amenities_of_condo(self, condo_id: int) -> range:
+        first = (condo_id - 1) * self.amenities_per_condo + 1
+        return range(first, first + self.amenities_per_condo)
+
+    def users_of_condo(self, condo_id: int) -> range:
+        first = (condo_id - 1) * self.users_per_condo + 1
+        return range(first, first + self.users_per_condo)
+
+    def email(self, user_id: int) -> str:
+        return f"user{user_id}@condo{self.condo_of_user(user_id)}.example.com"
+
+    def role(self, user_id: int) -> str:
+        # The first user of every condo administers it
+        return "admin" if (user_id - 1) % self.users_per_condo == 0 else "resident"
+
+
+PRESETS = {
+    "small": DatasetSpec(),
+    "medium": DatasetSpec(condos=100, users_per_condo=100),
+    "large": DatasetSpec(condos=1000, users_per_condo=100),
+}
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def condo_rows(spec: DatasetSpec):
+    for condo_id in range(1, spec.condos + 1):
+        yield {"id": condo_id, "name": f"Condo {condo_id}", "address": f"{condo_id} Main Street"}
+
+
+def user_rows(spec: DatasetSpec, password_hash: str):
+    for user_id in range(1, spec.users + 1):
+        yield {
+            "id": user_id, "name": f"User {user_id}", "email": spec.email(user_id), "password_hash": password_hash,
+            "role": spec.role(user_id), "condo_id": spec.condo_of_user(user_id), "unit": f"{(user_id - 1) % spec.users_per_condo + 1}A",
+        }
+
+
+def amenity_rows(spec: DatasetSpec):
+    for amenity_id in range(1, spec.amenities + 1):
+        opens = 6 + amenity_id % 3
+        yield {
+            "id": amenity_id, "name": AMENITY_NAMES[(amenity_id - 1) % len(AMENITY_NAMES)],
+            "description": "Shared amenity", "start_time": datetime.time(opens), "end_time": datetime.time(opens + 14),
+            "condo_id": (amenity_id - 1) // spec.amenities_per_condo + 1,
+        }
+
+
+def block_rows(spec: DatasetSpec, rng: random.Random):
+    for amenity_id in range(1, spec.amenities + 1):
+        for _ in range(spec.blocks_per_amenity):
+            day = spec.start + datetime.timedelta(days=rng.randrange(spec.days))
+            yield {
+                "amenity_id": amenity_id, "start_date": day, "end_date": day + datetime.timedelta(days=rng.randint(0, 2)),
+                "start_time": datetime.time(6), "end_time": datetime.time(8), "reason": "maintenance",
+            }
+
+
+def reservation_rows(spec: DatasetSpec, rng: random.Random):
+    for amenity_id in range(1, spec.amenities + 1):
+        opens = 6 + amenity_id % 3
+        condo_id = (amenity_id - 1) // spec.amenities_per_condo + 1
+        users = spec.users_of_condo(condo_id)
+        # Distinct one-hour slots, so the seeded bookings never overlap
+        slots = rng.sample(range(spec.days * 14), min(spec.reservations_per_amenity, spec.days * 14))
+        for slot in slots:
+            hour = opens + slot % 14
+            yield {
+                "user_id": rng.choice(users), "amenity_id": amenity_id,
+                "date": spec.start + datetime.timedelta(days=slot // 14),
+                "start_time": datetime.time(hour), "end_time": datetime.time(hour + 1),
+                "status": rng.choice(["pending", "confirmed", "confirmed", "canceled"]),
+            }
+
+
+def visitor_rows(spec: DatasetSpec, rng: random.Random):
+    for user_id in range(1, spec.users + 1):
+        for _ in range(spec.visitors_per_user):
+            number = rng.randrange(10**6)
+            yield {
+                "visit_name": f"Guest {number}", "identification": str(10**8 + number), "plate": f"P{number:06d}",
+                "user_id": user_id, "condo_id": spec.condo_of_user(user_id),
+                "visit_date": spec.start + datetime.timedelta(days=rng.randrange(spec.days)),
+                "status": rng.choice(["pending", "approved"]), "unit_number": f"{(user_id - 1) % spec.users_per_condo + 1}A",
+            }
+
+
+def table_rows(spec: DatasetSpec, password_hash: str) -> list:
+    """(table name, row generator) pairs in insert order, sharing one seeded generator."""
+    rng = random.Random(spec.seed)
+    return [
+        ("condos", condo_rows(spec)),
+        ("users", user_rows(spec, password_hash)),
+        ("amenities", amenity_rows(spec)),
+        ("blocks", block_rows(spec, rng)),
+        ("reservations", reservation_rows(spec, rng)),
+        ("visitors", visitor_rows(spec, rng)),
+    ]
+
+
+def dataset_checksum(spec: DatasetSpec) -> str:
+    """Digest of every generated row, for checking that a spec is reproducible."""
+    digest = hashlib.blake2b(digest_size=16)
+    for _, rows in table_rows(spec, password_hash="x"):
+        for row in rows:
+            digest.update(repr(sorted(row.items())).encode())
+    return digest.hexdigest()
+
+
+async def seed_dataset(conn, spec: DatasetSpec, password_hash: str = None) -> dict:
+    """Insert the dataset described by `spec` through an AsyncConnection; returns row counts."""
+    from app.models import Amenity, Block, Condo, Reservation, User, Visitor
+
+    if password_hash is None:
+        # One real bcrypt hash shared by every user keeps login traffic realistic
+        from app.utils.passwords import hash_password
+        password_hash = await hash_password(LOADTEST_PASSWORD)
+
+    models = {model.__tablename__: model for model in (Amenity, Block, Condo, Reservation, User, Visitor)}
+    counts = {}
+    for table, rows in table_rows(spec, password_hash):
+        model = models[table]
+        count = 0
+        for batch in _batched(rows):
+            await conn.execute(insert(model), batch)
+            count += len(batch)
+        counts[model.__tablename__] = count
+    return counts
+
+
+def spec_from_args(args) -> DatasetSpec:
+    """The preset named by --preset with any explicit size overrides applied."""
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(DatasetSpec)
+        if getattr(args, field.name, None) is not None
+    }
+    return dataclasses.replace(PRESETS[args.preset], **overrides)
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser, default_preset: str = "small"):
+    parser.add_argument("--preset", choices=sorted(PRESETS), default=default_preset)
+    for name in ("condos", "users_per_condo", "amenities_per_condo", "visitors_per_user",
+                 "reservations_per_amenity", "blocks_per_amenity", "days", "seed"):
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, help="override the preset")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--db-url", help="empty database to seed (default: a new temporary SQLite file)")
+    parser.add_argument("--checksum", action="store_true", help="only generate the rows and print their digest")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    if args.checksum:
+        start = time.perf_counter()
+        print(f"{dataset_checksum(spec)}  {spec} ({time.perf_counter() - start:.1f}s)")
+        return
+
+    from benchmarks.common import close_database, create_schema, quiet_logging, use_sqlite
+
+    if args.db_url:
+        os.environ["DB_URL"] = args.db_url
+    else:
+        use_sqlite()
+    quiet_logging()
+    await create_schema()
+
+    from app.db.db import database
+
+    try:
+        start = time.perf_counter()
+        async with database.engine.begin() as conn:
+            counts = await seed_dataset(conn, spec)
+        elapsed = time.perf_counter() - start
+    finally:
+        await close_database()
+    print(f"Seeded {database.DATABASE_URI} with {counts} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
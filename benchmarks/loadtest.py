@@ -0,0 +1,285 @@
+"""Mixed-traffic load test across the routers, with a stored baseline.
+
+    python -m benchmarks.loadtest                        # run, save results, compare
+    python -m benchmarks.loadtest --save-baseline        # record a new baseline
+    python -m benchmarks.loadtest --duration 60 --concurrency 64
+    BENCH_DB_URL=mysql+aiomysql://... python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --base-url http://localhost:8000   # a running server
+
+Seeds a multi-condo dataset (benchmarks/dataset.py) into a fresh SQLite file,
+or into BENCH_DB_URL, which must point at an empty scratch database. Then it
+drives the app in-process through httpx's ASGI transport. Each virtual user
+is a seeded resident holding a token minted like /auth/login would (so the
+run does not start with a bcrypt stampede) and keeps picking a weighted
+action: log in, browse amenities, check availability, book, register a
+visitor, list its reservations and visitors.
+
+It reports requests/sec and p50/p95/p99 latency per route. Results go to
+benchmarks/results/loadtest-latest.json and are compared with
+benchmarks/baselines/loadtest.json. A route regresses when its p95 grows,
+or its throughput drops, by more than --tolerance. The run then exits
+non-zero. A baseline is only meaningful on the machine and database it was
+recorded on.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import close_database, create_schema, percentile, quiet_logging, use_sqlite
+from benchmarks.dataset import LOADTEST_PASSWORD, DatasetSpec, seed_dataset
+
+HERE = Path(__file__).parent
+DEFAULT_OUTPUT = HERE / "results" / "loadtest-latest.json"
+DEFAULT_BASELINE = HERE / "baselines" / "loadtest.json"
+
+# Statuses that are a normal outcome for the route (a taken slot is a 409, not a failure)
+EXPECTED = {
+    "POST /auth/login": {200},
+    "POST /reservations/": {201, 409},
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: int, seconds: float):
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = self.latencies[route]
+            expected = EXPECTED.get(route, {200, 201})
+            statuses = self.statuses[route]
+            routes[route] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "errors": sum(count for status, count in statuses.items() if status not in expected),
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            }
+        every = [value for values in self.latencies.values() for value in values]
+        total = {
+            "requests": len(every),
+            "rps": round(len(every) / elapsed, 2),
+            "p50_ms": round(percentile(every, 50) * 1000, 2),
+            "p95_ms": round(percentile(every, 95) * 1000, 2),
+            "p99_ms": round(percentile(every, 99) * 1000, 2),
+            "errors": sum(route["errors"] for route in routes.values()),
+        }
+        return {"total": total, "routes": routes}
+
+
+class VirtualUser:
+    """One resident session issuing weighted actions until the deadline."""
+
+    def __init__(self, http: httpx.AsyncClient, spec: DatasetSpec, recorder: Recorder, rng: random.Random, user_id: int):
+        self.http = http
+        self.spec = spec
+        self.recorder = recorder
+        self.rng = rng
+        self.user_id = user_id
+        self.condo_id = spec.condo_of_user(user_id)
+        from app.utils.jwt import create_access_token
+        token = create_access_token({"user_id": str(user_id), "user_name": f"User {user_id}",
+                                     "user_role": spec.role(user_id), "condo_id": str(self.condo_id)})
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def call(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.http.request(method, url, headers=self.headers, **kwargs)
+        self.recorder.record(route, response.status_code, time.perf_counter() - start)
+        return response
+
+    def random_day(self) -> datetime.date:
+        return self.spec.start + datetime.timedelta(days=self.rng.randrange(self.spec.days))
+
+    async def login(self):
+        response = await self.call("POST /auth/login", "POST", "/auth/login",
+                                   json={"email": self.spec.email(self.user_id), "password": LOADTEST_PASSWORD})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse_amenities(self):
+        await self.call("GET /amenities/amenitiesbycondo/{condo_id}", "GET", f"/amenities/amenitiesbycondo/{self.condo_id}")
+
+    async def check_availability(self):
+        amenity_id = self.rng.choice(self.spec.amenities_of_condo(self.condo_id))
+        day = self.random_day()
+        await self.call("GET /amenities/{amenity_id}/availability", "GET", f"/amenities/{amenity_id}/availability",
+                        params={"date_from": str(day), "date_to": str(day + datetime.timedelta(days=6))})
+
+    async def book(self):
+        amenity_id = self.rng.choice(self.spec.amenities_of_condo(self.condo_id))
+        hour = 8 + self.rng.randrange(12)
+        await self.call("POST /reservations/", "POST", "/reservations/", json={
+            "user_id": self.user_id, "amenity_id": str(amenity_id), "date": str(self.random_day()),
+            "start_time": f"{hour:02d}:00:00", "end_time": f"{hour + 1:02d}:00:00", "status": "pending",
+        })
+
+    async def register_visitor(self):
+        number = self.rng.randrange(10**6)
+        await self.call("POST /visitors/", "POST", "/visitors/", json={
+            "visit_name": f"Guest {number}", "identification": str(number), "plate": f"L{number:06d}",
+            "visit_date": str(self.random_day()), "user_id": self.user_id, "condo_id": self.condo_id, "unit_number": "1A",
+        })
+
+    async def my_reservations(self):
+        await self.call("GET /reservations/reservationsbyuser/{user_id}", "GET", f"/reservations/reservationsbyuser/{self.user_id}")
+
+    async def my_visitors(self):
+        await self.call("GET /visitors/visitorsbyuser/{user_id}", "GET", f"/visitors/visitorsbyuser/{self.user_id}")
+
+    async def condo_visitors(self):
+        await self.call("GET /visitors/visitorsbycondo/{condo_id}", "GET", f"/visitors/visitorsbycondo/{self.condo_id}")
+
+    async def run(self, deadline: float):
+        actions = [
+            (self.login, 3),
+            (self.browse_amenities, 25),
+            (self.check_availability, 15),
+            (self.book, 12),
+            (self.register_visitor, 12),
+            (self.my_reservations, 13),
+            (self.my_visitors, 10),
+            (self.condo_visitors, 10),
+        ]
+        functions = [action for action, _ in actions]
+        weights = [weight for _, weight in actions]
+        while time.perf_counter() < deadline:
+            await self.rng.choices(functions, weights)[0]()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Routes whose p95 or throughput moved past the tolerance, worst first."""
+    regressions = []
+    for route, now in results["routes"].items():
+        before = baseline["routes"].get(route)
+        if not before:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((now["p95_ms"] / before["p95_ms"], f"{route}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms"))
+        if before["rps"] and now["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append((before["rps"] / now["rps"], f"{route}: {before['rps']} -> {now['rps']} req/s"))
+    return [message for _, message in sorted(regressions, reverse=True)]
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"{'route':<48}{'req':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>5}{'p95 vs base':>13}")
+    rows = list(results["routes"].items()) + [("TOTAL", results["total"])]
+    for route, stats in rows:
+        before = (baseline or {}).get("routes", {}).get(route) if route != "TOTAL" else (baseline or {}).get("total")
+        delta = f"{(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%" if before and before["p95_ms"] else ""
+        print(f"{route:<48}{stats['requests']:>7}{stats['rps']:>9.1f}{stats['p50_ms']:>8.1f}m{stats['p95_ms']:>8.1f}m"
+              f"{stats['p99_ms']:>8.1f}m{stats['errors']:>5}{delta:>13}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=float(os.getenv("LOADTEST_DURATION", "20")), help="seconds of traffic")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("LOADTEST_CONCURRENCY", "32")), help="virtual users")
+    parser.add_argument("--condos", type=int, default=20)
+    parser.add_argument("--users-per-condo", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth / throughput drop (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    if os.getenv("BENCH_DB_URL"):
+        os.environ["DB_URL"] = os.environ["BENCH_DB_URL"]
+    else:
+        use_sqlite()
+    quiet_logging()
+    await create_schema()
+
+    from app.db.db import database
+
+    spec = DatasetSpec(condos=args.condos, users_per_condo=args.users_per_condo, seed=args.seed)
+    start = time.perf_counter()
+    async with database.engine.begin() as conn:
+        counts = await seed_dataset(conn, spec)
+    print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s")
+
+    if args.base_url:
+        http = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from app.main import app
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    # Residents only; admins are the first user of each condo
+    residents = [user for user in range(1, spec.users + 1) if spec.role(user) == "resident"]
+    try:
+        async with http:
+            deadline = time.perf_counter() + args.duration
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                VirtualUser(http, spec, recorder, random.Random(rng.random()), rng.choice(residents)).run(deadline)
+                for _ in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        await close_database()
+
+    results = {
+        "meta": {
+            "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "duration_s": round(elapsed, 2),
+            "concurrency": args.concurrency,
+            "dataset": {**counts, "seed": spec.seed},
+            "database": database.DATABASE_URI.split(":", 1)[0],
+            "target": args.base_url or "in-process",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        **recorder.summary(elapsed),
+    }
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else None
+    print_report(results, baseline)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    failed = False
+    if results["total"]["errors"]:
+        print(f"FAIL: {results['total']['errors']} unexpected responses")
+        failed = True
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        failed = failed or bool(regressions)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
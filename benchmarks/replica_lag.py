@@ -0,0 +1,96 @@
+"""Simulate a lagging read replica with two SQLite files and check read-your-writes.
+
+    python -m benchmarks.replica_lag
+    python -m benchmarks.replica_lag --lag 2 --pin 1
+
+The app gets the first file as its primary (DB_URL) and the second as its
+only replica (DB_READ_URLS). "Replication" is an explicit copy of the
+primary into the replica with SQLite's backup API, run --lag seconds after
+each write, so the replica is reliably behind in between. The script
+checks that:
+
+- the writer reads its own new visitor at once, because it is pinned to
+  the primary;
+- another user reading the same list sees the stale replica until the
+  copy runs;
+- once the pin window (--pin seconds) expires, the writer's reads go back
+  to the replica.
+
+Exits non-zero when any check fails.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+from benchmarks.common import admin_token, client, close_database, create_schema, quiet_logging, use_sqlite
+
+
+def replicate(primary: str, replica: str):
+    source = sqlite3.connect(primary)
+    target = sqlite3.connect(replica)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+async def visitor_names(http, user_id: int) -> set:
+    response = await http.get(f"/visitors/visitorsbyuser/{user_id}")
+    response.raise_for_status()
+    return {item["visit_name"] for item in response.json()["items"]}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lag", type=float, default=1.0, help="seconds before a write reaches the replica")
+    parser.add_argument("--pin", type=float, default=0.5, help="read-after-write pin window in seconds")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    primary, replica = os.path.join(directory, "primary.db"), os.path.join(directory, "replica.db")
+    use_sqlite(primary)
+    os.environ["DB_READ_URLS"] = f"sqlite+aiosqlite:///{replica}"
+    os.environ["DB_READ_AFTER_WRITE_PIN"] = str(args.pin)
+    quiet_logging()
+    await create_schema()
+
+    from benchmarks.bench_booking_race import seed
+
+    await seed()
+    await asyncio.to_thread(replicate, primary, replica)
+
+    failures = []
+
+    def check(label: str, ok: bool):
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    visitor = {"visit_date": "2030-03-01", "user_id": 1, "condo_id": 1, "unit_number": "1A"}
+    try:
+        async with client(admin_token(user_id=1)) as writer, client(admin_token(user_id=2)) as observer:
+            response = await writer.post("/visitors/", json=dict(visitor, visit_name="first"))
+            check("writer creates a visitor", response.status_code == 201)
+            check("writer reads its own write (pinned to the primary)", "first" in await visitor_names(writer, 1))
+            check("other user still reads the lagging replica", "first" not in await visitor_names(observer, 1))
+
+            await asyncio.sleep(args.lag)
+            await asyncio.to_thread(replicate, primary, replica)
+            check(f"other user sees the write after {args.lag}s of lag", "first" in await visitor_names(observer, 1))
+
+            await writer.post("/visitors/", json=dict(visitor, visit_name="second"))
+            await asyncio.sleep(args.pin + 0.1)
+            check("after the pin window the writer reads the replica again", "second" not in await visitor_names(writer, 1))
+    finally:
+        await close_database()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
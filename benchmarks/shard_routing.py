@@ -0,0 +1,127 @@
+"""Run the app on two SQLite shards and check condo routing and fan-out.
+
+    python -m benchmarks.shard_routing
+
+Shard "default" (DB_URL) holds the odd condos and shard "b" (DB_SHARDS)
+the even ones, matching the modulo placement; shard b gets an empty
+read replica (DB_READ_URLS_B), which stands in for one that lags. Every
+row is seeded with explicit, globally unique ids, which is what
+per-shard auto-increment offsets give on MySQL. The script checks that:
+
+- per-condo routes read and write the condo's own shard;
+- writes go to the shard of the body's condo_id, not the caller's token
+  condo, and /{id} routes find the row's shard;
+- a bulk request mixing condos of both shards is rejected, writing nothing;
+- GET /condos/ and GET /users/ merge all shards in id order across pages;
+- a client that just wrote reads fan-outs from the primaries, others
+  from the replica;
+- a user on the second shard can log in, and its email cannot be
+  registered again on the first.
+
+Exits non-zero when any check fails.
+"""
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+
+from benchmarks.common import admin_token, client, close_database, quiet_logging, use_sqlite
+
+CONDOS = 5
+PASSWORD = "shard-password"
+
+
+async def main():
+    directory = tempfile.mkdtemp()
+    use_sqlite(os.path.join(directory, "default.db"))
+    os.environ["DB_SHARDS"] = f"b=sqlite+aiosqlite:///{os.path.join(directory, 'b.db')}"
+    os.environ["DB_READ_URLS_B"] = f"sqlite+aiosqlite:///{os.path.join(directory, 'b-replica.db')}"
+    quiet_logging()
+
+    import app.models  # noqa: F401  registers mappers
+    import app.models.visitor  # noqa: F401
+    from sqlalchemy import func, insert, select
+    from app.db.db import Base, shards
+    from app.models import Condo, User, Visitor
+    from app.utils.passwords import hash_password
+
+    password_hash = await hash_password(PASSWORD)
+    await shards.connect()
+    for engine in [shard.engine for shard in shards.order] + shards.shards["b"].reader_engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    for condo_id in range(1, CONDOS + 1):
+        async with shards.for_condo(condo_id).engine.begin() as conn:
+            await conn.execute(insert(Condo).values(id=condo_id, name=f"Condo {condo_id}", address="Somewhere"))
+            await conn.execute(insert(User).values(
+                id=condo_id, name=f"Admin {condo_id}", email=f"admin{condo_id}@example.com", password_hash=password_hash,
+                role="admin", condo_id=condo_id, unit="1A",
+            ))
+
+    failures = []
+
+    def check(label: str, ok: bool):
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    async def visitors_on(shard_name: str) -> int:
+        async with shards.shards[shard_name].engine.connect() as conn:
+            return (await conn.execute(select(func.count()).select_from(Visitor))).scalar()
+
+    def visitor(condo_id: int, name: str = "guest") -> dict:
+        return {"visit_name": name, "visit_date": str(datetime.date(2030, 3, 1)), "user_id": condo_id, "condo_id": condo_id, "unit_number": "1A"}
+
+    try:
+        # The caller's token is for condo 1, on the default shard
+        async with client(admin_token(user_id=1, condo_id=1)) as http:
+            response = await http.post("/visitors/", json=visitor(2))
+            check("condo 2 visitor is created", response.status_code == 201)
+            check("it is written to shard b only", await visitors_on("b") == 1 and await visitors_on("default") == 0)
+            visitor_id = response.json()["id"]
+            response = await http.get("/visitors/visitorsbycondo/2")
+            check("condo 2 visitors are read from shard b", response.status_code == 200 and len(response.json()["items"]) == 1)
+            response = await http.get(f"/visitors/{visitor_id}")
+            check("GET /visitors/{visitor_id} finds the visitor on shard b", response.status_code == 200)
+            response = await http.put(f"/visitors/{visitor_id}", json={
+                "visit_name": "renamed", "visit_date": str(datetime.date(2030, 3, 1)), "status": "approved", "unit_number": "1A",
+            })
+            check("PUT /visitors/{visitor_id} updates it on shard b", response.status_code == 200 and response.json()["visit_name"] == "renamed")
+            response = await http.get("/condos/4")
+            check("GET /condos/4 routes by path to shard b", response.status_code == 200 and response.json()["name"] == "Condo 4")
+
+            response = await http.post("/visitors/bulk", json=[visitor(1, "a"), visitor(2, "b")])
+            check("a bulk request across both shards is rejected", response.status_code == 400)
+            check("and writes nothing", await visitors_on("b") == 1 and await visitors_on("default") == 0)
+
+            first = await http.get("/condos/", params={"limit": 3})
+            second = await http.get("/condos/", params={"limit": 3, "after": first.json()["next_cursor"]})
+            names = [item["name"] for item in first.json()["items"] + second.json()["items"]]
+            check("GET /condos/ merges both shards in id order across pages", names == [f"Condo {i}" for i in range(1, CONDOS + 1)])
+            response = await http.get("/users/", params={"limit": 50})
+            check("GET /users/ of a client that just wrote reads the primaries", len(response.json()["items"]) == CONDOS)
+
+        async with client(admin_token(user_id=3, condo_id=3)) as http:
+            response = await http.get("/users/", params={"limit": 50})
+            check("GET /users/ of another client reads shard b's replica", len(response.json()["items"]) == CONDOS - CONDOS // 2)
+
+        async with client() as http:
+            response = await http.post("/auth/login", json={"email": "admin4@example.com", "password": PASSWORD})
+            check("a user on shard b logs in", response.status_code == 200)
+
+        async with client(admin_token(user_id=1, condo_id=1)) as http:
+            response = await http.post("/users/", json={
+                "name": "Copy", "email": "admin4@example.com", "password": PASSWORD, "condo_id": 1, "unit": "2B",
+            })
+            check("an email registered on shard b is refused on the default shard", response.status_code == 409)
+    finally:
+        await shards.close()
+        await close_database()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""initial schema
+
+Tables as they existed before migrations were introduced. Databases created
+before this revision should be marked with `alembic stamp 0001` instead of
+running it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "condos",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("address", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+    )
+    op.create_index("ix_condos_id", "condos", ["id"])
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(50), nullable=False),
+        sa.Column("condo_id", sa.Integer(), sa.ForeignKey("condos.id"), nullable=False),
+        sa.Column("unit", sa.String(50), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "amenities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.String(255), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("condo_id", sa.Integer(), sa.ForeignKey("condos.id"), nullable=False),
+    )
+    op.create_index("ix_amenities_id", "amenities", ["id"])
+
+    op.create_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("amenity_id", sa.Integer(), sa.ForeignKey("amenities.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("status", sa.Enum("pending", "confirmed", "canceled", "rejected", name="reservationstatusenum"), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), nullable=True),
+    )
+
+    op.create_table(
+        "blocks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("amenity_id", sa.Integer(), sa.ForeignKey("amenities.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("reason", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_blocks_id", "blocks", ["id"])
+
+    op.create_table(
+        "visitors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("identification", sa.String(100), nullable=True),
+        sa.Column("visit_name", sa.String(100), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("condo_id", sa.Integer(), sa.ForeignKey("condos.id"), nullable=False),
+        sa.Column("plate", sa.String(20), nullable=True),
+        sa.Column("visit_date", sa.Date(), nullable=False),
+        sa.Column("status", sa.Enum("pending", "approved", name="visitorstatus"), nullable=False),
+        sa.Column("unit_number", sa.String(50), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.create_index("ix_visitors_id", "visitors", ["id"])
+
+
+def downgrade():
+    op.drop_table("visitors")
+    op.drop_table("blocks")
+    op.drop_table("reservations")
+    op.drop_table("amenities")
+    op.drop_table("users")
+    op.drop_table("condos")
@@ -0,0 +1,49 @@
+"""composite indexes for hot CRUD queries
+
+Each index matches the filter and keyset ordering of a query in app/crud.
+On MySQL they also take over the implicit foreign key indexes on the same
+leading column, so the downgrade puts a plain index back on each foreign
+key column before dropping the composite one; otherwise MySQL refuses
+with error 1553 (index needed in a foreign key constraint).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns); every leading column is a foreign key
+INDEXES = [
+    ("ix_users_condo_id", "users", ["condo_id"]),
+    ("ix_reservations_user_date", "reservations", ["user_id", "date"]),
+    ("ix_reservations_amenity_date_start", "reservations", ["amenity_id", "date", "start_time"]),
+    ("ix_visitors_condo_visit_date", "visitors", ["condo_id", "visit_date"]),
+    ("ix_visitors_user_visit_date", "visitors", ["user_id", "visit_date"]),
+    ("ix_blocks_amenity_start_date", "blocks", ["amenity_id", "start_date"]),
+]
+
+
+def _foreign_key_index(table: str, columns: list) -> str:
+    return f"ix_{table}_{columns[0]}_fk"
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+        # Left behind by an earlier downgrade; the composite index covers it
+        fk_index = _foreign_key_index(table, columns)
+        if fk_index in {index["name"] for index in inspector.get_indexes(table)}:
+            op.drop_index(fk_index, table_name=table)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.create_index(_foreign_key_index(table, columns), table, columns[:1])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""visitor expiry status and indexes for the expiry jobs
+
+Adds "expired" to visitors.status and (status, date) indexes so the
+reservation and visitor expiry jobs find pending past rows without
+scanning either table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_reservations_status_date", "reservations", ["status", "date"]),
+    ("ix_visitors_status_visit_date", "visitors", ["status", "visit_date"]),
+]
+
+
+def upgrade():
+    with op.batch_alter_table("visitors") as batch:
+        batch.alter_column(
+            "status",
+            existing_type=sa.Enum("pending", "approved", name="visitorstatus"),
+            type_=sa.Enum("pending", "approved", "expired", name="visitorstatus"),
+            existing_nullable=False,
+        )
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.execute("UPDATE visitors SET status = 'pending' WHERE status = 'expired'")
+    with op.batch_alter_table("visitors") as batch:
+        batch.alter_column(
+            "status",
+            existing_type=sa.Enum("pending", "approved", "expired", name="visitorstatus"),
+            type_=sa.Enum("pending", "approved", name="visitorstatus"),
+            existing_nullable=False,
+        )
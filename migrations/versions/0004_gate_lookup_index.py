@@ -0,0 +1,24 @@
+"""visitors (condo_id, visit_date, plate) index for gate lookups
+
+Serves plate lookups for a condo and day that miss the in-memory gate
+index. The (condo_id, visit_date) index stays for the keyset listings,
+which order by (visit_date, id).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_visitors_condo_visit_date_plate", "visitors", ["condo_id", "visit_date", "plate"])
+
+
+def downgrade():
+    op.drop_index("ix_visitors_condo_visit_date_plate", table_name="visitors")
@@ -0,0 +1,30 @@
+"""version column on visitors, reservations, blocks and amenities
+
+Every UPDATE bumps a row's version, so list ETags come from the ids and
+versions of a page instead of hashing the serialised body. Existing rows
+start at 1.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+TABLES = ("visitors", "reservations", "blocks", "amenities")
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("version")